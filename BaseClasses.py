@@ -3,8 +3,10 @@ from __future__ import annotations
 import collections
 import functools
 import logging
+import operator
 import random
 import secrets
+import threading
 from argparse import Namespace
 from collections import Counter, deque
 from collections.abc import Collection, MutableSequence
@@ -67,6 +69,13 @@ class MultiWorld():
     is_race: bool = False
     precollected_items: Dict[int, List[Item]]
     state: CollectionState
+    share_spheres: bool = False
+    """whether get_sphere_sweep shares its sweeps between everything that asks for them, which is only correct once
+    logic doesn't change anymore"""
+    _spheres: Optional[Tuple[List[Optional[Item]], List[Item], Dict[bool, Spheres]]]
+    """shared sphere sweeps by whether they are advancement only, with the placements and precollected items they are
+    for"""
+    _spheres_lock: threading.Lock
 
     plando_options: PlandoOptions
     early_items: Dict[int, Dict[str, int]]
@@ -160,6 +169,8 @@ class MultiWorld():
         self.local_early_items = {player: {} for player in self.player_ids}
         self.indirect_connections = {}
         self.start_inventory_from_pool: Dict[int, Options.StartInventoryPool] = {}
+        self._spheres = None
+        self._spheres_lock = threading.Lock()
 
         for player in range(1, players + 1):
             def set_player_attr(attr: str, val) -> None:
@@ -477,10 +488,12 @@ class MultiWorld():
     def push_precollected(self, item: Item):
         self.precollected_items[item.player].append(item)
         self.state.collect(item, True)
+        self._spheres = None
 
     def push_item(self, location: Location, item: Item, collect: bool = True):
         location.item = item
         item.location = location
+        self._spheres = None
         if collect:
             self.state.collect(item, location.advancement, location)
 
@@ -546,38 +559,75 @@ class MultiWorld():
             return all((self.has_beaten_game(state, p) for p in range(1, self.players + 1)))
 
     def can_beat_game(self, starting_state: Optional[CollectionState] = None) -> bool:
-        if starting_state:
-            if self.has_beaten_game(starting_state):
-                return True
-            state = starting_state.copy()
-        else:
-            state = CollectionState(self)
-            if self.has_beaten_game(state):
-                return True
-        prog_locations = {location for location in self.get_locations() if location.item
-                          and location.item.advancement and location not in state.locations_checked}
+        if not starting_state:
+            if self.share_spheres:
+                return self.get_sphere_sweep(advancement_only=True).beatable()
+            starting_state = CollectionState(self)
+        if self.has_beaten_game(starting_state):
+            return True
+        state = starting_state.copy()
+        prog_locations = [location for location in self.get_locations() if location.item
+                          and location.item.advancement and location not in state.locations_checked]
 
+        # Whether the game can be beaten doesn't depend on the order items are collected in, so they are collected as
+        # soon as they are found reachable, which takes fewer passes than building up spheres.
         while prog_locations:
-            sphere: Set[Location] = set()
-            # build up spheres of collection radius.
-            # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
+            unreachable_locations: List[Location] = []
             for location in prog_locations:
                 if location.can_reach(state):
-                    sphere.add(location)
+                    state.collect(location.item, True, location)
+                else:
+                    unreachable_locations.append(location)
 
-            if not sphere:
+            if len(unreachable_locations) == len(prog_locations):
                 # ran out of places and did not finish yet, quit
                 return False
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            prog_locations -= sphere
+            prog_locations = unreachable_locations
 
             if self.has_beaten_game(state):
                 return True
 
         return False
 
+    def get_sphere_sweep(self, advancement_only: bool = False, keep_states: bool = False) -> Spheres:
+        """
+        Returns the sphere sweep of every location of the multiworld from a fresh state, which is only computed as far
+        as it gets iterated. With `advancement_only`, it only sweeps and collects the locations of advancement items,
+        like the playthrough does, as worlds may count other items they collect as well. With `keep_states`, it keeps
+        the state after each sphere.
+
+        With `share_spheres`, everything that asks for the same kind of sweep shares one, which keeps the states, for
+        as long as the placed and precollected items stay the same. Changes to logic, like rules, entrances or item
+        classifications, are not noticed, so `share_spheres` must only be set once they are done, or
+        `invalidate_spheres` has to be called after making them.
+        """
+        locations = list(self.get_locations())
+        if not self.share_spheres:
+            return self._sweep(locations, advancement_only, keep_states)
+
+        placements = [location.item for location in locations]
+        precollected = [item for items in self.precollected_items.values() for item in items]
+
+        def unchanged(cached_items: List[Optional[Item]], items: List[Optional[Item]]) -> bool:
+            return len(cached_items) == len(items) and all(map(operator.is_, cached_items, items))
+
+        with self._spheres_lock:
+            cached = self._spheres
+            if not cached or not unchanged(cached[0], placements) or not unchanged(cached[1], precollected):
+                cached = self._spheres = placements, precollected, {}
+            if advancement_only not in cached[2]:
+                cached[2][advancement_only] = self._sweep(locations, advancement_only, True)
+            return cached[2][advancement_only]
+
+    def _sweep(self, locations: List[Location], advancement_only: bool, keep_states: bool) -> Spheres:
+        if advancement_only:
+            locations = [location for location in locations if location.advancement]
+        return Spheres(CollectionState(self), locations, advancement_only=advancement_only, keep_states=keep_states)
+
+    def invalidate_spheres(self) -> None:
+        """Drops the shared sphere sweeps, after changes to logic that `get_sphere_sweep` can't notice."""
+        self._spheres = None
+
     def get_spheres(self) -> Iterator[Set[Location]]:
         """
         yields a set of locations for each logical sphere
@@ -586,24 +636,22 @@ class MultiWorld():
         locations is followed by an empty set, and then a set of all of the
         unreachable locations.
         """
-        state = CollectionState(self)
-        locations = set(self.get_filled_locations())
-
-        while locations:
-            sphere: Set[Location] = set()
+        spheres = self.get_sphere_sweep()
+        remaining = len(self.get_filled_locations())
+        if not remaining:
+            return
 
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-            yield sphere
+        for sphere in spheres:
+            sphere = {location for location in sphere if location.item is not None}
             if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
                 break
+            yield sphere
+            remaining -= len(sphere)
+            if not remaining:
+                return
 
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        yield set()
+        yield {location for location in spheres.unreachable() if location.item is not None}
 
     def get_sendable_spheres(self) -> Iterator[Set[Location]]:
         """
@@ -612,41 +660,17 @@ class MultiWorld():
         If there are unreachable locations, the last sphere of reachable locations is followed by an empty set,
         and then a set of all of the unreachable locations.
         """
-        state = CollectionState(self)
-        locations: Set[Location] = set()
-        events: Set[Location] = set()
-        for location in self.get_filled_locations():
-            if type(location.item.code) is int:
-                locations.add(location)
-            else:
-                events.add(location)
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            # cull events out
-            done_events: Set[Union[Location, None]] = {None}
-            while done_events:
-                done_events = set()
-                for event in events:
-                    if event.can_reach(state):
-                        state.collect(event.item, True, event)
-                        done_events.add(event)
-                events -= done_events
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        # events are collected as soon as they are reachable instead of being part of a sphere, which makes for fewer
+        # spheres than the shared sweep has, so this is a sweep of its own
+        filled = self.get_filled_locations()
+        spheres = Spheres(CollectionState(self), [location for location in filled if type(location.item.code) is int],
+                          [location for location in filled if type(location.item.code) is not int])
+        for sphere in spheres:
+            yield set(sphere)
+
+        if spheres.unreachable():
+            yield set()
+            yield set(spheres.unreachable())
 
     def fulfills_accessibility(self, state: Optional[CollectionState] = None):
         """Check if accessibility rules are fulfilled with current or supplied state."""
@@ -706,6 +730,110 @@ class MultiWorld():
         return False
 
 
+class Spheres:
+    """
+    A sweep through the spheres of a multiworld, which computes each sphere once, when it is first iterated to. Several
+    consumers can iterate it at once, also from different threads.
+    """
+    state: CollectionState
+    """state after collecting the spheres computed so far"""
+    spheres: List[Set[Location]]
+    """spheres computed so far, which are never empty and must not be modified"""
+    remaining: Set[Location]
+    """locations not reached so far"""
+    events: Set[Location]
+    """locations collected as soon as they are reachable, instead of being part of a sphere"""
+    advancement_only: bool
+    """whether only the items of advancement locations get collected"""
+    states: Optional[List[CollectionState]]
+    """copies of the state after each sphere, if they are kept, which must not be modified"""
+    beaten_sphere: Optional[int]
+    """number of spheres after which the game is beaten, if it is so far"""
+    complete: bool
+    """whether the remaining locations are known to be unreachable"""
+    _lock: threading.Lock
+
+    def __init__(self, state: CollectionState, locations: Iterable[Location], events: Iterable[Location] = (),
+                 advancement_only: bool = False, keep_states: bool = False) -> None:
+        self.state = state
+        self.spheres = []
+        self.remaining = set(locations)
+        self.events = set(events)
+        self.advancement_only = advancement_only
+        self.states = [] if keep_states else None
+        self.beaten_sphere = 0 if state.multiworld.has_beaten_game(state) else None
+        self.complete = False
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[Set[Location]]:
+        sphere_count = 0
+        while sphere_count < len(self.spheres) or self._compute_sphere(sphere_count):
+            yield self.spheres[sphere_count]
+            sphere_count += 1
+
+    def _compute_sphere(self, sphere_count: int) -> bool:
+        """Computes the sphere after the first `sphere_count`, unless that already happened, and returns if there is
+        one."""
+        with self._lock:
+            if sphere_count < len(self.spheres):
+                return True
+            if self.complete or not self.remaining:
+                self.complete = True
+                return False
+
+            state = self.state
+            done_events: Set[Location] = self.events
+            while done_events:
+                done_events = set()
+                for event in self.events:
+                    if event.can_reach(state):
+                        state.collect(event.item, True, event)
+                        done_events.add(event)
+                self.events -= done_events
+
+            sphere = {location for location in self.remaining if location.can_reach(state)}
+            if not sphere:
+                self.complete = True
+                return False
+
+            for location in sphere:
+                if location.advancement if self.advancement_only else location.item is not None:
+                    state.collect(location.item, True, location)
+            self.remaining -= sphere
+            if self.states is not None:
+                self.states.append(state.copy())
+            # set before the sphere becomes visible to consumers that don't take the lock
+            if self.beaten_sphere is None and state.multiworld.has_beaten_game(state):
+                self.beaten_sphere = len(self.spheres) + 1
+            self.spheres.append(sphere)
+            return True
+
+    def get_sphere(self, sphere_index: int) -> Set[Location]:
+        """Returns the sphere at `sphere_index`, computing the spheres up to it if needed, or an empty set if the sweep
+        ends before it."""
+        while len(self.spheres) <= sphere_index:
+            if not self._compute_sphere(len(self.spheres)):
+                return set()
+        return self.spheres[sphere_index]
+
+    def beaten_by(self, sphere_count: int) -> bool:
+        """Whether the game is beaten after collecting the first `sphere_count` spheres"""
+        return self.beaten_sphere is not None and self.beaten_sphere <= sphere_count
+
+    def beatable(self) -> bool:
+        """Whether the game gets beaten at all, computing only as many spheres as needed to tell."""
+        spheres = iter(self)
+        while self.beaten_sphere is None and next(spheres, None) is not None:
+            pass
+        return self.beaten_sphere is not None
+
+    def unreachable(self) -> Set[Location]:
+        """Completes the sweep and returns the locations it could not reach."""
+        for _ in self:
+            pass
+        return self.remaining
+
+
 PathValue = Tuple[str, Optional["PathValue"]]
 
 
@@ -719,6 +847,8 @@ class CollectionState():
     locations_checked: Set[Location]
     stale: Dict[int, bool]
     allow_partial_entrances: bool
+    shared_region_players: Set[int]
+    """players whose reachable_regions and blocked_connections sets are still shared with a copy of this state"""
     additional_init_functions: List[Callable[[CollectionState, MultiWorld], None]] = []
     additional_copy_functions: List[Callable[[CollectionState, CollectionState], CollectionState]] = []
 
@@ -732,6 +862,7 @@ class CollectionState():
         self.locations_checked = set()
         self.stale = {player: True for player in parent.get_all_ids()}
         self.allow_partial_entrances = allow_partial_entrances
+        self.shared_region_players = set()
         for function in self.additional_init_functions:
             function(self, parent)
         for items in parent.precollected_items.values():
@@ -747,8 +878,9 @@ class CollectionState():
 
         # init on first call - this can't be done on construction since the regions don't exist yet
         if start not in reachable_regions:
+            reachable_regions, blocked_connections = self._get_private_region_sets(player)
             reachable_regions.add(start)
-            self.blocked_connections[player].update(start.exits)
+            blocked_connections.update(start.exits)
             queue.extend(start.exits)
 
         if world.explicit_indirect_conditions:
@@ -764,11 +896,15 @@ class CollectionState():
             connection = queue.popleft()
             new_region = connection.connected_region
             if new_region in reachable_regions:
+                if player in self.shared_region_players:
+                    reachable_regions, blocked_connections = self._get_private_region_sets(player)
                 blocked_connections.remove(connection)
             elif connection.can_reach(self):
                 if self.allow_partial_entrances and not new_region:
                     continue
                 assert new_region, f"tried to search through an Entrance \"{connection}\" with no connected Region"
+                if player in self.shared_region_players:
+                    reachable_regions, blocked_connections = self._get_private_region_sets(player)
                 reachable_regions.add(new_region)
                 blocked_connections.remove(connection)
                 blocked_connections.update(new_region.exits)
@@ -791,11 +927,15 @@ class CollectionState():
                 connection = queue.popleft()
                 new_region = connection.connected_region
                 if new_region in reachable_regions:
+                    if player in self.shared_region_players:
+                        reachable_regions, blocked_connections = self._get_private_region_sets(player)
                     blocked_connections.remove(connection)
                 elif connection.can_reach(self):
                     if self.allow_partial_entrances and not new_region:
                         continue
                     assert new_region, f"tried to search through an Entrance \"{connection}\" with no connected Region"
+                    if player in self.shared_region_players:
+                        reachable_regions, blocked_connections = self._get_private_region_sets(player)
                     reachable_regions.add(new_region)
                     blocked_connections.remove(connection)
                     blocked_connections.update(new_region.exits)
@@ -805,17 +945,32 @@ class CollectionState():
             # sweep for indirect connections, mostly Entrance.can_reach(unrelated_Region)
             queue.extend(blocked_connections)
 
+    def _get_private_region_sets(self, player: int) -> Tuple[Set[Region], Set[Entrance]]:
+        """Returns the region sets of player, copying them first if they are still shared with another state."""
+        if player in self.shared_region_players:
+            self.shared_region_players.remove(player)
+            self.reachable_regions[player] = self.reachable_regions[player].copy()
+            self.blocked_connections[player] = self.blocked_connections[player].copy()
+        return self.reachable_regions[player], self.blocked_connections[player]
+
     def copy(self) -> CollectionState:
-        ret = CollectionState(self.multiworld)
+        # skip __init__, everything it would set up, including collecting precollected items, gets replaced below
+        ret = CollectionState.__new__(CollectionState)
+        ret.multiworld = self.multiworld
         ret.prog_items = {player: counter.copy() for player, counter in self.prog_items.items()}
-        ret.reachable_regions = {player: region_set.copy() for player, region_set in
-                                 self.reachable_regions.items()}
-        ret.blocked_connections = {player: entrance_set.copy() for player, entrance_set in
-                                   self.blocked_connections.items()}
+        # The region sets are only copied once either state changes them, so players that don't get new regions
+        # in the copy don't cost anything.
+        ret.reachable_regions = self.reachable_regions.copy()
+        ret.blocked_connections = self.blocked_connections.copy()
+        self.shared_region_players = set(self.reachable_regions)
+        ret.shared_region_players = set(self.reachable_regions)
         ret.advancements = self.advancements.copy()
         ret.path = self.path.copy()
         ret.locations_checked = self.locations_checked.copy()
+        ret.stale = {player: True for player in self.stale}
         ret.allow_partial_entrances = self.allow_partial_entrances
+        for function in self.additional_init_functions:
+            function(ret, self.multiworld)
         for function in self.additional_copy_functions:
             ret = function(self, ret)
         return ret
@@ -845,74 +1000,87 @@ class CollectionState():
     def can_reach_region(self, spot: str, player: int) -> bool:
         return self.multiworld.get_region(spot, player).can_reach(self)
 
-    def sweep_for_events(self, locations: Optional[Iterable[Location]] = None) -> None:
+    def sweep_for_events(self, locations: Optional[Iterable[Location]] = None) -> List[Location]:
         Utils.deprecate("sweep_for_events has been renamed to sweep_for_advancements. The functionality is the same. "
                         "Please switch over to sweep_for_advancements.")
         return self.sweep_for_advancements(locations)
 
-    def sweep_for_advancements(self, locations: Optional[Iterable[Location]] = None) -> None:
+    def sweep_for_advancements(self, locations: Optional[Iterable[Location]] = None) -> List[Location]:
+        """Collects all reachable advancements and returns the locations collected from, in the order of collection."""
         if locations is None:
             locations = self.multiworld.get_filled_locations()
-        reachable_advancements = True
         # since the loop has a good chance to run more than once, only filter the advancements once
-        locations = {location for location in locations if location.advancement and location not in self.advancements}
+        locations = list(dict.fromkeys(location for location in locations
+                                       if location.advancement and location not in self.advancements))
 
-        while reachable_advancements:
-            reachable_advancements = {location for location in locations if location.can_reach(self)}
-            locations -= reachable_advancements
-            for advancement in reachable_advancements:
-                self.advancements.add(advancement)
-                assert isinstance(advancement.item, Item), "tried to collect Event with no Item"
-                self.collect(advancement.item, True, advancement)
+        # Advancements are collected as soon as they are found reachable, so every location checked later in the same
+        # pass already sees them. Only locations that were still unreachable are checked again on the next pass.
+        collected: List[Location] = []
+        while locations:
+            unreachable_locations: List[Location] = []
+            for location in locations:
+                if location.can_reach(self):
+                    self.advancements.add(location)
+                    assert isinstance(location.item, Item), "tried to collect Event with no Item"
+                    self.collect(location.item, True, location)
+                    collected.append(location)
+                else:
+                    unreachable_locations.append(location)
+            if len(unreachable_locations) == len(locations):
+                break
+            locations = unreachable_locations
+        return collected
 
     # item name related
+    # Counter.get is used instead of indexing, as indexing a Counter with a missing item calls the Python level
+    # Counter.__missing__, which makes misses, the common case in access rules, about twice as slow as hits.
     def has(self, item: str, player: int, count: int = 1) -> bool:
-        return self.prog_items[player][item] >= count
+        return self.prog_items[player].get(item, 0) >= count
 
     # for loops are specifically used in all/any/count methods, instead of all()/any()/sum(), to avoid the overhead of
     # creating and iterating generator instances. In `return all(player_prog_items[item] for item in items)`, the
     # argument to all() would be a new generator instance, for example.
     def has_all(self, items: Iterable[str], player: int) -> bool:
         """Returns True if each item name of items is in state at least once."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         for item in items:
-            if not player_prog_items[item]:
+            if not player_prog_items(item, 0):
                 return False
         return True
 
     def has_any(self, items: Iterable[str], player: int) -> bool:
         """Returns True if at least one item name of items is in state at least once."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         for item in items:
-            if player_prog_items[item]:
+            if player_prog_items(item, 0):
                 return True
         return False
 
     def has_all_counts(self, item_counts: Mapping[str, int], player: int) -> bool:
         """Returns True if each item name is in the state at least as many times as specified."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         for item, count in item_counts.items():
-            if player_prog_items[item] < count:
+            if player_prog_items(item, 0) < count:
                 return False
         return True
 
     def has_any_count(self, item_counts: Mapping[str, int], player: int) -> bool:
         """Returns True if at least one item name is in the state at least as many times as specified."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         for item, count in item_counts.items():
-            if player_prog_items[item] >= count:
+            if player_prog_items(item, 0) >= count:
                 return True
         return False
 
     def count(self, item: str, player: int) -> int:
-        return self.prog_items[player][item]
+        return self.prog_items[player].get(item, 0)
 
     def has_from_list(self, items: Iterable[str], player: int, count: int) -> bool:
         """Returns True if the state contains at least `count` items matching any of the item names from a list."""
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         for item_name in items:
-            found += player_prog_items[item_name]
+            found += player_prog_items(item_name, 0)
             if found >= count:
                 return True
         return False
@@ -921,27 +1089,27 @@ class CollectionState():
         """Returns True if the state contains at least `count` items matching any of the item names from a list.
         Ignores duplicates of the same item."""
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         for item_name in items:
-            found += player_prog_items[item_name] > 0
+            found += player_prog_items(item_name, 0) > 0
             if found >= count:
                 return True
         return False
 
     def count_from_list(self, items: Iterable[str], player: int) -> int:
         """Returns the cumulative count of items from a list present in state."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         total = 0
         for item_name in items:
-            total += player_prog_items[item_name]
+            total += player_prog_items(item_name, 0)
         return total
 
     def count_from_list_unique(self, items: Iterable[str], player: int) -> int:
         """Returns the cumulative count of items from a list present in state. Ignores duplicates of the same item."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         total = 0
         for item_name in items:
-            if player_prog_items[item_name] > 0:
+            if player_prog_items(item_name, 0) > 0:
                 total += 1
         return total
 
@@ -949,9 +1117,9 @@ class CollectionState():
     def has_group(self, item_name_group: str, player: int, count: int = 1) -> bool:
         """Returns True if the state contains at least `count` items present in a specified item group."""
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]:
-            found += player_prog_items[item_name]
+            found += player_prog_items(item_name, 0)
             if found >= count:
                 return True
         return False
@@ -961,27 +1129,27 @@ class CollectionState():
         Ignores duplicates of the same item.
         """
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]:
-            found += player_prog_items[item_name] > 0
+            found += player_prog_items(item_name, 0) > 0
             if found >= count:
                 return True
         return False
 
     def count_group(self, item_name_group: str, player: int) -> int:
         """Returns the cumulative count of items from an item group present in state."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         return sum(
-            player_prog_items[item_name]
+            player_prog_items(item_name, 0)
             for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]
         )
 
     def count_group_unique(self, item_name_group: str, player: int) -> int:
         """Returns the cumulative count of items from an item group present in state.
         Ignores duplicates of the same item."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = self.prog_items[player].get
         return sum(
-            player_prog_items[item_name] > 0
+            player_prog_items(item_name, 0) > 0
             for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]
         )
 
@@ -1005,6 +1173,7 @@ class CollectionState():
             # invalidate caches, nothing can be trusted anymore now
             self.reachable_regions[item.player] = set()
             self.blocked_connections[item.player] = set()
+            self.shared_region_players.discard(item.player)
             self.stale[item.player] = True
 
 
@@ -1474,24 +1643,25 @@ class Spoiler:
         # get locations containing progress items
         multiworld = self.multiworld
         prog_locations = {location for location in multiworld.get_filled_locations() if location.item.advancement}
-        state_cache: List[Optional[CollectionState]] = [None]
         collection_spheres: List[Set[Location]] = []
-        state = CollectionState(multiworld)
+        # culling checks pass a state, as every item they remove would make the shared sweep be computed anew
+        state_cache: List[CollectionState] = [CollectionState(multiworld)]
         sphere_candidates = set(prog_locations)
+        # the sweep of the progress items, which is shared with can_beat_game
+        spheres = multiworld.get_sphere_sweep(advancement_only=True, keep_states=True)
+        cached_spheres = enumerate(spheres)
         logging.debug('Building up collection spheres.')
         while sphere_candidates:
 
             # build up spheres of collection radius.
             # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
 
-            sphere = {location for location in sphere_candidates if state.can_reach(location)}
-
-            for location in sphere:
-                state.collect(location.item, True, location)
+            sphere_index, cached_sphere = next(cached_spheres, (0, set()))
+            sphere = set(cached_sphere)  # copied, as it gets culled below
 
             sphere_candidates -= sphere
             collection_spheres.append(sphere)
-            state_cache.append(state.copy())
+            state_cache.append(spheres.states[sphere_index] if sphere else state_cache[-1])
 
             logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
                           len(sphere),
@@ -1510,23 +1680,58 @@ class Spoiler:
         # in the second phase, we cull each sphere such that the game is still beatable,
         # reducing each range of influence to the bare minimum required inside it
         restore_later: Dict[Location, Item] = {}
-        for num, sphere in reversed(tuple(enumerate(collection_spheres))):
-            to_delete: Set[Location] = set()
-            for location in sphere:
-                # we remove the item at location and check if game is still beatable
-                logging.debug('Checking if %s (Player %d) is required to beat the game.', location.item.name,
-                              location.item.player)
-                old_item = location.item
+
+        def remove_if_beatable(locations: List[Location], start_state: CollectionState) -> bool:
+            # we remove the items at locations and check if game is still beatable
+            logging.debug('Checking if %i items, starting with %s (Player %d), are required to beat the game.',
+                          len(locations), locations[0].item.name, locations[0].item.player)
+            old_items = [location.item for location in locations]
+            for location in locations:
                 location.item = None
-                if multiworld.can_beat_game(state_cache[num]):
-                    to_delete.add(location)
-                    restore_later[location] = old_item
-                else:
-                    # still required, got to keep it around
-                    location.item = old_item
+            if multiworld.can_beat_game(start_state):
+                restore_later.update(zip(locations, old_items))
+                return True
+            # still required, got to keep them around
+            for location, old_item in zip(locations, old_items):
+                location.item = old_item
+            return False
+
+        # The items of each sphere are checked in order, with the same outcome as checking them one at a time.
+        # Removing items never makes the game easier to beat, so if it can be beaten without a batch of items, each of
+        # them would have been removed on its own. If it can't, the first required item of the batch is found by
+        # bisection. Batches are sized by how many of the items checked so far turned out to be required.
+        checked_count, required_count = 2, 1
+        for num, sphere in reversed(tuple(enumerate(collection_spheres))):
+            if multiworld.has_beaten_game(state_cache[num]):
+                # the game is beaten before this sphere, none of its items are required
+                restore_later.update((location, location.item) for location in sphere)
+                for location in sphere:
+                    location.item = None
+                sphere.clear()
+                continue
+            locations = list(sphere)
+            index = 0
+            while index < len(locations):
+                batch_size = 1 << max(0, ((checked_count - required_count) // required_count).bit_length() - 1)
+                batch = locations[index:index + batch_size]
+                if remove_if_beatable(batch, state_cache[num]):
+                    checked_count += len(batch)
+                    index += len(batch)
+                    continue
+                # the items from start to end are known to hold a required item
+                start, end = index, index + len(batch)
+                while end - start > 1:
+                    middle = (start + end) // 2
+                    if remove_if_beatable(locations[start:middle], state_cache[num]):
+                        start = middle
+                    else:
+                        end = middle
+                checked_count += start + 1 - index
+                required_count += 1
+                index = start + 1
 
             # cull entries in spheres for spoiler walkthrough at end
-            sphere -= to_delete
+            sphere.difference_update(restore_later)
 
         # second phase, sphere 0
         removed_precollected: List[Item] = []
@@ -1540,7 +1745,7 @@ class Spoiler:
                 logging.debug('Checking if %s (Player %d) is required to beat the game.', item.name, item.player)
                 precollected_items.remove(item)
                 multiworld.state.remove(item)
-                if not multiworld.can_beat_game():
+                if not multiworld.can_beat_game(CollectionState(multiworld)):
                     # Add the item back into `precollected_items` and collect it into `multiworld.state`.
                     multiworld.push_precollected(item)
                 else:
@@ -1,10 +1,11 @@
 import collections
 import itertools
 import logging
+import math
 import typing
 from collections import Counter, deque
 
-from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld
+from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, Spheres
 from Options import Accessibility
 
 from worlds.AutoWorld import call_all
@@ -20,8 +21,12 @@ class FillError(RuntimeError):
         super().__init__(*args)
 
 
-def _log_fill_progress(name: str, placed: int, total_items: int) -> None:
-    logging.info(f"Current fill step ({name}) at {placed}/{total_items} items placed.")
+def _log_fill_progress(name: str, placed: int, total_items: int, swaps: int = 0, swap_sweeps: int = 0) -> None:
+    if swaps or swap_sweeps:
+        logging.info(f"Current fill step ({name}) at {placed}/{total_items} items placed, "
+                     f"{swaps} items swapped using {swap_sweeps} sweeps.")
+    else:
+        logging.info(f"Current fill step ({name}) at {placed}/{total_items} items placed.")
 
 
 def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item] = tuple(),
@@ -33,6 +38,56 @@ def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item]
     return new_state
 
 
+def _sweep_in_order(base_state: CollectionState, itempool: typing.Sequence[Item],
+                    locations: typing.Optional[typing.List[Location]] = None
+                    ) -> typing.Tuple[CollectionState, typing.Dict[Location, int]]:
+    """Like sweep_from_pool, but also returns the position in which each location was collected from."""
+    # an empty list of locations only collects itempool
+    new_state = sweep_from_pool(base_state, itempool, [])
+    collected = new_state.sweep_for_advancements(locations)
+    return new_state, {location: position for position, location in enumerate(collected)}
+
+
+def _get_swap_state(shared_sweep: typing.Tuple[CollectionState, typing.Dict[Location, int]], location: Location,
+                    base_state: CollectionState, itempool: typing.Sequence[Item], unsafe: bool,
+                    locations: typing.Optional[typing.List[Location]] = None) -> CollectionState:
+    """
+    Returns the state swept from itempool, without the item placed at location, and with it if unsafe.
+    shared_sweep is the sweep from itempool with the item still placed, which is shared between all locations.
+    If it never collected the item of location, removing that item can't change it, so it is returned as is, or it is
+    continued with the item collected if unsafe. Otherwise, everything it collected before that item was reachable
+    without it, so that is collected again without checking access rules and only the rest is swept.
+    """
+    shared_state, collected_positions = shared_sweep
+    position = collected_positions.get(location)
+    placed_item = location.item
+    if position is None:
+        if not unsafe:
+            return shared_state
+        swap_state = shared_state.copy()
+        swap_state.collect(placed_item, True)
+    else:
+        swap_state = sweep_from_pool(base_state, [placed_item, *itempool] if unsafe else itempool, [])
+        for collected_location in itertools.islice(collected_positions, position):
+            swap_state.advancements.add(collected_location)
+            swap_state.collect(collected_location.item, True, collected_location)
+    location.item = None
+    try:
+        swap_state.sweep_for_advancements(locations)
+    finally:
+        location.item = placed_item
+    return swap_state
+
+
+def _count_reachable_locations(multiworld: MultiWorld, state: CollectionState, item: Item) -> typing.Tuple[int, int]:
+    """Returns the number of reachable locations before and after collecting item into state, which is mutated."""
+    prev_loc_count = len(multiworld.get_reachable_locations(state))
+    if not state.collect(item, True):
+        # nothing changed, so there is no need to scan again
+        return prev_loc_count, prev_loc_count
+    return prev_loc_count, len(multiworld.get_reachable_locations(state))
+
+
 def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locations: typing.List[Location],
                      item_pool: typing.List[Item], single_player_placement: bool = False, lock: bool = False,
                      swap: bool = True, on_place: typing.Optional[typing.Callable[[Location], None]] = None,
@@ -55,6 +110,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     placements: typing.List[Location] = []
     cleanup_required = False
     swapped_items: typing.Counter[typing.Tuple[int, str, bool]] = Counter()
+    swap_sweeps = 0
     reachable_items: typing.Dict[int, typing.Deque[Item]] = {}
     for item in item_pool:
         reachable_items.setdefault(item.player, deque()).append(item)
@@ -85,6 +141,10 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             if single_player_placement else None)
 
         has_beaten_game = multiworld.has_beaten_game(maximum_exploration_state)
+        # maximum_exploration_state does not change while this round's items are placed, so location reachability
+        # is only checked once per round instead of once per item and location.
+        # It can't be kept across rounds, as the next state no longer contains the next round's items.
+        reachable_locations: typing.Dict[Location, bool] = {}
 
         while items_to_place:
             # if we have run out of locations to fill,break out of this loop
@@ -104,8 +164,19 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                 perform_access_check = True
 
             for i, location in enumerate(locations):
-                if (not single_player_placement or location.player == item_to_place.player) \
-                        and location.can_fill(maximum_exploration_state, item_to_place, perform_access_check):
+                if single_player_placement and location.player != item_to_place.player:
+                    continue
+                if perform_access_check and location.always_allow is Location.always_allow:
+                    # without always_allow, can_fill can only be True for reachable locations
+                    reachable = reachable_locations.get(location)
+                    if reachable is None:
+                        reachable = reachable_locations[location] = location.can_reach(maximum_exploration_state)
+                    if not reachable:
+                        continue
+                    can_fill = location.can_fill(maximum_exploration_state, item_to_place, False)
+                else:
+                    can_fill = location.can_fill(maximum_exploration_state, item_to_place, perform_access_check)
+                if can_fill:
                     # popping by index is faster than removing by content,
                     spot_to_fill = locations.pop(i)
                     # skipping a scan for the element
@@ -118,6 +189,9 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                     swap_attempts = ((i, location, unsafe)
                                      for unsafe in (False, True)
                                      for i, location in enumerate(placements))
+                    # the sweep with all placements in place is shared by all candidates, see _get_swap_state
+                    shared_sweep: typing.Optional[typing.Tuple[CollectionState, typing.Dict[Location, int]]] = None
+                    shared_loc_counts: typing.Optional[typing.Tuple[int, int]] = None
                     for (i, location, unsafe) in swap_attempts:
                         placed_item = location.item
                         # Unplaceable items can sometimes be swapped infinitely. Limit the
@@ -125,26 +199,37 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                         swap_count = swapped_items[placed_item.player, placed_item.name, unsafe]
                         if swap_count > 1:
                             continue
+                        if single_player_placement and location.player != item_to_place.player:
+                            continue
+                        # the item rule does not depend on the state, so it can reject a swap without a sweep
+                        if location.always_allow is Location.always_allow \
+                                and not location.can_fill(maximum_exploration_state, item_to_place, False):
+                            continue
 
-                        location.item = None
-                        placed_item.location = None
-                        swap_state = sweep_from_pool(base_state, [placed_item, *item_pool] if unsafe else item_pool,
-                                                     multiworld.get_filled_locations(item.player)
-                                                     if single_player_placement else None)
+                        filled_locations = multiworld.get_filled_locations(item.player) \
+                            if single_player_placement else None
+                        if shared_sweep is None:
+                            shared_sweep = _sweep_in_order(base_state, item_pool, filled_locations)
+                            swap_sweeps += 1
+                        swap_state = _get_swap_state(shared_sweep, location, base_state, item_pool, unsafe,
+                                                     filled_locations)
+                        swap_sweeps += swap_state is not shared_sweep[0]
                         # unsafe means swap_state assumes we can somehow collect placed_item before item_to_place
                         # by continuing to swap, which is not guaranteed. This is unsafe because there is no mechanic
                         # to clean that up later, so there is a chance generation fails.
-                        if (not single_player_placement or location.player == item_to_place.player) \
-                                and location.can_fill(swap_state, item_to_place, perform_access_check):
+                        location.item = None
+                        placed_item.location = None
+                        if location.can_fill(swap_state, item_to_place, perform_access_check):
 
                             # Verify placing this item won't reduce available locations, which would be a useless swap.
-                            prev_state = swap_state.copy()
-                            prev_loc_count = len(
-                                multiworld.get_reachable_locations(prev_state))
-
-                            swap_state.collect(item_to_place, True)
-                            new_loc_count = len(
-                                multiworld.get_reachable_locations(swap_state))
+                            if swap_state is not shared_sweep[0]:
+                                prev_loc_count, new_loc_count = \
+                                    _count_reachable_locations(multiworld, swap_state, item_to_place)
+                            else:
+                                if shared_loc_counts is None:
+                                    shared_loc_counts = \
+                                        _count_reachable_locations(multiworld, swap_state.copy(), item_to_place)
+                                prev_loc_count, new_loc_count = shared_loc_counts
 
                             if new_loc_count >= prev_loc_count:
                                 # Add this item to the existing placement, and
@@ -179,12 +264,12 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             placements.append(spot_to_fill)
             placed += 1
             if not placed % 1000:
-                _log_fill_progress(name, placed, total)
+                _log_fill_progress(name, placed, total, swapped_items.total(), swap_sweeps)
             if on_place:
                 on_place(spot_to_fill)
 
     if total > 1000:
-        _log_fill_progress(name, placed, total)
+        _log_fill_progress(name, placed, total, swapped_items.total(), swap_sweeps)
 
     if cleanup_required:
         # validate all placements and remove invalid ones
@@ -304,10 +389,10 @@ def remaining_fill(multiworld: MultiWorld,
         placements.append(spot_to_fill)
         placed += 1
         if not placed % 1000:
-            _log_fill_progress(name, placed, total)
+            _log_fill_progress(name, placed, total, swapped_items.total())
 
     if total > 1000:
-        _log_fill_progress(name, placed, total)
+        _log_fill_progress(name, placed, total, swapped_items.total())
 
     if unplaced_items and locations:
         # There are leftover unplaceable items and locations that won't accept them
@@ -697,6 +782,10 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
         }
         sphere_num: int = 1
         moved_item_count: int = 0
+        # The sweep from the current state is shared by the main loop and the balancing lookahead, and only gets
+        # computed anew when items get moved. It keeps the state after each sphere to test candidates from.
+        spheres = Spheres(state.copy(), unchecked_locations, advancement_only=True, keep_states=True)
+        sphere_index: int = 0
 
         def get_sphere_locations(sphere_state: CollectionState,
                                  locations: typing.Set[Location]) -> typing.Set[Location]:
@@ -705,15 +794,59 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
         def item_percentage(player: int, num: int) -> float:
             return num / total_locations_count[player]
 
+        def get_required_items(player: int, base_state: CollectionState, items_to_test: typing.List[Location],
+                               locations_to_test: typing.Set[Location], beaten: bool) -> typing.List[Location]:
+            # Tests the candidates from last to first, keeping those without which the player would fall below the
+            # threshold, or the game would no longer be beaten, with all untested and kept candidates collected.
+            # Only depends on the player's own candidates, so players can be tested independently of each other.
+            # Testing a candidate starts from a prefix state with all candidates before it collected, so it only
+            # needs to collect the ones kept so far, instead of all of them. To not hold a state per candidate, only
+            # every step-th prefix state is kept as a checkpoint, and the prefix states of a block of step candidates
+            # are built from its checkpoint when the block gets tested.
+            step = max(1, math.isqrt(len(items_to_test)))
+            checkpoints = [base_state]
+            for block_start in range(step, len(items_to_test), step):
+                checkpoint = checkpoints[-1].copy()
+                for location in items_to_test[block_start - step:block_start]:
+                    checkpoint.collect(location.item, True, location)
+                checkpoints.append(checkpoint)
+
+            required_items: typing.List[Location] = []
+            prefix_states: typing.List[CollectionState] = []
+            for index in reversed(range(len(items_to_test))):
+                testing = items_to_test[index]
+                if not prefix_states:
+                    prefix_states.append(checkpoints.pop())
+                    for location in items_to_test[index - index % step:index]:
+                        prefix_state = prefix_states[-1].copy()
+                        prefix_state.collect(location.item, True, location)
+                        prefix_states.append(prefix_state)
+                reducing_state = prefix_states.pop().copy()
+                for location in required_items:
+                    reducing_state.collect(location.item, True, location)
+
+                reducing_state.sweep_for_advancements(locations=locations_to_test)
+
+                if beaten:
+                    if not multiworld.has_beaten_game(reducing_state):
+                        required_items.append(testing)
+                else:
+                    reduced_sphere = get_sphere_locations(reducing_state, locations_to_test)
+                    p = item_percentage(player, reachable_locations_count[player] + len(reduced_sphere))
+                    if p < threshold_percentages[player]:
+                        required_items.append(testing)
+            return required_items
+
         # If there are no locations that aren't locked, there's no point in attempting to balance progression.
         if len(total_locations_count) == 0:
             return
 
         while True:
+            old_moved_item_count = moved_item_count
             # Gather non-locked locations.
             # This ensures that only shuffled locations get counted for progression balancing,
             #   i.e. the items the players will be checking.
-            sphere_locations = get_sphere_locations(state, unchecked_locations)
+            sphere_locations = set(spheres.get_sphere(sphere_index))
             for location in sphere_locations:
                 unchecked_locations.remove(location)
                 if not location.locked:
@@ -743,16 +876,13 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                         and item_percentage(player, reachables) < threshold_percentages[player])
                 }
                 if balancing_players:
-                    balancing_state = state.copy()
-                    balancing_unchecked_locations = unchecked_locations.copy()
+                    balancing_index = sphere_index
                     balancing_reachables = reachable_locations_count.copy()
-                    balancing_sphere = sphere_locations.copy()
                     candidate_items: typing.Dict[int, typing.Set[Location]] = collections.defaultdict(set)
                     while True:
                         # Check locations in the current sphere and gather progression items to swap earlier
-                        for location in balancing_sphere:
+                        for location in spheres.get_sphere(balancing_index):
                             if location.advancement:
-                                balancing_state.collect(location.item, True, location)
                                 player = location.item.player
                                 # only replace items that end up in another player's world
                                 if (not location.locked and not location.item.skip_in_prog_balancing and
@@ -761,50 +891,33 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                                         location.progress_type != LocationProgressType.PRIORITY):
                                     candidate_items[player].add(location)
                                     logging.debug(f"Candidate item: {location.name}, {location.item.name}")
-                        balancing_sphere = get_sphere_locations(balancing_state, balancing_unchecked_locations)
+                        balancing_index += 1
+                        balancing_sphere = spheres.get_sphere(balancing_index)
                         for location in balancing_sphere:
-                            balancing_unchecked_locations.remove(location)
                             if not location.locked:
                                 balancing_reachables[location.player] += 1
-                        if multiworld.has_beaten_game(balancing_state) or all(
+                        if spheres.beaten_by(balancing_index) or all(
                                 item_percentage(player, reachables) >= threshold_percentages[player]
                                 for player, reachables in balancing_reachables.items()
                                 if player in threshold_percentages):
                             break
                         elif not balancing_sphere:
                             raise RuntimeError('Not all required items reachable. Something went terribly wrong here.')
+                    balancing_beaten = spheres.beaten_by(balancing_index)
                     # Gather a set of locations which we can swap items into
                     unlocked_locations: typing.Dict[int, typing.Set[Location]] = collections.defaultdict(set)
-                    for l in unchecked_locations:
-                        if l not in balancing_unchecked_locations:
+                    for sphere in spheres.spheres[sphere_index + 1:balancing_index + 1]:
+                        for l in sphere:
                             unlocked_locations[l.player].add(l)
+                    # the state before the current sphere, which has already been used to compute it
+                    base_state = spheres.states[sphere_index - 1] if sphere_index else state
                     items_to_replace: typing.List[Location] = []
                     for player in balancing_players:
-                        locations_to_test = unlocked_locations[player]
                         items_to_test = list(candidate_items[player])
                         items_to_test.sort()
                         multiworld.random.shuffle(items_to_test)
-                        while items_to_test:
-                            testing = items_to_test.pop()
-                            reducing_state = state.copy()
-                            for location in itertools.chain((
-                                l for l in items_to_replace
-                                if l.item.player == player
-                            ), items_to_test):
-                                reducing_state.collect(location.item, True, location)
-
-                            reducing_state.sweep_for_advancements(locations=locations_to_test)
-
-                            if multiworld.has_beaten_game(balancing_state):
-                                if not multiworld.has_beaten_game(reducing_state):
-                                    items_to_replace.append(testing)
-                            else:
-                                reduced_sphere = get_sphere_locations(reducing_state, locations_to_test)
-                                p = item_percentage(player, reachable_locations_count[player] + len(reduced_sphere))
-                                if p < threshold_percentages[player]:
-                                    items_to_replace.append(testing)
-
-                    old_moved_item_count = moved_item_count
+                        items_to_replace += get_required_items(player, base_state, items_to_test,
+                                                               unlocked_locations[player], balancing_beaten)
 
                     # sort then shuffle to maintain deterministic behaviour,
                     # while allowing use of set for better algorithm growth behaviour elsewhere
@@ -842,6 +955,11 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                 if location.advancement:
                     state.collect(location.item, True, location)
             checked_locations |= sphere_locations
+            if moved_item_count > old_moved_item_count:
+                spheres = Spheres(state.copy(), unchecked_locations, advancement_only=True, keep_states=True)
+                sphere_index = 0
+            else:
+                sphere_index += 1
 
             if multiworld.has_beaten_game(state):
                 break
@@ -860,6 +978,7 @@ def swap_location_item(location_1: Location, location_2: Location, check_locked:
     location_2.item, location_1.item = location_1.item, location_2.item
     location_1.item.location = location_1
     location_2.item.location = location_2
+    location_1.parent_region.multiworld.invalidate_spheres()
 
 
 def distribute_planned(multiworld: MultiWorld) -> None:
@@ -1,12 +1,11 @@
 import collections
 import concurrent.futures
+import contextlib
 import logging
 import os
-import pickle
 import tempfile
 import time
 import zipfile
-import zlib
 from typing import Dict, List, Optional, Set, Tuple, Union
 
 import worlds
@@ -14,7 +13,7 @@ from BaseClasses import CollectionState, Item, Location, LocationProgressType, M
 from Fill import FillError, balance_multiworld_progression, distribute_items_restrictive, distribute_planned, \
     flood_items
 from Options import StartInventoryPool
-from Utils import __version__, output_path, version_tuple, get_settings
+from Utils import __version__, compress_multidata, output_path, version_tuple, get_settings
 from settings import get_settings
 from worlds import AutoWorld
 from worlds.generic.Rules import exclusion_rules, locality_rules
@@ -216,6 +215,8 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
 
     # we're about to output using multithreading, so we're removing the global random state to prevent accidental use
     multiworld.random.passthrough = False
+    # logic doesn't change anymore, so the output and the spoiler can share one sphere sweep
+    multiworld.share_spheres = True
 
     if args.skip_output:
         logger.info('Done. Skipped output/spoiler generation. Total Time: %s', time.perf_counter() - start)
@@ -228,14 +229,29 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     with output as temp_dir:
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
-        with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
+        processes = get_settings().generator.processes
+        process_players = [player for player in AutoWorld.get_process_players(multiworld, "generate_output", processes)
+                           if player in output_players]
+        process_pool_context = AutoWorld.process_pool(multiworld, min(processes, len(process_players))) \
+            if process_players else contextlib.nullcontext()
+        with process_pool_context as process_pool, \
+                concurrent.futures.ThreadPoolExecutor(len(output_players) - len(process_players) + 2) as pool:
+            if process_players:
+                # the worker processes get forked on the first submit, so the stage runs before to share what it
+                # prepares, like base roms loaded through APProcedurePatch.get_source_data_with_cache, with them
+                AutoWorld.call_stage(multiworld, "generate_output", temp_dir)
+                output_file_futures = [AutoWorld.submit_process(process_pool, "generate_output", player, temp_dir)
+                                       for player in process_players]
+            else:
+                output_file_futures = [pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir)]
+
             check_accessibility_task = pool.submit(multiworld.fulfills_accessibility)
 
-            output_file_futures = [pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir)]
             for player in output_players:
                 # skip starting a thread for methods that say "pass".
-                output_file_futures.append(
-                    pool.submit(AutoWorld.call_single, multiworld, "generate_output", player, temp_dir))
+                if player not in process_players:
+                    output_file_futures.append(
+                        pool.submit(AutoWorld.call_single, multiworld, "generate_output", player, temp_dir))
 
             # collect ER hint info
             er_hint_data: Dict[int, Dict[int, str]] = {}
@@ -339,10 +355,9 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
                 }
                 AutoWorld.call_all(multiworld, "modify_multidata", multidata)
 
-                multidata = zlib.compress(pickle.dumps(multidata), 9)
+                multidata = compress_multidata(multidata)
 
                 with open(os.path.join(temp_dir, f'{outfilebase}.archipelago'), 'wb') as f:
-                    f.write(bytes([3]))  # version of format
                     f.write(multidata)
 
             output_file_futures.append(pool.submit(write_multidata))
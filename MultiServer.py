@@ -43,7 +43,7 @@ import NetUtils
 import Utils
 from Utils import version_tuple, restricted_loads, Version, async_start, get_intended_text
 from NetUtils import Endpoint, ClientStatus, NetworkItem, decode, encode, NetworkPlayer, Permission, NetworkSlot, \
-    SlotType, LocationStore, Hint, HintStatus
+    SlotType, LocationStore, Hint, HintStatus, ReceivedItems, ReceivedItemsView
 from BaseClasses import ItemClassification
 
 min_client_version = Version(0, 1, 6)
@@ -162,6 +162,40 @@ class Client(Endpoint):
 
 team_slot = typing.Tuple[int, int]
 
+# encoded game data packages by checksum, shared by all rooms of the process. Least recently used ones are dropped
+# beyond the max size, so that packages no room uses anymore don't pile up in long running processes.
+encoded_game_packages: typing.OrderedDict[str, str] = collections.OrderedDict()
+encoded_game_packages_max_size = 512
+
+
+class SavedState(typing.NamedTuple):
+    """What a save contained, so that the next one only needs to write what changed, see Context.get_save_delta."""
+    received_counts: typing.Dict[team_slot, int]
+    check_counts: typing.Dict[team_slot, int]
+    hint_keys: typing.Set[team_slot]
+    stored_data_keys: typing.Set[str]
+    values: typing.Dict[str, typing.Any]
+    """the parts that are saved in full, see Context.get_save_values"""
+
+
+class LocationBitmaps(typing.Dict[team_slot, bytearray]):
+    """
+    Context.location_checks as bitmaps in LocationStore order, for the LocationStore queries of checked locations.
+    Created from location_checks on first use, then updated by register_location_checks.
+    """
+    ctx: Context
+
+    def __init__(self, ctx: Context):
+        super().__init__()
+        self.ctx = ctx
+
+    def __missing__(self, key: team_slot) -> bytearray:
+        team, slot = key
+        bitmap = self.ctx.locations.new_bitmap(slot)
+        self.ctx.locations.set_checked(bitmap, slot, self.ctx.location_checks[key])
+        self[key] = bitmap
+        return bitmap
+
 
 class Context:
     dumper = staticmethod(encode)
@@ -181,9 +215,10 @@ class Context:
     endpoints: list[Client]
     locations: LocationStore  # typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]]
     location_checks: typing.Dict[typing.Tuple[int, int], typing.Set[int]]
+    location_bitmaps: LocationBitmaps
     hints_used: typing.Dict[typing.Tuple[int, int], int]
     groups: typing.Dict[int, typing.Set[int]]
-    save_version = 2
+    save_version = 3
     stored_data: typing.Dict[str, object]
     read_data: typing.Dict[str, object]
     stored_data_notification_clients: typing.Dict[str, typing.Set[Client]]
@@ -226,14 +261,19 @@ class Context:
         self.password = password
         self.server = None
         self.countdown_timer = 0
-        self.received_items = {}
+        self.received_items: typing.Dict[team_slot, ReceivedItems] = {}
+        self.new_item_receivers: typing.Set[team_slot] = set()  # slots with items not yet sent to their clients
+        self.send_new_items_handle: typing.Optional[asyncio.Handle] = None
         self.start_inventory = {}
         self.name_aliases: typing.Dict[team_slot, str] = {}
         self.location_checks = collections.defaultdict(set)
+        self.location_bitmaps = LocationBitmaps(self)
         self.hint_cost = hint_cost
         self.location_check_points = location_check_points
         self.hints_used = collections.defaultdict(int)
         self.hints: typing.Dict[team_slot, typing.Set[Hint]] = collections.defaultdict(set)
+        # (team, finding_player, location) -> hints, contains at least every hint that is in self.hints
+        self.hint_index: typing.Dict[typing.Tuple[int, int, int], typing.Set[Hint]] = collections.defaultdict(set)
         self.release_mode: str = release_mode
         self.remaining_mode: str = remaining_mode
         self.collect_mode: str = collect_mode
@@ -252,6 +292,14 @@ class Context:
         self.auto_save_interval = 60  # in seconds
         self.auto_saver_thread: typing.Optional[threading.Thread] = None
         self.save_dirty = False
+        # saves are a snapshot and a journal of changes made since, which is compacted into a new snapshot once it
+        # gets larger than the snapshot
+        self.snapshot_id = 0
+        self.snapshot_size = 0
+        self.journal_size = 0
+        self.saved_state = SavedState({}, {}, set(), set(), {})
+        self.changed_stored_data: typing.Set[str] = set()
+        self.changed_hints: typing.Set[team_slot] = set()
         self.tags = ['AP']
         self.games: typing.Dict[int, str] = {}
         self.minimum_client_versions: typing.Dict[int, Version] = {}
@@ -322,6 +370,26 @@ class Context:
     def location_names_for_game(self, game: str) -> typing.Optional[typing.Dict[str, int]]:
         return self.gamespackage[game]["location_name_to_id"] if game in self.gamespackage else None
 
+    def get_encoded_game_package(self, game: str) -> str:
+        game_package = self.gamespackage[game]
+        checksum = game_package.get("checksum")
+        if checksum is None:
+            return self.dumper(game_package)
+        encoded = encoded_game_packages.get(checksum)
+        if encoded is None:
+            encoded = encoded_game_packages[checksum] = self.dumper(game_package)
+            if len(encoded_game_packages) > encoded_game_packages_max_size:
+                encoded_game_packages.popitem(last=False)
+        else:
+            encoded_game_packages.move_to_end(checksum)
+        return encoded
+
+    def get_encoded_data_package(self, games: typing.Iterable[str]) -> str:
+        """Encoded DataPackage message for games, spliced together from the encoded game packages.
+        Results in the same message as dumper([{"cmd": "DataPackage", "data": {"games": {...}}}])."""
+        return '[{"cmd":"DataPackage","data":{"games":{' + \
+            ",".join(f"{self.dumper(game)}:{self.get_encoded_game_package(game)}" for game in games) + "}}}]"
+
     # General networking
     async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[dict]) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
@@ -434,11 +502,8 @@ class Context:
         self.data_filename = multidatapath
 
     @staticmethod
-    def decompress(data: bytes) -> dict:
-        format_version = data[0]
-        if format_version > 3:
-            raise Utils.VersionException("Incompatible multidata.")
-        return restricted_loads(zlib.decompress(data[1:]))
+    def decompress(data: bytes) -> typing.MutableMapping[str, typing.Any]:
+        return Utils.decompress_multidata(data)
 
     def _load(self, decoded_obj: dict, game_data_packages: typing.Dict[str, typing.Any],
               use_embedded_server_options: bool):
@@ -479,9 +544,9 @@ class Context:
         self.random.seed(self.seed_name)
         self.connect_names = decoded_obj['connect_names']
         self.locations = LocationStore(decoded_obj.pop("locations"))  # pre-emptively free memory
-        self.slot_data = decoded_obj['slot_data']
-        for slot, data in self.slot_data.items():
-            self.read_data[f"slot_data_{slot}"] = lambda data=data: data
+        self.slot_data = decoded_obj['slot_data']  # with format 4, each slot is only loaded once it is read
+        for slot in self.slot_data:
+            self.read_data[f"slot_data_{slot}"] = lambda slot=slot: self.slot_data[slot]
         self.er_hint_data = {int(player): {int(address): name for address, name in loc_data.items()}
                              for player, loc_data in decoded_obj["er_hint_data"].items()}
 
@@ -491,6 +556,8 @@ class Context:
 
         for slot, hints in decoded_obj["precollected_hints"].items():
             self.hints[0, slot].update(hints)
+            self.index_hints(0, hints)
+            self.changed_hints.add((0, slot))
 
         # declare slots that aren't players as done
         for slot, slot_info in self.slot_info.items():
@@ -535,17 +602,71 @@ class Context:
 
         return False
 
+    @property
+    def journal_filename(self) -> str:
+        return self.save_filename + ".journal"
+
     def _save(self, exit_save: bool = False) -> bool:
+        save_data, saved_state = self.get_save_delta()
         try:
-            encoded_save = pickle.dumps(self.get_save())
-            with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+            if not self.snapshot_size or self.journal_size > self.snapshot_size:
+                save_data = self.get_save()
+                # leave items received after the delta was made to the next journal entry
+                save_data["received_items"] = {key: self.received_items[key].copy(0, count)
+                                               for key, count in saved_state.received_counts.items()}
+                save_data["snapshot_id"] = self.snapshot_id + 1
+                snapshot = zlib.compress(pickle.dumps(save_data))
+                with open(self.save_filename, "wb") as f:
+                    f.write(snapshot)
+                # a journal of an older snapshot is ignored, so this can't replay changes twice if it fails
+                with open(self.journal_filename, "wb"):
+                    pass
+                self.snapshot_id += 1
+                self.snapshot_size = len(snapshot)
+                self.journal_size = 0
+            elif save_data:  # nothing to append otherwise
+                save_data["snapshot_id"] = self.snapshot_id
+                entry = zlib.compress(pickle.dumps(save_data))
+                with open(self.journal_filename, "ab") as f:
+                    f.write(len(entry).to_bytes(4, "big") + entry)
+                self.journal_size += 4 + len(entry)
         except Exception as e:
+            self.changed_stored_data |= saved_state.stored_data_keys
+            self.changed_hints |= saved_state.hint_keys
             self.logger.exception(e)
             return False
         else:
+            self.set_saved_state(saved_state)
             return True
 
+    def _load_save(self) -> None:
+        with open(self.save_filename, 'rb') as f:
+            snapshot = f.read()
+        save_data = restricted_loads(zlib.decompress(snapshot))
+        self.snapshot_id = save_data.get("snapshot_id", 0)
+        self.snapshot_size = len(snapshot)
+        journal: typing.List[dict] = []
+        try:
+            with open(self.journal_filename, 'rb') as f:
+                entries = f.read()
+        except FileNotFoundError:
+            entries = b""
+        position = 0
+        while position < len(entries):
+            size = int.from_bytes(entries[position:position + 4], "big")
+            entry = entries[position + 4:position + 4 + size]
+            if position + 4 > len(entries) or len(entry) < size:
+                self.logger.warning("Ignoring incomplete last entry of the save journal.")
+                # appending after it would make the journal unreadable, so start a new snapshot
+                self.snapshot_size = 0
+                break
+            delta = restricted_loads(zlib.decompress(entry))
+            if delta["snapshot_id"] == self.snapshot_id:
+                journal.append(delta)
+            position += 4 + size
+        self.journal_size = len(entries)
+        self.set_save(save_data, journal)
+
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
@@ -555,9 +676,7 @@ class Context:
                 self.save_filename = name + '.apsave' if ext.lower() in ('.archipelago', '.zip') \
                     else self.data_filename + '_' + 'apsave'
             try:
-                with open(self.save_filename, 'rb') as f:
-                    save_data = restricted_loads(zlib.decompress(f.read()))
-                    self.set_save(save_data)
+                self._load_save()
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
             except Exception as e:
@@ -601,47 +720,140 @@ class Context:
             "version": self.save_version,
             "connect_names": self.connect_names,
             "received_items": self.received_items,
-            "hints_used": dict(self.hints_used),
             "hints": dict(self.hints),
             "location_checks": dict(self.location_checks),
-            "name_aliases": self.name_aliases,
+            "stored_data": self.stored_data,
+            **self.get_save_values()
+        }
+
+        return d
+
+    def get_save_values(self) -> typing.Dict[str, typing.Any]:
+        """Returns the parts of the save that are saved in full, as copies that later changes don't affect."""
+        return {
+            "hints_used": dict(self.hints_used),
+            "name_aliases": dict(self.name_aliases),
             "client_game_state": dict(self.client_game_state),
             "client_activity_timers": tuple(
                 (key, value.timestamp()) for key, value in self.client_activity_timers.items()),
             "client_connection_timers": tuple(
                 (key, value.timestamp()) for key, value in self.client_connection_timers.items()),
             "random_state": self.random.getstate(),
-            "group_collected": dict(self.group_collected),
-            "stored_data": self.stored_data,
+            "group_collected": {group: set(players) for group, players in self.group_collected.items()},
             "game_options": {"hint_cost": self.hint_cost, "location_check_points": self.location_check_points,
                              "server_password": self.server_password, "password": self.password,
                              "release_mode": self.release_mode,
                              "remaining_mode": self.remaining_mode, "collect_mode": self.collect_mode,
                              "item_cheat": self.item_cheat, "compatibility": self.compatibility}
-
         }
 
-        return d
-
-    def set_save(self, savedata: dict):
+    def get_save_delta(self) -> typing.Tuple[dict, SavedState]:
+        """
+        Returns what changed since the last save, in the format of get_save, but only with the sections that changed.
+        received_items only contains new items and location_checks, hints and stored_data only changed entries.
+        Also returns the state it was made from, to pass to set_saved_state once it is saved.
+        """
+        received_counts = {key: len(items) for key, items in list(self.received_items.items())}
+        changed_stored_data, self.changed_stored_data = self.changed_stored_data, set()
+        changed_hints, self.changed_hints = self.changed_hints, set()
+        values = self.get_save_values()
+        d = {key: value for key, value in values.items() if value != self.saved_state.values.get(key)}
+        received_items = {}
+        for key, count in received_counts.items():
+            saved_count = self.saved_state.received_counts.get(key, 0)
+            if count > saved_count:
+                received_items[key] = self.received_items[key].copy(saved_count, count)
+        location_checks = {key: set(checks) for key, checks in list(self.location_checks.items())
+                           if len(checks) != self.saved_state.check_counts.get(key, 0)}
+        if received_items:
+            d["received_items"] = received_items
+        if location_checks:
+            d["location_checks"] = location_checks
+        if changed_hints:
+            d["hints"] = {key: set(self.hints.get(key, ())) for key in changed_hints}
+        if changed_stored_data:
+            d["stored_data"] = {key: self.stored_data[key] for key in changed_stored_data
+                                if key in self.stored_data}
+        # location_checks only contains changed entries, so unchanged ones keep their count from the last save
+        check_counts = {**self.saved_state.check_counts,
+                        **{key: len(checks) for key, checks in location_checks.items()}}
+        return d, SavedState(received_counts, check_counts, changed_hints, changed_stored_data, values)
+
+    def set_saved_state(self, saved_state: typing.Optional[SavedState] = None) -> None:
+        """Marks the state returned by get_save_delta, or the current state if None, as saved."""
+        if saved_state is None:
+            saved_state = SavedState({key: len(items) for key, items in self.received_items.items()},
+                                     {key: len(checks) for key, checks in self.location_checks.items()},
+                                     set(self.changed_hints), set(self.changed_stored_data),
+                                     self.get_save_values())
+            self.changed_hints.clear()
+            self.changed_stored_data.clear()
+        self.saved_state = saved_state
+
+    def set_save(self, savedata: dict, journal: typing.Iterable[dict] = ()):
+        """Loads savedata from get_save, then replays the changes in journal, from get_save_delta."""
         if self.connect_names != savedata["connect_names"]:
             raise Exception("This savegame does not appear to match the loaded multiworld.")
         if savedata["version"] > self.save_version:
             raise Exception("This savegame is newer than the server.")
-        self.received_items = savedata["received_items"]
-        self.hints_used.update(savedata["hints_used"])
+        self.received_items = self._load_received_items(savedata["received_items"])
         self.hints.update(savedata["hints"])
-
-        self.name_aliases.update(savedata["name_aliases"])
-        self.client_game_state.update(savedata["client_game_state"])
-        self.client_connection_timers.update(
-            {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
-             in savedata["client_connection_timers"]})
-        self.client_activity_timers.update(
-            {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
-             in savedata["client_activity_timers"]})
+        for (team, slot), hints in savedata["hints"].items():
+            self.index_hints(team, hints)
         self.location_checks.update(savedata["location_checks"])
-        self.random.setstate(savedata["random_state"])
+        if "stored_data" in savedata:
+            self.stored_data = savedata["stored_data"]
+        self._set_save_values(savedata)
+
+        # journal entries only contain the sections that changed
+        for delta in journal:
+            for key, received_items in self._load_received_items(delta.get("received_items", {})).items():
+                self.received_items.setdefault(key, ReceivedItems()).extend(received_items)
+            self.hints.update(delta.get("hints", {}))
+            for (team, slot), hints in delta.get("hints", {}).items():
+                self.index_hints(team, hints)
+            self.location_checks.update(delta.get("location_checks", {}))
+            self.stored_data.update(delta.get("stored_data", {}))
+            self._set_save_values(delta)
+        self.location_bitmaps.clear()
+        self.set_saved_state()
+
+        self.logger.info(
+            f'Loaded save file with {sum(len(v) for v in self.received_items.values())} received items '
+            f'for {len(self.received_items)} players')
+
+    @staticmethod
+    def _load_received_items(saved: dict) -> typing.Dict[team_slot, ReceivedItems]:
+        """Loads received_items of a save, including saves before version 3, which had a list for each view."""
+        received_items = {}
+        for key, value in saved.items():
+            if len(key) == 2:
+                received_items[key] = value
+            elif key[2]:
+                team, slot, _ = key
+                received_items[team, slot] = ReceivedItems.from_lists(value, saved.get((team, slot, False), []))
+        return received_items
+
+    def _set_save_values(self, savedata: dict):
+        """Loads the parts of savedata from get_save_values, which saves contain and journal entries if they changed."""
+        if "hints_used" in savedata:
+            self.hints_used.update(savedata["hints_used"])
+        if "name_aliases" in savedata:
+            # aliases can be removed, which an update can't do
+            self.name_aliases.clear()
+            self.name_aliases.update(savedata["name_aliases"])
+        if "client_game_state" in savedata:
+            self.client_game_state.update(savedata["client_game_state"])
+        if "client_connection_timers" in savedata:
+            self.client_connection_timers.update(
+                {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
+                 in savedata["client_connection_timers"]})
+        if "client_activity_timers" in savedata:
+            self.client_activity_timers.update(
+                {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
+                 in savedata["client_activity_timers"]})
+        if "random_state" in savedata:
+            self.random.setstate(savedata["random_state"])
 
         if "game_options" in savedata:
             self.hint_cost = savedata["game_options"]["hint_cost"]
@@ -657,13 +869,6 @@ class Context:
         if "group_collected" in savedata:
             self.group_collected = savedata["group_collected"]
 
-        if "stored_data" in savedata:
-            self.stored_data = savedata["stored_data"]
-        # count items and slots from lists for items_handling = remote
-        self.logger.info(
-            f'Loaded save file with {sum([len(v) for k, v in self.received_items.items() if k[2]])} received items '
-            f'for {sum(k[2] for k in self.received_items)} players')
-
     # rest
 
     def get_hint_cost(self, slot):
@@ -677,7 +882,11 @@ class Context:
         will refresh all teams or all slots respectively. If a set is passed for 'changed', each (team,slot)
         pair that has at least one hint modified will be added to the set.
         """
-        for hint_team, hint_slot in self.hints:
+        if team is not None and slot is not None:
+            keys = [(team, slot)] if (team, slot) in self.hints else []
+        else:
+            keys = list(self.hints)
+        for hint_team, hint_slot in keys:
             if team != hint_team and team is not None:
                 continue  # Check specified team only, all if team is None
             if slot != hint_slot and slot is not None:
@@ -688,6 +897,8 @@ class Context:
                 new_hints.add(new_hint)
                 if hint == new_hint:
                     continue
+                self.changed_hints.add((hint_team, hint_slot))
+                self.hint_index[hint_team, new_hint.finding_player, new_hint.location].add(new_hint)
                 for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
                     if changed is not None:
                         changed.add((hint_team,player))
@@ -695,6 +906,24 @@ class Context:
                         self.replace_hint(hint_team, player, hint, new_hint)
             self.hints[hint_team, hint_slot] = new_hints
 
+    def recheck_location_hints(self, team: int, slot: int, locations: typing.Iterable[int],
+                               changed: typing.Optional[typing.Set[team_slot]] = None) -> None:
+        """Refreshes only the hints for the specified locations of the finding team/slot, using the hint index.
+        If a set is passed for 'changed', each (team,slot) pair that has at least one hint modified will be added."""
+        for location in locations:
+            hints = self.hint_index.get((team, slot, location))
+            if not hints:
+                continue
+            for hint in tuple(hints):
+                new_hint = hint.re_check(self, team)
+                if hint == new_hint:
+                    continue
+                hints.discard(hint)
+                for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
+                    if changed is not None:
+                        changed.add((team, player))
+                    self.replace_hint(team, player, hint, new_hint)
+
     def get_rechecked_hints(self, team: int, slot: int):
         self.recheck_hints(team, slot)
         return self.hints[team, slot]
@@ -764,12 +993,14 @@ class Context:
                 # we can check once if hint already exists
                 if hint not in self.hints[team, hint.finding_player]:
                     self.hints[team, hint.finding_player].add(hint)
+                    self.hint_index[team, hint.finding_player, hint.location].add(hint)
                     new_hint_events.add(hint.finding_player)
                     for player in self.slot_set(hint.receiving_player):
                         self.hints[team, player].add(hint)
                         new_hint_events.add(player)
 
             self.logger.info("Notice (Team #%d): %s" % (team + 1, format_hint(self, team, hint)))
+        self.changed_hints.update((team, slot) for slot in new_hint_events)
         for slot in new_hint_events:
             self.on_new_hint(team, slot)
         for slot, hint_data in concerns.items():
@@ -782,15 +1013,22 @@ class Context:
                     async_start(self.send_msgs(client, client_hints))
 
     def get_hint(self, team: int, finding_player: int, seeked_location: int) -> typing.Optional[Hint]:
-        for hint in self.hints[team, finding_player]:
-            if hint.location == seeked_location:
+        for hint in self.hint_index.get((team, finding_player, seeked_location), ()):
+            if hint in self.hints[team, finding_player]:
                 return hint
         return None
-    
+
+    def index_hints(self, team: int, hints: typing.Iterable[Hint]) -> None:
+        """Adds hints that were put into self.hints directly to the hint index."""
+        for hint in hints:
+            self.hint_index[team, hint.finding_player, hint.location].add(hint)
+
     def replace_hint(self, team: int, slot: int, old_hint: Hint, new_hint: Hint) -> None:
         if old_hint in self.hints[team, slot]:
             self.hints[team, slot].remove(old_hint)
             self.hints[team, slot].add(new_hint)
+            self.changed_hints.add((team, slot))
+            self.hint_index[team, new_hint.finding_player, new_hint.location].add(new_hint)
     
     # "events"
 
@@ -1004,8 +1242,8 @@ def get_status_string(ctx: Context, team: int, tag: str):
     return text
 
 
-def get_received_items(ctx: Context, team: int, player: int, remote_items: bool) -> typing.List[NetworkItem]:
-    return ctx.received_items.setdefault((team, player, remote_items), [])
+def get_received_items(ctx: Context, team: int, player: int, remote_items: bool) -> ReceivedItemsView:
+    return ctx.received_items.setdefault((team, player), ReceivedItems()).view(remote_items)
 
 
 def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool) -> typing.List[NetworkItem]:
@@ -1013,20 +1251,37 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
 
 
 def send_new_items(ctx: Context):
-    for team, clients in ctx.clients.items():
-        for slot, clients in clients.items():
-            for client in clients:
-                if client.no_items:
-                    continue
-                start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-                items = get_received_items(ctx, team, slot, client.remote_items)
-                if len(start_inventory) + len(items) > client.send_index:
-                    first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
-                        "cmd": "ReceivedItems",
-                        "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
-                    client.send_index = len(start_inventory) + len(items)
+    """
+    Sends ReceivedItems to the clients of slots in ctx.new_item_receivers.
+    Inside the event loop, sending is deferred until the current callback is done, so that bursts of items,
+    for example from releases and collects, are sent as one message per client.
+    """
+    if ctx.send_new_items_handle:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _send_new_items(ctx)
+    else:
+        ctx.send_new_items_handle = loop.call_soon(_send_new_items, ctx)
+
+
+def _send_new_items(ctx: Context):
+    ctx.send_new_items_handle = None
+    receivers, ctx.new_item_receivers = ctx.new_item_receivers, set()
+    for team, slot in receivers:
+        for client in ctx.clients[team][slot]:
+            if client.no_items:
+                continue
+            start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
+            items = get_received_items(ctx, team, slot, client.remote_items)
+            if len(start_inventory) + len(items) > client.send_index:
+                first_new_item = max(0, client.send_index - len(start_inventory))
+                async_start(ctx.send_msgs(client, [{
+                    "cmd": "ReceivedItems",
+                    "index": client.send_index,
+                    "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
+                client.send_index = len(start_inventory) + len(items)
 
 
 def update_checked_locations(ctx: Context, team: int, slot: int):
@@ -1065,15 +1320,15 @@ def collect_player(ctx: Context, team: int, slot: int, is_group: bool = False):
 
 
 def get_remaining(ctx: Context, team: int, slot: int) -> typing.List[typing.Tuple[int, int]]:
-    return ctx.locations.get_remaining(ctx.location_checks, team, slot)
+    return ctx.locations.get_remaining(ctx.location_bitmaps, team, slot)
 
 
 def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem):
     for target in ctx.slot_set(target_slot):
+        received_items = ctx.received_items.setdefault((team, target), ReceivedItems())
         for item in items:
-            if item.player != target_slot:
-                get_received_items(ctx, team, target, False).append(item)
-            get_received_items(ctx, team, target, True).append(item)
+            received_items.append(item, item.player == target_slot)
+        ctx.new_item_receivers.add((team, target))
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1111,6 +1366,8 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
         del sortable
 
         ctx.location_checks[team, slot] |= new_locations
+        if (team, slot) in ctx.location_bitmaps:
+            ctx.locations.set_checked(ctx.location_bitmaps[team, slot], slot, new_locations)
         send_new_items(ctx)
         ctx.broadcast(ctx.clients[team][slot], [{
             "cmd": "RoomUpdate",
@@ -1118,7 +1375,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             "checked_locations": new_locations,  # send back new checks only
         }])
         updated_slots: typing.Set[tuple[int, int]] = set()
-        ctx.recheck_hints(team, slot, updated_slots)
+        ctx.recheck_location_hints(team, slot, new_locations, updated_slots)
         for hint_team, hint_slot in updated_slots:
             ctx.on_changed_hints(hint_team, hint_slot)
         ctx.save()
@@ -1581,8 +1838,9 @@ class ClientMessageProcessor(CommonCommandProcessor):
             )
             if usable:
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
-                get_received_items(self.ctx, self.client.team, self.client.slot, False).append(new_item)
-                get_received_items(self.ctx, self.client.team, self.client.slot, True).append(new_item)
+                self.ctx.received_items.setdefault((self.client.team, self.client.slot),
+                                                   ReceivedItems()).append(new_item, False)
+                self.ctx.new_item_receivers.add((self.client.team, self.client.slot))
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
@@ -1604,6 +1862,8 @@ class ClientMessageProcessor(CommonCommandProcessor):
             hints = {hint.re_check(self.ctx, self.client.team) for hint in
                      self.ctx.hints[self.client.team, self.client.slot]}
             self.ctx.hints[self.client.team, self.client.slot] = hints
+            self.ctx.changed_hints.add((self.client.team, self.client.slot))
+            self.ctx.index_hints(self.client.team, hints)
             self.ctx.notify_hints(self.client.team, list(hints), recipients=(self.client.slot,))
             self.output(f"A hint costs {self.ctx.get_hint_cost(self.client.slot)} points. "
                         f"You have {points_available} points.")
@@ -1742,11 +2002,11 @@ class ClientMessageProcessor(CommonCommandProcessor):
 
 
 def get_checked_checks(ctx: Context, team: int, slot: int) -> typing.List[int]:
-    return ctx.locations.get_checked(ctx.location_checks, team, slot)
+    return ctx.locations.get_checked(ctx.location_bitmaps, team, slot)
 
 
 def get_missing_checks(ctx: Context, team: int, slot: int) -> typing.List[int]:
-    return ctx.locations.get_missing(ctx.location_checks, team, slot)
+    return ctx.locations.get_missing(ctx.location_bitmaps, team, slot)
 
 
 def get_client_points(ctx: Context, client: Client) -> int:
@@ -1837,7 +2097,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
             items = get_received_items(ctx, client.team, client.slot, client.remote_items)
             if (start_inventory or items) and not client.no_items:
-                reply.append({"cmd": 'ReceivedItems', "index": 0, "items": start_inventory + items})
+                reply.append({"cmd": 'ReceivedItems', "index": 0, "items": start_inventory + items[:]})
                 client.send_index = len(start_inventory) + len(items)
             if not client.auth:  # if this was a Re-Connect, don't print to console
                 client.auth = True
@@ -1849,23 +2109,15 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
     elif cmd == "GetDataPackage":
         exclusions = args.get("exclusions", [])
         if "games" in args:
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name in set(args.get("games", []))}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": games}}])
+            requested = set(args.get("games", []))
+            games = [name for name in ctx.gamespackage if name in requested]
         # TODO: remove exclusions behaviour around 0.5.0
         elif exclusions:
             exclusions = set(exclusions)
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name not in exclusions}
-
-            package = {"games": games}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": package}])
-
+            games = [name for name in ctx.gamespackage if name not in exclusions]
         else:
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": ctx.gamespackage}}])
+            games = list(ctx.gamespackage)
+        await ctx.send_encoded_msgs(client, ctx.get_encoded_data_package(games))
 
     elif client.auth:
         if cmd == "ConnectUpdate":
@@ -1882,7 +2134,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                     if (items or start_inventory) and not client.no_items:
                         client.send_index = len(start_inventory) + len(items)
                         await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0,
-                                                      "items": start_inventory + items}])
+                                                      "items": start_inventory + items[:]}])
                     else:
                         client.send_index = 0
                 except (ValueError, TypeError) as err:
@@ -1910,7 +2162,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             if (start_inventory or items) and not client.no_items:
                 client.send_index = len(start_inventory) + len(items)
                 await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0,
-                                              "items": start_inventory + items}])
+                                              "items": start_inventory + items[:]}])
 
         elif cmd == 'LocationChecks':
             if client.no_locations:
@@ -2036,6 +2288,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 func = modify_functions[operation["operation"]]
                 value = func(value, operation["value"])
             ctx.stored_data[args["key"]] = args["value"] = value
+            ctx.changed_stored_data.add(args["key"])
             targets = set(ctx.stored_data_notification_clients[args["key"]])
             if args.get("want_reply", True):
                 targets.add(client)
@@ -2477,7 +2730,8 @@ async def auto_shutdown(ctx, to_cancel=None):
         await asyncio.wait_for(ctx.exit_event.wait(), ctx.auto_shutdown)
 
     def inactivity_shutdown():
-        ctx.server.ws_server.close()
+        if ctx.server:  # WebHost rooms on a shared port have no server of their own
+            ctx.server.ws_server.close()
         ctx.exit_event.set()
         if to_cancel:
             for task in to_cancel:
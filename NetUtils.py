@@ -2,8 +2,12 @@ from __future__ import annotations
 
 import typing
 import enum
+import itertools
+import sys
 import warnings
+from array import array
 from json import JSONEncoder, JSONDecoder
+from json.encoder import encode_basestring
 
 if typing.TYPE_CHECKING:
     from websockets import WebSocketServerProtocol as ServerConnection
@@ -113,8 +117,107 @@ _encode = JSONEncoder(
 ).encode
 
 
+# encodes plain values the same way JSONEncoder does, without the overhead of calling it
+_plain_types = frozenset({str, int, float, bool, type(None)})
+_int_repr = int.__repr__
+
+
+def _write_typed_tuple(obj: typing.NamedTuple, parts: typing.List[str]) -> None:
+    data = obj._asdict()
+    data["class"] = obj.__class__.__name__
+    parts.append(_encode(data))
+
+
+def _write_network_player(obj: NetworkPlayer, parts: typing.List[str]) -> None:
+    team, slot, alias, name = obj
+    if type(team) is int and type(slot) is int and type(alias) is str and type(name) is str:
+        parts.append(f'{{"team":{team},"slot":{slot},"alias":{encode_basestring(alias)},'
+                     f'"name":{encode_basestring(name)},"class":"NetworkPlayer"}}')
+    else:
+        _write_typed_tuple(obj, parts)
+
+
+def _write_network_slot(obj: NetworkSlot, parts: typing.List[str]) -> None:
+    name, game, slot_type, group_members = obj
+    if type(name) is str and type(game) is str and type(slot_type) is SlotType:
+        parts.append(f'{{"name":{encode_basestring(name)},"game":{encode_basestring(game)},'
+                     f'"type":{_int_repr(slot_type)},"group_members":{_encode(group_members)},'
+                     f'"class":"NetworkSlot"}}')
+    else:
+        _write_typed_tuple(obj, parts)
+
+
+def _write_network_item(obj: NetworkItem, parts: typing.List[str]) -> None:
+    item, location, player, flags = obj
+    if type(item) is int and type(location) is int and type(player) is int and type(flags) is int:
+        parts.append(f'{{"item":{item},"location":{location},"player":{player},"flags":{flags},'
+                     f'"class":"NetworkItem"}}')
+    else:
+        _write_typed_tuple(obj, parts)
+
+
+_typed_tuple_writers: typing.Dict[type, typing.Callable[[typing.Any, typing.List[str]], None]] = {
+    NetworkPlayer: _write_network_player,
+    NetworkSlot: _write_network_slot,
+    NetworkItem: _write_network_item,
+}
+
+
+def _write_json(obj: typing.Any, parts: typing.List[str]) -> None:
+    """Appends the JSON of obj to parts, the same as _encode(_scan_for_TypedTuples(obj)) but without copying obj.
+    Known NamedTuples are written directly, larger containers of plain values are passed to _encode as a whole
+    and anything else falls back to _encode(_scan_for_TypedTuples(obj))."""
+    obj_type = type(obj)
+    if obj_type is str:
+        parts.append(encode_basestring(obj))
+    elif obj_type is int:
+        parts.append(_int_repr(obj))
+    elif obj_type is bool:
+        parts.append("true" if obj else "false")
+    elif obj is None:
+        parts.append("null")
+    elif obj_type in _typed_tuple_writers:
+        _typed_tuple_writers[obj_type](obj, parts)
+    elif obj_type is dict:
+        if len(obj) > 8 and _plain_types.issuperset(map(type, obj.values())):
+            parts.append(_encode(obj))
+            return
+        start = len(parts)
+        parts.append("{")
+        for key, value in obj.items():
+            if len(parts) > start + 1:
+                parts.append(",")
+            key_type = type(key)
+            if key_type is str:
+                parts.append(encode_basestring(key))
+            elif key_type is int:
+                parts.append(f'"{key}"')
+            else:
+                del parts[start:]
+                parts.append(_encode(_scan_for_TypedTuples(obj)))
+                return
+            parts.append(":")
+            _write_json(value, parts)
+        parts.append("}")
+    elif obj_type is list or obj_type is tuple or obj_type is set or obj_type is frozenset:
+        if len(obj) > 8 and _plain_types.issuperset(map(type, obj)):
+            parts.append(_encode(obj if obj_type is list or obj_type is tuple else tuple(obj)))
+            return
+        start = len(parts)
+        parts.append("[")
+        for value in obj:
+            if len(parts) > start + 1:
+                parts.append(",")
+            _write_json(value, parts)
+        parts.append("]")
+    else:
+        parts.append(_encode(_scan_for_TypedTuples(obj)))
+
+
 def encode(obj: typing.Any) -> str:
-    return _encode(_scan_for_TypedTuples(obj))
+    parts: typing.List[str] = []
+    _write_json(obj, parts)
+    return "".join(parts)
 
 
 def get_any_version(data: dict) -> Version:
@@ -390,7 +493,153 @@ class Hint(typing.NamedTuple):
         return self.receiving_player == self.finding_player
 
 
+def _write_hint(obj: Hint, parts: typing.List[str]) -> None:
+    receiving_player, finding_player, location, item, found, entrance, item_flags, status = obj
+    if type(receiving_player) is int and type(finding_player) is int and type(location) is int \
+            and type(item) is int and type(found) is bool and type(entrance) is str \
+            and type(item_flags) is int and type(status) is HintStatus:
+        parts.append(f'{{"receiving_player":{receiving_player},"finding_player":{finding_player},'
+                     f'"location":{location},"item":{item},"found":{"true" if found else "false"},'
+                     f'"entrance":{encode_basestring(entrance)},"item_flags":{item_flags},'
+                     f'"status":{_int_repr(status)},"class":"Hint"}}')
+    else:
+        _write_typed_tuple(obj, parts)
+
+
+_typed_tuple_writers[Hint] = _write_hint
+
+
+class ReceivedItems:
+    """
+    Items received by a slot, in order, stored as 4 integers per item instead of NetworkItem objects.
+    Items the slot sent itself are left out for clients without remote_items, so a second array indexes the others.
+    """
+    __slots__ = ("_items", "_other_items")
+
+    _items: array  # item, location, player and flags of each item
+    _other_items: array  # indices of the items not only for remote_items
+
+    def __init__(self, items: bytes = b"", other_items: bytes = b""):
+        self._items = array("q")
+        self._other_items = array("q")
+        self._items.frombytes(items)
+        self._other_items.frombytes(other_items)
+        if sys.byteorder == "big":  # stored as little endian
+            self._items.byteswap()
+            self._other_items.byteswap()
+
+    def __reduce__(self) -> typing.Tuple[type, typing.Tuple[bytes, bytes]]:
+        items, other_items = array("q", self._items), array("q", self._other_items)
+        if sys.byteorder == "big":
+            items.byteswap()
+            other_items.byteswap()
+        return ReceivedItems, (items.tobytes(), other_items.tobytes())
+
+    def __len__(self) -> int:
+        return len(self._items) // 4
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ReceivedItems):
+            return NotImplemented
+        return self._items == other._items and self._other_items == other._other_items
+
+    def append(self, item: NetworkItem, remote_only: bool) -> None:
+        """Adds item, which clients only receive with remote_items if remote_only."""
+        if not remote_only:
+            self._other_items.append(len(self))
+        self._items.extend(item)
+
+    def extend(self, received_items: ReceivedItems) -> None:
+        offset = len(self)
+        self._items.extend(received_items._items)
+        self._other_items.extend(index + offset for index in received_items._other_items)
+
+    def copy(self, start: int = 0, stop: typing.Optional[int] = None) -> ReceivedItems:
+        """Returns the items from index start to stop, like a slice."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        received_items = ReceivedItems()
+        received_items._items = self._items[start * 4:stop * 4]
+        received_items._other_items = array("q", (index - start for index in self._other_items
+                                                  if start <= index < stop))
+        return received_items
+
+    def view(self, remote_items: bool) -> ReceivedItemsView:
+        return ReceivedItemsView(self, remote_items)
+
+    @classmethod
+    def from_lists(cls, remote_items: typing.Sequence[NetworkItem], other_items: typing.Sequence[NetworkItem]
+                   ) -> ReceivedItems:
+        """Creates it from the lists of both views, as used by save versions before 3."""
+        received_items = cls()
+        other_index = 0
+        for item in remote_items:
+            # other_items is a subsequence of remote_items, and equal items are interchangeable
+            remote_only = other_index >= len(other_items) or other_items[other_index] != item
+            if not remote_only:
+                other_index += 1
+            received_items.append(item, remote_only)
+        return received_items
+
+
+class ReceivedItemsView:
+    """The items of ReceivedItems a client receives, depending on its remote_items, as NetworkItems."""
+    __slots__ = ("_received_items", "_remote_items")
+
+    def __init__(self, received_items: ReceivedItems, remote_items: bool):
+        self._received_items = received_items
+        self._remote_items = remote_items
+
+    def __len__(self) -> int:
+        if self._remote_items:
+            return len(self._received_items)
+        return len(self._received_items._other_items)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> typing.Iterator[NetworkItem]:
+        return iter(self[:])
+
+    @typing.overload
+    def __getitem__(self, index: int) -> NetworkItem: ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> typing.List[NetworkItem]: ...
+
+    def __getitem__(self, index: typing.Union[int, slice]) -> typing.Union[NetworkItem, typing.List[NetworkItem]]:
+        items = self._received_items._items
+        if self._remote_items:
+            if isinstance(index, slice):
+                start, stop, step = index.indices(len(self))
+                if step != 1:
+                    return self[:][index]
+                values = items[start * 4:stop * 4]
+                return [NetworkItem(*values[i:i + 4]) for i in range(0, len(values), 4)]
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("ReceivedItemsView index out of range")
+            return NetworkItem(*items[index * 4:index * 4 + 4])
+        indices = self._received_items._other_items[index]
+        if isinstance(index, slice):
+            return [NetworkItem(*items[i * 4:i * 4 + 4]) for i in indices]
+        return NetworkItem(*items[indices * 4:indices * 4 + 4])
+
+
+# checked locations of (team, slot), as a set or a bitmap in LocationStore order
+_LocationState = typing.Mapping[typing.Tuple[int, int], typing.Union[typing.Set[int], bytes, bytearray]]
+# bits of each byte value, and their inverse, to select from locations with itertools.compress
+_byte_bits = [tuple(bool(byte >> i & 1) for i in range(8)) for byte in range(256)]
+_byte_inverted_bits = [tuple(not bit for bit in bits) for bits in _byte_bits]
+
+
 class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
+    # locations by receiver, and by receiver and item with their position in a scan, for hints and collect
+    _receiver_locations: typing.Dict[int, typing.List[typing.Tuple[int, int]]]
+    _receiver_item_locations: typing.Dict[typing.Tuple[int, int],
+                                          typing.List[typing.Tuple[int, typing.Tuple[int, int, int, int, int]]]]
+    _location_positions: typing.Dict[int, typing.Dict[int, int]]  # bit of each location in bitmaps, by slot
+
     def __init__(self, values: typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
         super().__init__(values)
 
@@ -403,25 +652,60 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
         if len(self.get(0, {})):
             raise ValueError("Invalid player id 0 for location")
 
-    def find_item(self, slots: typing.Set[int], seeked_item_id: int
-                  ) -> typing.Generator[typing.Tuple[int, int, int, int, int], None, None]:
+        self._receiver_locations = {}
+        self._receiver_item_locations = {}
+        self._location_positions = {}
+        position = 0
         for finding_player, check_data in self.items():
             for location_id, (item_id, receiving_player, item_flags) in check_data.items():
-                if receiving_player in slots and item_id == seeked_item_id:
-                    yield finding_player, location_id, item_id, receiving_player, item_flags
+                self._receiver_locations.setdefault(receiving_player, []).append((finding_player, location_id))
+                self._receiver_item_locations.setdefault((receiving_player, item_id), []).append(
+                    (position, (finding_player, location_id, item_id, receiving_player, item_flags)))
+                position += 1
+
+    def find_item(self, slots: typing.Set[int], seeked_item_id: int
+                  ) -> typing.Generator[typing.Tuple[int, int, int, int, int], None, None]:
+        found = [location for slot in slots
+                 for location in self._receiver_item_locations.get((slot, seeked_item_id), ())]
+        if len(slots) > 1:
+            found.sort()  # in order of a scan of all locations
+        for _, location in found:
+            yield location
 
     def get_for_player(self, slot: int) -> typing.Dict[int, typing.Set[int]]:
-        import collections
-        all_locations: typing.Dict[int, typing.Set[int]] = collections.defaultdict(set)
-        for source_slot, location_data in self.items():
-            for location_id, values in location_data.items():
-                if values[1] == slot:
-                    all_locations[source_slot].add(location_id)
+        all_locations: typing.Dict[int, typing.Set[int]] = {}
+        for source_slot, location_id in self._receiver_locations.get(slot, ()):
+            all_locations.setdefault(source_slot, set()).add(location_id)
         return all_locations
 
-    def get_checked(self, state: typing.Dict[typing.Tuple[int, int], typing.Set[int]], team: int, slot: int
-                    ) -> typing.List[int]:
+    # checked locations can be given as a set or as a bitmap, with a bit for each location of the slot in store order
+
+    def new_bitmap(self, slot: int) -> bytearray:
+        """Returns a bitmap of slot's locations with none checked."""
+        return bytearray((len(self[slot]) + 7) // 8)
+
+    def set_checked(self, bitmap: bytearray, slot: int, locations: typing.Iterable[int]) -> None:
+        """Marks locations of slot as checked in bitmap. Unknown locations are ignored."""
+        if len(bitmap) < (len(self[slot]) + 7) // 8:
+            raise ValueError(f"Bitmap too small for player {slot}")
+        positions = self._location_positions.get(slot)
+        if positions is None:
+            positions = self._location_positions[slot] = {location_id: i for i, location_id in enumerate(self[slot])}
+        for location_id in locations:
+            i = positions.get(location_id)
+            if i is not None:
+                bitmap[i >> 3] |= 1 << (i & 7)
+
+    def _iter_bits(self, bitmap: typing.Union[bytes, bytearray], slot: int, inverted: bool = False
+                   ) -> typing.Iterator[bool]:
+        if len(bitmap) < (len(self[slot]) + 7) // 8:
+            raise ValueError(f"Bitmap too small for player {slot}")
+        return itertools.chain.from_iterable(map((_byte_inverted_bits if inverted else _byte_bits).__getitem__, bitmap))
+
+    def get_checked(self, state: _LocationState, team: int, slot: int) -> typing.List[int]:
         checked = state[team, slot]
+        if isinstance(checked, (bytes, bytearray)):
+            return list(itertools.compress(self[slot], self._iter_bits(checked, slot)))
         if not checked:
             # This optimizes the case where everyone connects to a fresh game at the same time.
             if slot not in self:
@@ -431,9 +715,10 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
                 location_id in self[slot] if
                 location_id in checked]
 
-    def get_missing(self, state: typing.Dict[typing.Tuple[int, int], typing.Set[int]], team: int, slot: int
-                    ) -> typing.List[int]:
+    def get_missing(self, state: _LocationState, team: int, slot: int) -> typing.List[int]:
         checked = state[team, slot]
+        if isinstance(checked, (bytes, bytearray)):
+            return list(itertools.compress(self[slot], self._iter_bits(checked, slot, True)))
         if not checked:
             # This optimizes the case where everyone connects to a fresh game at the same time.
             return list(self[slot])
@@ -441,10 +726,13 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
                 location_id in self[slot] if
                 location_id not in checked]
 
-    def get_remaining(self, state: typing.Dict[typing.Tuple[int, int], typing.Set[int]], team: int, slot: int
-                      ) -> typing.List[typing.Tuple[int, int]]:
+    def get_remaining(self, state: _LocationState, team: int, slot: int) -> typing.List[typing.Tuple[int, int]]:
         checked = state[team, slot]
         player_locations = self[slot]
+        if isinstance(checked, (bytes, bytearray)):
+            return sorted([(location[1], location[0]) for
+                           location in itertools.compress(player_locations.values(),
+                                                          self._iter_bits(checked, slot, True))])
         return sorted([(player_locations[location_id][1], player_locations[location_id][0]) for
                         location_id in player_locations if
                         location_id not in checked])
@@ -15,6 +15,7 @@ import collections
 import importlib
 import logging
 import warnings
+import zlib
 
 from argparse import Namespace
 from settings import Settings, get_settings
@@ -429,7 +430,7 @@ class RestrictedUnpickler(pickle.Unpickler):
             return getattr(builtins, name)
         # used by MultiServer -> savegame/multidata
         if module == "NetUtils" and name in {"NetworkItem", "ClientStatus", "Hint",
-                                             "SlotType", "NetworkSlot", "HintStatus"}:
+                                             "SlotType", "NetworkSlot", "HintStatus", "ReceivedItems"}:
             return getattr(self.net_utils_module, name)
         # Options and Plando are unpickled by WebHost -> Generate
         if module == "worlds.generic" and name == "PlandoItem":
@@ -454,6 +455,95 @@ def restricted_loads(s: bytes) -> Any:
     return RestrictedUnpickler(io.BytesIO(s)).load()
 
 
+class _RawSection(typing.NamedTuple):
+    offset: int
+    size: int
+
+
+class MultidataSections(typing.MutableMapping[Any, Any]):
+    """Sections of a multidata format 4 container, which are decompressed and unpickled on first access.
+    Sections that were never accessed are copied as they are by compress_multidata."""
+    _data: memoryview
+    _entries: Dict[Any, Any]
+
+    def __init__(self, data: memoryview, index: Dict[Any, typing.Tuple[int, int]]) -> None:
+        self._data = data
+        self._entries = {key: _RawSection(*section) for key, section in index.items()}
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._entries[key]
+        if type(value) is _RawSection:
+            value = self._entries[key] = restricted_loads(zlib.decompress(self.get_raw(key)))
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._entries[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        del self._entries[key]
+
+    def __iter__(self) -> typing.Iterator[Any]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self._entries)})"
+
+    def get_raw(self, key: Any) -> Optional[memoryview]:
+        """Returns the compressed section of key, or None if it was accessed or replaced since loading."""
+        value = self._entries[key]
+        if type(value) is _RawSection:
+            return self._data[value.offset:value.offset + value.size]
+        return None
+
+
+def compress_multidata(multidata: typing.Mapping[str, Any]) -> bytes:
+    """Compresses multidata into format 4:
+    the format byte, the size of the header as 4 bytes big endian, the header and then the sections.
+    The header is a compressed pickle of {"sections": {key: (offset, size)}, "slot_data": {slot: (offset, size)}}
+    with offsets counted from the end of the header. Each key of multidata and each slot of its slot_data
+    is compressed as its own section, so readers only decompress what they use."""
+    sections: typing.List[typing.Union[bytes, memoryview]] = []
+    offset = 0
+
+    def add_section(mapping: typing.Mapping[Any, Any], key: Any) -> typing.Tuple[int, int]:
+        nonlocal offset
+        section = mapping.get_raw(key) if isinstance(mapping, MultidataSections) else None
+        if section is None:
+            section = zlib.compress(pickle.dumps(mapping[key]), 9)
+        sections.append(section)
+        offset += len(section)
+        return offset - len(section), len(section)
+
+    header: Dict[str, Any] = {"sections": {}, "slot_data": None}
+    for key in multidata:
+        if key == "slot_data":
+            slot_data = multidata[key]
+            header["slot_data"] = {slot: add_section(slot_data, slot) for slot in slot_data}
+        else:
+            header["sections"][key] = add_section(multidata, key)
+    compressed_header = zlib.compress(pickle.dumps(header), 9)
+    return b"".join((bytes([4]), len(compressed_header).to_bytes(4, "big"), compressed_header, *sections))
+
+
+def decompress_multidata(data: bytes) -> typing.MutableMapping[str, Any]:
+    """Loads multidata of format 3 as a dict, or of format 4 as MultidataSections."""
+    format_version = data[0]
+    if format_version > 4:
+        raise VersionException("Incompatible multidata.")
+    if format_version < 4:
+        return restricted_loads(zlib.decompress(data[1:]))
+    header_size = int.from_bytes(data[1:5], "big")
+    header = restricted_loads(zlib.decompress(data[5:5 + header_size]))
+    body = memoryview(data)[5 + header_size:]
+    multidata = MultidataSections(body, header["sections"])
+    if header["slot_data"] is not None:
+        multidata["slot_data"] = MultidataSections(body, header["slot_data"])
+    return multidata
+
+
 class ByValue:
     """
     Mixin for enums to pickle value instead of name (restores pre-3.11 behavior). Use as left-most parent.
@@ -25,6 +25,9 @@ app.jinja_env.filters['get_file_safe_name'] = get_file_safe_name
 app.config["SELFHOST"] = True  # application process is in charge of running the websites
 app.config["GENERATORS"] = 8  # maximum concurrent world gens
 app.config["HOSTERS"] = 8  # maximum concurrent room hosters
+# if set, each room hoster accepts connections for all of its rooms on this port plus its index, routed by room id,
+# instead of opening a port per room. Rooms are then loaded when the first client connects.
+app.config["HOSTER_PORT"] = None
 app.config["SELFLAUNCH"] = True  # application process is in charge of launching Rooms.
 app.config["SELFLAUNCHCERT"] = None  # can point to a SSL Certificate to encrypt Room websocket connections
 app.config["SELFLAUNCHKEY"] = None  # can point to a SSL Certificate Key to encrypt Room websocket connections
@@ -76,6 +79,17 @@ app.jinja_env.filters['suuid'] = lambda value: base64.urlsafe_b64encode(value.by
 app.jinja_env.filters["title_sorted"] = title_sorted
 
 
+def get_room_address(room) -> str:
+    """Address for clients to connect to a room, which includes the room if rooms share their hoster's port."""
+    address = f"{app.config['HOST_ADDRESS']}:{room.last_port}"
+    if app.config["HOSTER_PORT"]:
+        address += f"/{app.jinja_env.filters['suuid'](room.id)}"
+    return address
+
+
+app.jinja_env.filters["room_address"] = get_room_address
+
+
 def register():
     """Import submodules, triggering their registering on flask routing.
     Note: initializes worlds subsystem."""
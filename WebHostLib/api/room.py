@@ -5,6 +5,7 @@ from flask import abort, url_for
 
 import worlds.Files
 from . import api_endpoints, get_players
+from .. import get_room_address
 from ..models import Room
 
 
@@ -36,6 +37,7 @@ def room_info(room_id: UUID) -> Dict[str, Any]:
         "tracker": room.tracker,
         "players": get_players(room.seed),
         "last_port": room.last_port,
+        "address": get_room_address(room) if room.last_port > 0 else None,
         "last_activity": room.last_activity,
         "timeout": room.timeout,
         "downloads": downloads,
@@ -1,6 +1,7 @@
 from flask import session, jsonify
 from pony.orm import select
 
+from WebHostLib import get_room_address
 from WebHostLib.models import Room, Seed
 from . import api_endpoints, get_players
 
@@ -15,6 +16,7 @@ def get_rooms():
             "creation_time": room.creation_time,
             "last_activity": room.last_activity,
             "last_port": room.last_port,
+            "address": get_room_address(room) if room.last_port > 0 else None,
             "timeout": room.timeout,
             "tracker": room.tracker,
         })
@@ -162,6 +162,7 @@ class MultiworldInstance():
         self.cert = config["SELFLAUNCHCERT"]
         self.key = config["SELFLAUNCHKEY"]
         self.host = config["HOST_ADDRESS"]
+        self.port = config["HOSTER_PORT"] + id if config["HOSTER_PORT"] else None
         self.rooms_to_start = multiprocessing.Queue()
         self.rooms_shutting_down = multiprocessing.Queue()
         self.name = f"MultiHoster{id}"
@@ -173,14 +174,15 @@ class MultiworldInstance():
         process = multiprocessing.Process(group=None, target=run_server_process,
                                           args=(self.name, self.ponyconfig, get_static_server_data(),
                                                 self.cert, self.key, self.host,
-                                                self.rooms_to_start, self.rooms_shutting_down),
+                                                self.rooms_to_start, self.rooms_shutting_down, self.port),
                                           name=self.name)
         process.start()
         self.process = process
 
     def start_room(self, room_id):
         while not self.rooms_shutting_down.empty():
-            self.room_ids.remove(self.rooms_shutting_down.get(block=True, timeout=None))
+            # rooms on a shared port can also be started by a client connecting to them
+            self.room_ids.discard(self.rooms_shutting_down.get(block=True, timeout=None))
         if room_id in self.room_ids:
             pass  # should already be hosted currently.
         else:
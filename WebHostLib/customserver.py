@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import binascii
 import collections
 import datetime
 import functools
@@ -13,13 +15,16 @@ import threading
 import time
 import typing
 import sys
+from uuid import UUID
 
 import websockets
-from pony.orm import commit, db_session, select
+from pony.orm import db_session, select
+from pony.orm.dbapiprovider import OperationalError
 
 import Utils
 
-from MultiServer import Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, load_server_cert
+from MultiServer import Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, \
+    get_saving_second, load_server_cert
 from Utils import restricted_loads, cache_argsless
 from .locker import Locker
 from .models import Command, GameDataPackage, Room, db
@@ -86,19 +91,6 @@ class WebHostContext(Context):
             setattr(self, key, value)
         self.non_hintable_names = collections.defaultdict(frozenset, self.non_hintable_names)
 
-    def listen_to_db_commands(self):
-        cmdprocessor = DBCommandProcessor(self)
-
-        while not self.exit_event.is_set():
-            with db_session:
-                commands = select(command for command in Command if command.room.id == self.room_id)
-                if commands:
-                    for command in commands:
-                        self.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
-                        command.delete()
-                    commit()
-            time.sleep(5)
-
     @db_session
     def load(self, room_id: int):
         self.room_id = room_id
@@ -150,8 +142,7 @@ class WebHostContext(Context):
             savegame_data = Room.get(id=self.room_id).multisave
             if savegame_data:
                 self.set_save(restricted_loads(Room.get(id=self.room_id).multisave))
-            self._start_async_saving(atexit_save=False)
-        threading.Thread(target=self.listen_to_db_commands, daemon=True).start()
+        # commands and regular saves are handled by the RoomDispatcher of the hosting process
 
     @db_session
     def _save(self, exit_save: bool = False) -> bool:
@@ -160,6 +151,9 @@ class WebHostContext(Context):
         # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
         if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
             room.last_activity = datetime.datetime.utcnow()
+        else:
+            # trackers cache saves by last_activity, so it still has to change, by as little as possible
+            room.last_activity += datetime.timedelta(microseconds=1)
         return True
 
     def get_save(self) -> dict:
@@ -168,6 +162,98 @@ class WebHostContext(Context):
         return d
 
 
+class RoomDispatcher:
+    """Does the regular database work of all rooms hosted by a process,
+    so it takes one query for their commands and one transaction for their saves."""
+    interval: typing.ClassVar[float] = 5  # in seconds
+    rooms: typing.Dict[UUID, WebHostContext]
+    command_processors: typing.Dict[UUID, DBCommandProcessor]
+    saving: typing.Optional[asyncio.Future]
+    last_tick: float
+
+    def __init__(self):
+        self.rooms = {}
+        self.command_processors = {}
+        self.saving = None
+        self.last_tick = time.time()
+
+    def add_room(self, ctx: WebHostContext) -> None:
+        self.rooms[ctx.room_id] = ctx
+        self.command_processors[ctx.room_id] = DBCommandProcessor(ctx)
+
+    async def remove_room(self, room_id: UUID) -> None:
+        """Stops the work for a room. Waits for a running save, so it can't overwrite the room's exit save."""
+        self.rooms.pop(room_id, None)
+        self.command_processors.pop(room_id, None)
+        if self.saving:
+            await asyncio.wait((self.saving,))
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.rooms:
+                try:
+                    await self.dispatch_commands()
+                    await self.save_rooms()
+                except Exception as e:
+                    logging.exception(e)
+
+    async def dispatch_commands(self) -> None:
+        commands = await asyncio.get_running_loop().run_in_executor(None, self._pop_commands, list(self.rooms))
+        for room_id, commandtext in commands:
+            if room_id in self.command_processors:
+                self.command_processors[room_id](commandtext)
+
+    async def save_rooms(self) -> None:
+        now = time.time()
+        due = [ctx for ctx in self.rooms.values() if ctx.save_dirty and self._save_due(ctx, now)]
+        self.last_tick = now
+        if not due:
+            return
+        loop = asyncio.get_running_loop()
+        self.saving = loop.create_future()
+        multisaves: typing.Dict[UUID, bytes] = {}
+        try:
+            for ctx in due:
+                if ctx.room_id in self.rooms:  # rooms removed in between do their own exit save
+                    ctx.save_dirty = False
+                    multisaves[ctx.room_id] = pickle.dumps(ctx.get_save())
+                # pickling a save can take a while, so the connections of all rooms get handled between rooms
+                await asyncio.sleep(0)
+            await loop.run_in_executor(None, self._write_multisaves, multisaves)
+        except OperationalError as e:
+            logging.exception(e)
+            logging.info(f"Saving {len(due)} rooms failed. Retrying at their next saving second.")
+            for ctx in due:
+                ctx.save_dirty = True
+        finally:
+            self.saving.set_result(None)
+            self.saving = None
+
+    def _save_due(self, ctx: WebHostContext, now: float) -> bool:
+        """Whether the room's saving second passed since the last tick, so rooms keep saving at their usual time."""
+        saving_second = get_saving_second(ctx.seed_name, ctx.auto_save_interval)
+        return (saving_second - self.last_tick) % ctx.auto_save_interval <= now - self.last_tick
+
+    @staticmethod
+    def _pop_commands(room_ids: typing.List[UUID]) -> typing.List[typing.Tuple[UUID, str]]:
+        with db_session:
+            commands = select(command for command in Command if command.room.id in room_ids).order_by(Command.id)[:]
+            for command in commands:
+                command.delete()
+            return [(command.room.id, command.commandtext) for command in commands]
+
+    @staticmethod
+    def _write_multisaves(multisaves: typing.Dict[UUID, bytes]) -> None:
+        room_ids = list(multisaves)
+        with db_session:
+            # saving only occurs on activity, so this also marks the time of last_activity
+            last_activity = datetime.datetime.utcnow()
+            for room in select(room for room in Room if room.id in room_ids):
+                room.multisave = multisaves[room.id]
+                room.last_activity = last_activity
+
+
 def get_random_port():
     return random.randint(49152, 65535)
 
@@ -221,9 +307,21 @@ def set_up_logging(room_id) -> logging.Logger:
     return logger
 
 
+def get_room_id_from_path(path: str) -> typing.Optional[UUID]:
+    """Room id of a connection to a shared hoster port, which is the short uuid of the room as path."""
+    try:
+        return UUID(bytes=base64.urlsafe_b64decode(path.strip("/") + "=="))
+    except (ValueError, binascii.Error):
+        return None
+
+
 def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                        cert_file: typing.Optional[str], cert_key_file: typing.Optional[str],
-                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue):
+                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue,
+                       shared_port: typing.Optional[int] = None):
+    """Hosts rooms put into rooms_to_run until the process is terminated.
+    Each room listens on its own port, unless shared_port is set. Then all connections arrive on shared_port with
+    the room in their path and a room is only loaded once a client connects to it."""
     Utils.init_logging(name)
     try:
         import resource
@@ -249,6 +347,10 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     gc.collect()  # free intermediate objects used during setup
 
     loop = asyncio.get_event_loop()
+    dispatcher = RoomDispatcher()
+    # rooms hosted on the shared port, resolved once the room is loaded, and the tasks hosting them
+    shared_rooms: typing.Dict[UUID, asyncio.Future[WebHostContext]] = {}
+    shared_room_tasks: typing.Dict[UUID, asyncio.Task] = {}
 
     async def start_room(room_id):
         with Locker(f"RoomLocker {room_id}"):
@@ -257,26 +359,31 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                 ctx = WebHostContext(static_server_data, logger)
                 ctx.load(room_id)
                 ctx.init_save()
+                dispatcher.add_room(ctx)
                 assert ctx.server is None
-                try:
-                    ctx.server = websockets.serve(
-                        functools.partial(server, ctx=ctx), ctx.host, ctx.port, ssl=ssl_context)
-
-                    await ctx.server
-                except OSError:  # likely port in use
-                    ctx.server = websockets.serve(
-                        functools.partial(server, ctx=ctx), ctx.host, 0, ssl=ssl_context)
-
-                    await ctx.server
-                port = 0
-                for wssocket in ctx.server.ws_server.sockets:
-                    socketname = wssocket.getsockname()
-                    if wssocket.family == socket.AF_INET6:
-                        # Prefer IPv4, as most users seem to not have working ipv6 support
-                        if not port:
+                if shared_port:
+                    port = shared_port
+                    shared_rooms[room_id].set_result(ctx)
+                else:
+                    try:
+                        ctx.server = websockets.serve(
+                            functools.partial(server, ctx=ctx), ctx.host, ctx.port, ssl=ssl_context)
+
+                        await ctx.server
+                    except OSError:  # likely port in use
+                        ctx.server = websockets.serve(
+                            functools.partial(server, ctx=ctx), ctx.host, 0, ssl=ssl_context)
+
+                        await ctx.server
+                    port = 0
+                    for wssocket in ctx.server.ws_server.sockets:
+                        socketname = wssocket.getsockname()
+                        if wssocket.family == socket.AF_INET6:
+                            # Prefer IPv4, as most users seem to not have working ipv6 support
+                            if not port:
+                                port = socketname[1]
+                        elif wssocket.family == socket.AF_INET:
                             port = socketname[1]
-                    elif wssocket.family == socket.AF_INET:
-                        port = socketname[1]
                 if port:
                     ctx.logger.info(f'Hosting game at {host}:{port}')
                     with db_session:
@@ -303,14 +410,19 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                 logger.exception(e)
                 raise
             else:
+                await dispatcher.remove_room(room_id)
                 if ctx.saving:
                     ctx._save()
                     setattr(asyncio.current_task(), "save", None)
             finally:
                 try:
-                    ctx.save_dirty = False  # make sure the saving thread does not write to DB after final wakeup
-                    ctx.exit_event.set()  # make sure the saving thread stops at some point
-                    # NOTE: async saving should probably be an async task and could be merged with shutdown_task
+                    await dispatcher.remove_room(room_id)
+                    ctx.save_dirty = False
+                    ctx.exit_event.set()
+                    if shared_port:
+                        # the shared listener stays open, so the room's connections have to be closed instead
+                        for endpoint in ctx.endpoints[:]:
+                            await endpoint.socket.close(1001, "Room shut down")
                     with (db_session):
                         # ensure the Room does not spin up again on its own, minute of safety buffer
                         room = Room.get(id=room_id)
@@ -321,6 +433,53 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                     await asyncio.sleep(5)
                     rooms_shutting_down.put(room_id)
 
+    def load_shared_room(room_id: UUID) -> asyncio.Future[WebHostContext]:
+        ready = shared_rooms[room_id] = loop.create_future()
+
+        def room_stopped(task: asyncio.Task) -> None:
+            del shared_rooms[room_id], shared_room_tasks[room_id]
+            if not ready.done():
+                ready.set_exception(ConnectionRefusedError(f"Room {room_id} could not be hosted."))
+            if not task.cancelled() and task.exception():
+                logging.error(f"Hosting room {room_id} failed.", exc_info=task.exception())
+
+        task = shared_room_tasks[room_id] = asyncio.create_task(start_room(room_id))
+        task.add_done_callback(room_stopped)
+        return ready
+
+    async def route_connection(websocket: websockets.WebSocketServerProtocol) -> None:
+        room_id = get_room_id_from_path(websocket.path)
+        while True:
+            ready = shared_rooms.get(room_id)
+            if ready is None:
+                with db_session:
+                    room_exists = room_id is not None and Room.exists(id=room_id)
+                if not room_exists:
+                    await websocket.close(4004, "Room not found")
+                    return
+                ready = load_shared_room(room_id)
+            try:
+                ctx = await asyncio.shield(ready)
+            except ConnectionRefusedError:
+                await websocket.close(1011, "Room could not be hosted")
+                return
+            if not ctx.exit_event.is_set():
+                break
+            # the room is shutting down, so it has to be loaded again once it is done
+            await asyncio.wait((shared_room_tasks[room_id],))
+        await server(websocket, websocket.path, ctx)
+
+    async def announce_room(room_id: UUID) -> None:
+        """Rooms on the shared port are loaded on their first connection, so only the port needs to be made known."""
+        with db_session:
+            room = Room.get(id=room_id)
+            if room and room.last_port != shared_port:
+                room.last_port = shared_port
+
+    if shared_port:
+        loop.run_until_complete(websockets.serve(route_connection, None, shared_port, ssl=ssl_context))
+        logging.info(f"Hosting rooms of {name} at {host}:{shared_port}")
+
     class Starter(threading.Thread):
         _tasks: typing.List[asyncio.Future]
 
@@ -336,12 +495,14 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
             while 1:
                 next_room = rooms_to_run.get(block=True,  timeout=None)
                 gc.collect()
-                task = asyncio.run_coroutine_threadsafe(start_room(next_room), loop)
+                task = asyncio.run_coroutine_threadsafe(
+                    announce_room(next_room) if shared_port else start_room(next_room), loop)
                 self._tasks.append(task)
                 task.add_done_callback(self._done)
                 logging.info(f"Starting room {next_room} on {name}.")
                 del task  # delete reference to task object
 
+    dispatcher_task = loop.create_task(dispatcher.run())  # noqa: F841, keeps a reference to the task
     starter = Starter()
     starter.daemon = True
     starter.start()
@@ -1,7 +1,9 @@
 import datetime
 import collections
+import functools
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, NamedTuple, Counter
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, NamedTuple, Counter, MutableMapping
 from uuid import UUID
 from email.utils import parsedate_to_datetime
 
@@ -12,10 +14,12 @@ from MultiServer import Context, get_saving_second
 from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
 from Utils import restricted_loads, KeyedDefaultDict
 from . import app, cache
-from .models import GameDataPackage, Room
+from .models import GameDataPackage, Room, Seed
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
+# Number of decoded seeds and multisaves kept by each WebHost process, so repeated tracker requests skip decoding.
+TRACKER_DATA_CACHE_SIZE = 32
 
 _multidata_cache = {}
 _multiworld_trackers: Dict[str, Callable] = {}
@@ -41,6 +45,44 @@ def _cache_results(func: Callable) -> Callable:
     return method_wrapper
 
 
+@functools.lru_cache(maxsize=TRACKER_DATA_CACHE_SIZE)
+def _get_multidata(seed_id: UUID) -> MutableMapping[str, Any]:
+    """Decoded multidata of a seed, which never changes. Trackers only read it, so it is shared between requests."""
+    return Context.decompress(Seed.get(id=seed_id).multidata)
+
+
+@functools.lru_cache(maxsize=TRACKER_DATA_CACHE_SIZE)
+def _get_multisave(room_id: UUID, last_activity: datetime.datetime) -> Dict[str, Any]:
+    """Decoded multisave of a room. Every save also moves the room's last_activity, so that is what it is keyed by."""
+    multisave = Room.get(id=room_id).multisave
+    return restricted_loads(multisave) if multisave else {}
+
+
+class _IdToName(Dict[int, str]):
+    """Id to name table, which names unknown ids without adding them, as the table is shared between requests."""
+    kind: str
+
+    def __init__(self, kind: str, name_to_id: Dict[str, int]):
+        super().__init__((id, name) for name, id in name_to_id.items())
+        self.kind = kind
+
+    def __missing__(self, code: int) -> str:
+        return f"Unknown {self.kind} (ID: {code})"
+
+
+@functools.lru_cache(maxsize=256)
+def _get_game_lookup_tables(checksum: str) \
+        -> Tuple[Mapping[int, str], Mapping[int, str], Mapping[str, int], Mapping[str, int]]:
+    """Read-only item and location id to name and name to id tables of a game data package."""
+    game_package = restricted_loads(GameDataPackage.get(checksum=checksum).data)
+    return (
+        MappingProxyType(_IdToName("Item", game_package["item_name_to_id"])),
+        MappingProxyType(_IdToName("Location", game_package["location_name_to_id"])),
+        MappingProxyType(game_package["item_name_to_id"]),
+        MappingProxyType(game_package["location_name_to_id"]),
+    )
+
+
 @dataclass
 class TrackerData:
     """A helper dataclass that is instantiated each time an HTTP request comes in for tracker data.
@@ -56,30 +98,29 @@ class TrackerData:
     def __init__(self, room: Room):
         """Initialize a new RoomMultidata object for the current room."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
-        self._multisave = restricted_loads(room.multisave) if room.multisave else {}
+        self._multidata = _get_multidata(room.seed.id)
+        self._multisave = _get_multisave(room.id, room.last_activity)
         self._tracker_cache = {}
 
-        self.item_name_to_id: Dict[str, Dict[str, int]] = {}
-        self.location_name_to_id: Dict[str, Dict[str, int]] = {}
+        self.item_name_to_id: Dict[str, Mapping[str, int]] = {}
+        self.location_name_to_id: Dict[str, Mapping[str, int]] = {}
 
         # Generate inverse lookup tables from data package, useful for trackers.
-        self.item_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
+        self.item_id_to_name: Dict[str, Mapping[int, str]] = KeyedDefaultDict(lambda game_name: {
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Item (ID: {code})")
         })
-        self.location_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
+        self.location_id_to_name: Dict[str, Mapping[int, str]] = KeyedDefaultDict(lambda game_name: {
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
         })
         for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
+            item_id_to_name, location_id_to_name, item_name_to_id, location_name_to_id = \
+                _get_game_lookup_tables(game_package["checksum"])
+            self.item_id_to_name[game] = item_id_to_name
+            self.location_id_to_name[game] = location_id_to_name
 
             # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["location_name_to_id"]
+            self.item_name_to_id[game] = item_name_to_id
+            self.location_name_to_id[game] = location_name_to_id
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
@@ -118,9 +159,14 @@ class TrackerData:
         """Retrieves the set of all locations not marked complete by this player."""
         return set(self.get_player_locations(team, player)) - self.get_player_checked_locations(team, player)
 
+    @_cache_results
     def get_player_received_items(self, team: int, player: int) -> List[NetworkItem]:
         """Returns all items received to this player in order of received."""
-        return self._multisave.get("received_items", {}).get((team, player, True), [])
+        received_items = self._multisave.get("received_items", {})
+        if (team, player) in received_items:
+            return received_items[team, player].view(True)[:]
+        # saves before version 3 have a list for each items_handling
+        return received_items.get((team, player, True), [])
 
     @_cache_results
     def get_player_inventory_counts(self, team: int, player: int) -> collections.Counter:
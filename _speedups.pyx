@@ -27,9 +27,11 @@ cdef extern from *:
 ctypedef uint32_t ap_player_t  # on AMD64 this is faster (and smaller) than 64bit ints
 ctypedef uint32_t ap_flags_t
 ctypedef int64_t ap_id_t
+ctypedef uint32_t ap_entry_index_t  # index into LocationStore.entries
 
 cdef ap_player_t MAX_PLAYER_ID = 1000000  # limit the size of indexing array
 cdef size_t INVALID_SIZE = <size_t>(-1)  # this is all 0xff... adding 1 results in 0, but it's not negative
+cdef size_t MAX_ENTRY_COUNT = <ap_entry_index_t>(-1)  # limit of ap_entry_index_t
 
 # configure INTSET for player
 cdef extern from *:
@@ -92,6 +94,11 @@ cdef class LocationStore:
     cdef size_t entry_count
     cdef IndexEntry* sender_index  # 16KB/1000 players
     cdef size_t sender_index_size
+    # entries grouped by receiver, each group in the order of entries or sorted by item, for hints and collect
+    cdef ap_entry_index_t* receiver_entries  # 400KB/100k items
+    cdef ap_entry_index_t* receiver_item_entries  # 400KB/100k items
+    cdef IndexEntry* receiver_index  # same for both, 16KB/1000 players
+    cdef size_t receiver_index_size
     cdef list _keys  # ~36KB/1000 players, speed up iter (28 per int + 8 per list entry)
     cdef list _items  # ~64KB/1000 players, speed up items (56 per tuple + 8 per list entry)
     cdef list _proxies  # ~92KB/1000 players, speed up self[player] (56 per struct + 28 per len + 8 per list entry)
@@ -100,7 +107,8 @@ cdef class LocationStore:
     def get_size(self):
         from sys import getsizeof
         size = getsizeof(self) + getsizeof(self._mem) + getsizeof(self._len) \
-                + sizeof(LocationEntry) * self.entry_count + sizeof(IndexEntry) * self.sender_index_size
+                + sizeof(LocationEntry) * self.entry_count + sizeof(IndexEntry) * self.sender_index_size \
+                + 2 * sizeof(ap_entry_index_t) * self.entry_count + sizeof(IndexEntry) * self.receiver_index_size
         size += getsizeof(self._keys) + getsizeof(self._items) + getsizeof(self._proxies)
         size += sum(sizeof(key) for key in self._keys)
         size += sum(sizeof(item) for item in self._items)
@@ -117,6 +125,7 @@ cdef class LocationStore:
 
         # iterate over everything to get all maxima and validate everything
         cdef size_t max_sender = INVALID_SIZE  # keep track of highest used player id for indexing
+        cdef size_t max_receiver = 0
         cdef size_t sender_count = 0
         cdef size_t count = 0
         for sender, locations in locations_dict.items():
@@ -131,6 +140,7 @@ cdef class LocationStore:
                 receiver = data[1]
                 if receiver < 1 or receiver > MAX_PLAYER_ID:
                     raise ValueError(f"Invalid player id {receiver} for item")
+                max_receiver = max(max_receiver, receiver)
                 count += 1
             sender_count += 1
 
@@ -144,16 +154,23 @@ cdef class LocationStore:
         if not count:
             warnings.warn("Game has no locations")
 
+        if count > MAX_ENTRY_COUNT:
+            raise ValueError(f"Too many locations: {count}")
+
         # allocate the arrays and invalidate index (0xff...)
         if count:
             # leaving entries as NULL if there are none, makes potential memory errors more visible
             self.entries = <LocationEntry*>self._mem.alloc(count, sizeof(LocationEntry))
+            self.receiver_entries = <ap_entry_index_t*>self._mem.alloc(count, sizeof(ap_entry_index_t))
+            self.receiver_item_entries = <ap_entry_index_t*>self._mem.alloc(count, sizeof(ap_entry_index_t))
         self.sender_index = <IndexEntry*>self._mem.alloc(max_sender + 1, sizeof(IndexEntry))
         self._raw_proxies = <PyObject**>self._mem.alloc(max_sender + 1, sizeof(PyObject*))
+        self.receiver_index = <IndexEntry*>self._mem.alloc(max_receiver + 1, sizeof(IndexEntry))
 
         assert (not self.entries) == (not count)
         assert self.sender_index
         assert self._raw_proxies
+        assert self.receiver_index
 
         # build entries and index
         cdef size_t i = 0
@@ -172,6 +189,17 @@ cdef class LocationStore:
                 self.sender_index[sender].count += 1
                 i += 1
 
+        # build receiver indices, sorting is stable, so entries of a receiver stay in order
+        receiver_entries = sorted(range(count), key=lambda e: self.entries[e].receiver)
+        receiver_item_entries = sorted(receiver_entries, key=lambda e: (self.entries[e].receiver, self.entries[e].item))
+        for i in range(count):
+            self.receiver_entries[i] = receiver_entries[i]
+            self.receiver_item_entries[i] = receiver_item_entries[i]
+            receiver = self.entries[receiver_entries[i]].receiver
+            if not self.receiver_index[receiver].count:
+                self.receiver_index[receiver].start = i
+            self.receiver_index[receiver].count += 1
+
         # build pyobject caches
         self._proxies.append(None)  # player 0
         assert self.sender_index[0].count == 0
@@ -187,6 +215,7 @@ cdef class LocationStore:
             self._raw_proxies[i] = <PyObject*>proxy
 
         self.sender_index_size = max_sender + 1
+        self.receiver_index_size = max_receiver + 1
         self.entry_count = count
         self._len = sender_count
 
@@ -215,80 +244,151 @@ cdef class LocationStore:
         return self._items
 
     # specialized accessors
+    cdef size_t _find_item_start(self, ap_player_t receiver, ap_id_t item) nogil:
+        """Returns the position of the first entry of receiver with item in receiver_item_entries, or INVALID_SIZE."""
+        if receiver >= self.receiver_index_size:
+            return INVALID_SIZE
+        # binary search
+        cdef size_t l = self.receiver_index[receiver].start
+        cdef size_t e = l + self.receiver_index[receiver].count
+        cdef size_t r = e
+        cdef size_t m
+        while l < r:
+            m = (l + r) // 2
+            if self.entries[self.receiver_item_entries[m]].item < item:
+                l = m + 1
+            else:
+                r = m
+        if l < e and self.entries[self.receiver_item_entries[l]].item == item:
+            return l
+        return INVALID_SIZE
+
     def find_item(self, slots: Set[int], seeked_item_id: int) -> Generator[Tuple[int, int, int, int, int], None, None]:
         cdef ap_id_t item = seeked_item_id
         cdef ap_player_t receiver
-        cdef ap_player_set* receivers
-        cdef size_t slot_count = len(slots)
-        if slot_count == 1:
-            # specialized implementation for single slot
-            receiver = list(slots)[0]
-            with nogil:
-                for entry in self.entries[:self.entry_count]:
-                    if entry.item == item and entry.receiver == receiver:
-                        with gil:
-                            yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
-        elif slot_count:
-            # generic implementation with lookup in set
-            receivers = ap_player_set_new(min(1023, slot_count))  # limit top level struct to 16KB
-            if not receivers:
-                raise MemoryError()
-            try:
-                for receiver in slots:
-                    if not ap_player_set_add(receivers, receiver):
-                        raise MemoryError()
-                with nogil:
-                    for entry in self.entries[:self.entry_count]:
-                        if entry.item == item and ap_player_set_contains(receivers, entry.receiver):
-                            with gil:
-                                yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
-            finally:
-                ap_player_set_free(receivers)
+        cdef size_t i
+        cdef LocationEntry* entry
+        found: List[int] = []
+        for slot in slots:
+            if slot < 1 or slot > MAX_PLAYER_ID:
+                continue
+            receiver = slot
+            i = self._find_item_start(receiver, item)
+            if i == INVALID_SIZE:
+                continue
+            while i < self.entry_count and self.entries[self.receiver_item_entries[i]].item == item \
+                    and self.entries[self.receiver_item_entries[i]].receiver == receiver:
+                found.append(self.receiver_item_entries[i])
+                i += 1
+        if len(slots) > 1:
+            found.sort()  # in order of entries, like a scan of all entries
+        for i in found:
+            entry = self.entries + i
+            yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
 
     def get_for_player(self, slot: int) -> Dict[int, Set[int]]:
-        cdef ap_player_t receiver = slot
         all_locations: Dict[int, Set[int]] = {}
-        with nogil:
-            for entry in self.entries[:self.entry_count]:
-                if entry.receiver == receiver:
-                    with gil:
-                        sender: int = entry.sender
-                        if sender not in all_locations:
-                            all_locations[sender] = set()
-                        all_locations[sender].add(entry.location)
+        if slot < 1 or slot >= self.receiver_index_size:
+            return all_locations
+        cdef ap_player_t receiver = slot
+        cdef size_t start = self.receiver_index[receiver].start
+        cdef size_t count = self.receiver_index[receiver].count
+        cdef LocationEntry* entry
+        cdef ap_entry_index_t i
+        for i in self.receiver_entries[start:start + count]:
+            entry = self.entries + i
+            sender: int = entry.sender
+            if sender not in all_locations:
+                all_locations[sender] = set()
+            all_locations[sender].add(entry.location)
         return all_locations
 
+    # checked locations can be given as a set or as a bitmap, with a bit for each location of the slot in store order
+
+    def new_bitmap(self, slot: int) -> bytearray:
+        """Returns a bitmap of slot's locations with none checked."""
+        cdef ap_player_t sender = slot
+        if sender < 1 or sender >= self.sender_index_size:
+            raise KeyError(slot)
+        return bytearray((self.sender_index[sender].count + 7) // 8)
+
+    def set_checked(self, bitmap: bytearray, slot: int, locations: Iterable[int]) -> None:
+        """Marks locations of slot as checked in bitmap. Unknown locations are ignored."""
+        cdef ap_player_t sender = slot
+        if sender < 1 or sender >= self.sender_index_size:
+            raise KeyError(slot)
+        cdef unsigned char[:] bits = self._get_bits(bitmap, sender)
+        cdef size_t start = self.sender_index[sender].start
+        cdef size_t count = self.sender_index[sender].count
+        cdef ap_id_t location
+        cdef size_t l, r, m
+        for location_id in locations:
+            location = location_id
+            # binary search
+            l = start
+            r = start + count
+            while l < r:
+                m = (l + r) // 2
+                if self.entries[m].location < location:
+                    l = m + 1
+                else:
+                    r = m
+            if l < start + count and self.entries[l].location == location:
+                bits[(l - start) >> 3] |= 1 << ((l - start) & 7)
+
+    cdef object _get_bits(self, object bitmap, ap_player_t sender):
+        if len(bitmap) < (self.sender_index[sender].count + 7) // 8:
+            raise ValueError(f"Bitmap too small for player {sender}")
+        return bitmap
+
     def get_checked(self, state: State, team: int, slot: int) -> List[int]:
         cdef ap_player_t sender = slot
         if sender < 0 or sender >= self.sender_index_size:
             raise KeyError(slot)
 
+        cdef LocationEntry* entry
+        cdef size_t start = self.sender_index[sender].start
+        cdef size_t count = self.sender_index[sender].count
+        cdef size_t i
+        cdef const unsigned char[:] bits
+        checked = state[team, slot]
+        if isinstance(checked, (bytes, bytearray)):
+            bits = self._get_bits(checked, sender)
+            return [self.entries[start + i].location for
+                    i in range(count) if
+                    bits[i >> 3] >> (i & 7) & 1]
+
         # This used to validate checks actually exist. A remnant from the past.
         # If the order of locations becomes relevant at some point, we could not do sorted(set), so leaving it.
-        cdef set checked = state[team, slot]
+        cdef set checked_set = checked
 
-        if not len(checked):
+        if not len(checked_set):
             # Skips loop if none have been checked.
             # This optimizes the case where everyone connects to a fresh game at the same time.
             return []
 
         # Unless the set is close to empty, it's cheaper to use the python set directly, so we do that.
-        cdef LocationEntry* entry
-        cdef size_t start = self.sender_index[sender].start
-        cdef size_t count = self.sender_index[sender].count
         return [entry.location for
                 entry in self.entries[start:start+count] if
-                entry.location in checked]
+                entry.location in checked_set]
 
     def get_missing(self, state: State, team: int, slot: int) -> List[int]:
         cdef LocationEntry* entry
         cdef ap_player_t sender = slot
         if sender < 0 or sender >= self.sender_index_size:
             raise KeyError(slot)
-        cdef set checked = state[team, slot]
         cdef size_t start = self.sender_index[sender].start
         cdef size_t count = self.sender_index[sender].count
-        if not len(checked):
+        cdef size_t i
+        cdef const unsigned char[:] bits
+        checked = state[team, slot]
+        if isinstance(checked, (bytes, bytearray)):
+            bits = self._get_bits(checked, sender)
+            return [self.entries[start + i].location for
+                    i in range(count) if
+                    not bits[i >> 3] >> (i & 7) & 1]
+        cdef set checked_set = checked
+        if not len(checked_set):
             # Skip `in` if none have been checked.
             # This optimizes the case where everyone connects to a fresh game at the same time.
             return [entry.location for
@@ -297,19 +397,27 @@ cdef class LocationStore:
             # Unless the set is close to empty, it's cheaper to use the python set directly, so we do that.
             return [entry.location for
                     entry in self.entries[start:start + count] if
-                    entry.location not in checked]
+                    entry.location not in checked_set]
 
     def get_remaining(self, state: State, team: int, slot: int) -> List[Tuple[int, int]]:
         cdef LocationEntry* entry
         cdef ap_player_t sender = slot
         if sender < 0 or sender >= self.sender_index_size:
             raise KeyError(slot)
-        cdef set checked = state[team, slot]
         cdef size_t start = self.sender_index[sender].start
         cdef size_t count = self.sender_index[sender].count
+        cdef size_t i
+        cdef const unsigned char[:] bits
+        checked = state[team, slot]
+        if isinstance(checked, (bytes, bytearray)):
+            bits = self._get_bits(checked, sender)
+            return sorted([(self.entries[start + i].receiver, self.entries[start + i].item) for
+                           i in range(count) if
+                           not bits[i >> 3] >> (i & 7) & 1])
+        cdef set checked_set = checked
         return sorted([(entry.receiver, entry.item) for
                         entry in self.entries[start:start+count] if
-                        entry.location not in checked])
+                        entry.location not in checked_set])
 
 
 @cython.auto_pickle(False)
@@ -20,7 +20,7 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 ]]
 
-local SCRIPT_VERSION = 1
+local SCRIPT_VERSION = 2
 
 -- Set to log incoming requests
 -- Will cause lag due to large console output
@@ -37,6 +37,13 @@ field `type`. The value of `type` determines what other fields may exist.
 To get the script version, instead of JSON, send "VERSION" to get the script
 version directly (e.g. "2").
 
+Messages don't have to wait for the previous response before being sent. Every
+message received before the end of a frame is processed on that frame, and
+responses are always sent in the order their messages were received.
+
+The script may also send notifications, which are single JSON objects instead
+of lists and are not responses to any message (see `SUBSCRIBE`).
+
 #### Ex. 1
 
 Request: `[{"type": "PING"}]`
@@ -197,6 +204,28 @@ Response:
     Additional Fields:
     - `value` (`number`): The number of seconds to set the interval to
 
+- `SUBSCRIBE`  
+    Watches an array of bytes at the provided address. At the end of the
+    frame this request is processed on, and of every frame the bytes change
+    on, a `MEMORY_CHANGED` notification is sent with their value.
+    Subscriptions end when the client disconnects.
+
+    Expected Response Type: `SUBSCRIBE_RESPONSE`
+
+    Additional Fields:
+    - `address` (`int`): The address of the memory to watch
+    - `size` (`int`): The number of bytes to watch
+    - `domain` (`string`): The name of the memory domain the address
+    corresponds to
+
+- `UNSUBSCRIBE`  
+    Stops watching memory for a previous `SUBSCRIBE`.
+
+    Expected Response Type: `UNSUBSCRIBE_RESPONSE`
+
+    Additional Fields:
+    - `id` (`int`): The id of the subscription to end
+
 
 ### Response Types
 
@@ -260,11 +289,30 @@ Response:
 - `SET_MESSAGE_INTERVAL_RESPONSE`  
     Acknowledges `SET_MESSAGE_INTERVAL`.
 
+- `SUBSCRIBE_RESPONSE`  
+    Acknowledges `SUBSCRIBE`.
+
+    Additional Fields:
+    - `id` (`int`): The id of the new subscription
+
+- `UNSUBSCRIBE_RESPONSE`  
+    Acknowledges `UNSUBSCRIBE`.
+
 - `ERROR`  
     Signifies that something has gone wrong while processing a request.
 
     Additional Fields:
     - `err` (`string`): A description of the problem
+
+
+### Notification Types
+
+- `MEMORY_CHANGED`  
+    Contains the new value of memory watched by a `SUBSCRIBE`.
+
+    Additional Fields:
+    - `id` (`int`): The id of the subscription
+    - `value` (`string`): A base64 string representing the watched data
 ]]
 
 local bizhawk_version = client.getversion()
@@ -311,6 +359,9 @@ local locked = false
 
 local rom_hash = nil
 
+local subscriptions = {}
+local next_subscription_id = 1
+
 function queue_push (self, value)
     self[self.right] = value
     self.right = self.right + 1
@@ -473,6 +524,26 @@ request_handlers = {
         return res
     end,
 
+    ["SUBSCRIBE"] = function (req)
+        local res = {}
+
+        res["type"] = "SUBSCRIBE_RESPONSE"
+        res["id"] = next_subscription_id
+        subscriptions[next_subscription_id] = {address = req["address"], size = req["size"], domain = req["domain"]}
+        next_subscription_id = next_subscription_id + 1
+
+        return res
+    end,
+
+    ["UNSUBSCRIBE"] = function (req)
+        local res = {}
+
+        res["type"] = "UNSUBSCRIBE_RESPONSE"
+        subscriptions[req["id"]] = nil
+
+        return res
+    end,
+
     ["default"] = function (req)
         local res = {}
 
@@ -501,15 +572,15 @@ function send_receive ()
             print("Connection to client closed")
         end
         current_state = STATE_NOT_CONNECTED
-        return
+        return false
     elseif err == "timeout" then
         unlock()
-        return
+        return false
     elseif err ~= nil then
         print(err)
         current_state = STATE_NOT_CONNECTED
         unlock()
-        return
+        return false
     end
 
     -- Reset timeout timer
@@ -548,6 +619,20 @@ function send_receive ()
 
         client_socket:send(json.encode(res).."\n")
     end
+
+    return true
+end
+
+-- Sends a MEMORY_CHANGED notification for each subscription whose memory changed this frame
+function send_memory_changes ()
+    for id, subscription in pairs(subscriptions) do
+        local value = base64.encode(
+            memory.read_bytes_as_array(subscription.address, subscription.size, subscription.domain))
+        if value ~= subscription.value then
+            subscription.value = value
+            client_socket:send(json.encode({type = "MEMORY_CHANGED", id = id, value = value}).."\n")
+        end
+    end
 end
 
 function initialize_server ()
@@ -607,15 +692,23 @@ function main ()
                     print("Client connected")
                     current_state = STATE_CONNECTED
                     client_socket = client
+                    locked = false
+                    subscriptions = {}
                     server:close()
                     server = nil
                     client_socket:settimeout(0)
                 end
             end
         else
+            -- Process every message that has arrived, not just one, so pipelined messages don't wait a frame each
+            local received
             repeat
-                send_receive()
-            until not locked
+                received = send_receive()
+            until current_state ~= STATE_CONNECTED or (not locked and not received)
+
+            if current_state == STATE_CONNECTED then
+                send_memory_changes()
+            end
 
             if timeout_timer <= 0 then
                 print("Client timed out")
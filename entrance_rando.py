@@ -185,9 +185,11 @@ class ERPlacementState:
         copied_state = self.collection_state.copy()
         # simulated connection. A real connection is unsafe because the region graph is shallow-copied and would
         # propagate back to the real multiworld.
-        copied_state.reachable_regions[self.world.player].add(target_entrance.connected_region)
-        copied_state.blocked_connections[self.world.player].remove(source_exit)
-        copied_state.blocked_connections[self.world.player].update(target_entrance.connected_region.exits)
+        # the copy shares its region sets with the real state until they are made private to it
+        reachable_regions, blocked_connections = copied_state._get_private_region_sets(self.world.player)
+        reachable_regions.add(target_entrance.connected_region)
+        blocked_connections.remove(source_exit)
+        blocked_connections.update(target_entrance.connected_region.exits)
         copied_state.update_reachable_regions(self.world.player)
         copied_state.sweep_for_advancements()
         # test that at there are newly reachable randomized exits that are ACTUALLY reachable
@@ -674,6 +674,13 @@ class GeneratorOptions(Group):
         start_inventory -> Move remaining items to start_inventory, generate additional filler items to fill locations.
         """
 
+    class Processes(int):
+        """
+        Number of worker processes to run process safe world stages in, for example generate_output.
+        Worlds opt into this per stage. 1 or lower runs everything in the generating process.
+        Only supported on platforms that can fork processes.
+        """
+
     enemizer_path: EnemizerPath = EnemizerPath("EnemizerCLI/EnemizerCLI.Core")  # + ".exe" is implied on Windows
     player_files_path: PlayerFilesPath = PlayerFilesPath("Players")
     players: Players = Players(0)
@@ -683,6 +690,7 @@ class GeneratorOptions(Group):
     race: Race = Race(0)
     plando_options: PlandoOptions = PlandoOptions("bosses, connections, texts")
     panic_method: PanicMethod = PanicMethod("swap")
+    processes: Processes = Processes(1)
     loglevel: str = "info"
     logtime: bool = False
 
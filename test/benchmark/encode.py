@@ -0,0 +1,49 @@
+def run_encode_benchmark():
+    """Compare NetUtils.encode against scanning for NamedTuples and encoding the copy, for typical server messages."""
+    import logging
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from NetUtils import Hint, HintStatus, NetworkItem, NetworkPlayer, NetworkSlot, SlotType, \
+        _encode, _scan_for_TypedTuples, encode
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    iterations = 10_000
+    messages = {
+        "ReceivedItems": [{"cmd": "ReceivedItems", "index": 0,
+                           "items": [NetworkItem(item, item * 7, item % 30, item & 7) for item in range(100)]}],
+        "PrintJSON ItemSend": [{"cmd": "PrintJSON", "data": [
+            {"text": "1", "type": "player_id"}, {"text": " sent "},
+            {"text": "100", "player": 2, "flags": 1, "type": "item_id"}, {"text": " to "},
+            {"text": "2", "type": "player_id"}, {"text": " ("},
+            {"text": "1000", "player": 1, "type": "location_id"}, {"text": ")"}],
+            "type": "ItemSend", "receiving": 2, "item": NetworkItem(100, 1000, 1, 1)}],
+        "RoomUpdate": [{"cmd": "RoomUpdate", "checked_locations": list(range(500)), "hint_points": 10,
+                        "players": [NetworkPlayer(0, slot, f"Alias {slot}", f"Player {slot}")
+                                    for slot in range(1, 101)]}],
+        "Hints": [{"cmd": "SetReply", "key": "_read_hints_0_1", "value": [
+            Hint(1, 2, location, location, False, "", 1, HintStatus.HINT_PRIORITY) for location in range(50)]}],
+        "Connected": [{"cmd": "Connected", "team": 0, "slot": 1, "checked_locations": [],
+                       "missing_locations": list(range(300)),
+                       "slot_info": {slot: NetworkSlot(f"Player {slot}", "Game", SlotType.player)
+                                     for slot in range(1, 101)}}],
+    }
+
+    for name, message in messages.items():
+        assert encode(message) == _encode(_scan_for_TypedTuples(message)), name
+        with TimeIt(f"{iterations} scan and encode of {name}", logger) as scan_time:
+            for _ in range(iterations):
+                _encode(_scan_for_TypedTuples(message))
+        with TimeIt(f"{iterations} encode of {name}", logger) as encode_time:
+            for _ in range(iterations):
+                encode(message)
+        logger.info(f"{name}: {scan_time.dif / encode_time.dif:.2f}x faster")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_encode_benchmark()
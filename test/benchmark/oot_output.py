@@ -0,0 +1,53 @@
+def run_oot_output_benchmark():
+    """Time a full Ocarina of Time output, the ROM steps in it, and applying its patch. Needs the OoT ROM."""
+    import logging
+    import os
+    import tempfile
+    import zipfile
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from Fill import distribute_items_restrictive
+    from settings import get_settings
+    from test.general import setup_solo_multiworld
+    from worlds.AutoWorld import call_all
+    import worlds.oot
+    from worlds.oot import OOTWorld
+    from worlds.oot.N64Patch import apply_patch_file
+    from worlds.oot.Rom import Rom
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    def timed(name, function):
+        def wrapper(*args, **kwargs):
+            with TimeIt(name, logger):
+                return function(*args, **kwargs)
+        return wrapper
+
+    multiworld = setup_solo_multiworld(OOTWorld, seed=0)
+    distribute_items_restrictive(multiworld)
+    call_all(multiworld, "post_fill")
+
+    worlds.oot.patch_rom = timed("patch_rom", worlds.oot.patch_rom)
+    worlds.oot.patch_cosmetics = timed("patch_cosmetics", worlds.oot.patch_cosmetics)
+    worlds.oot.create_patch_file = timed("create_patch_file", worlds.oot.create_patch_file)
+    Rom.update_header = timed("update_header", Rom.update_header)
+
+    with tempfile.TemporaryDirectory() as output_directory:
+        with TimeIt("full output", logger):
+            call_all(multiworld, "generate_output", output_directory)
+
+        apz5_file = os.path.join(output_directory, next(name for name in os.listdir(output_directory)
+                                                        if name.endswith(".apz5")))
+        sub_file = next(name for name in zipfile.ZipFile(apz5_file).namelist() if name.endswith(".zpf"))
+        rom = Rom(file=get_settings().oot_options.rom_file)
+        with TimeIt("apply_patch_file", logger):
+            apply_patch_file(rom, apz5_file, sub_file=sub_file)
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_oot_output_benchmark()
@@ -186,6 +186,25 @@ class TestDisconnectForRandomization(unittest.TestCase):
         self.assertEqual(2, r2.entrances[0].randomization_group)
 
 
+class TestSpeculativeConnection(unittest.TestCase):
+    def test_original_state_unchanged(self):
+        """tests that testing a connection on a copy of the state doesn't change the state it was copied from"""
+        multiworld = generate_test_multiworld()
+        generate_disconnected_region_grid(multiworld, 3)
+        er_state = ERPlacementState(multiworld.worlds[1], False)
+        er_state.collection_state.update_reachable_regions(1)
+        reachable_regions = set(er_state.collection_state.reachable_regions[1])
+        blocked_connections = set(er_state.collection_state.blocked_connections[1])
+
+        source_exit = multiworld.get_entrance("region0_right", 1)
+        target_entrance = next(entrance for entrance in multiworld.get_region("region1", 1).entrances
+                               if entrance.name == "region1_left")
+        er_state.test_speculative_connection(source_exit, target_entrance)
+
+        self.assertEqual(reachable_regions, er_state.collection_state.reachable_regions[1])
+        self.assertEqual(blocked_connections, er_state.collection_state.blocked_connections[1])
+
+
 class TestRandomizeEntrances(unittest.TestCase):
     def test_determinism(self):
         """tests that the same output is produced for the same input"""
@@ -343,6 +343,37 @@ class TestFillRestrictive(unittest.TestCase):
         self.assertEqual(player2.locations[0].item, player1.prog_items[0])
         self.assertEqual(player2.locations[1].item, player1.prog_items[1])
 
+    def test_reachability_checked_once_per_round(self):
+        """Test that placing several items against the same state only checks reachability of a location once"""
+        multiworld = generate_test_multiworld(2)
+        player1 = generate_player_data(multiworld, 1, 3, 1)
+        player2 = generate_player_data(multiworld, 2, 0, 1)
+        access_checks = []
+
+        def unreachable(state) -> bool:
+            access_checks.append(state)
+            return False
+        set_rule(player1.locations[0], unreachable)
+
+        fill_restrictive(multiworld, multiworld.state, player1.locations.copy(),
+                         player1.prog_items + player2.prog_items)
+
+        self.assertIsNone(player1.locations[0].item)
+        self.assertIsNotNone(player1.locations[1].item)
+        self.assertIsNotNone(player1.locations[2].item)
+        self.assertEqual(len(access_checks), 1)
+
+    def test_always_allow_unreachable_fill(self):
+        """Test that always_allow can still place items into locations that are not reachable"""
+        multiworld = generate_test_multiworld(1)
+        player1 = generate_player_data(multiworld, 1, 1, 1)
+        set_rule(player1.locations[0], lambda state: False)
+        player1.locations[0].always_allow = lambda state, item: True
+
+        fill_restrictive(multiworld, multiworld.state, player1.locations.copy(), player1.prog_items.copy())
+
+        self.assertEqual(player1.locations[0].item, player1.prog_items[0])
+
     def test_restrictive_progress(self):
         """Test that various spheres with different requirements can be filled"""
         multiworld = generate_test_multiworld()
@@ -448,6 +479,29 @@ class TestFillRestrictive(unittest.TestCase):
         self.assertTrue(multiworld.state.prog_items[item.player][item.name], "Sweep did not collect - Test flawed")
         self.assertEqual(multiworld.state.prog_items[item.player][item.name], 1, "Sweep collected multiple times")
 
+    def test_cross_player_sweep(self):
+        """Test that sweep rechecks locations whose rules depend on items collected for another player"""
+        multiworld = generate_test_multiworld(2)
+        player1 = generate_player_data(multiworld, 1, 2, 2)
+        player2 = generate_player_data(multiworld, 2, 2, 2)
+        chain = [(player2.locations[0], player2.prog_items[0]),
+                 (player1.locations[0], player1.prog_items[0]),
+                 (player2.locations[1], player2.prog_items[1]),
+                 (player1.locations[1], player1.prog_items[1])]
+        for (location, item), (next_location, _) in zip(chain, chain[1:]):
+            set_rule(next_location, lambda state, item=item: state.has(item.name, item.player))
+        for location, item in chain:
+            location.address = None
+            item.code = None
+            location.place_locked_item(item)
+
+        prog_items = multiworld.state.prog_items
+        collected = multiworld.state.sweep_for_advancements()
+        for _, item in chain:
+            self.assertEqual(multiworld.state.prog_items[item.player][item.name], 1)
+        self.assertIs(multiworld.state.prog_items, prog_items)
+        self.assertEqual(collected, [location for location, _ in chain], "Sweep did not return collection order")
+
     def test_correct_item_instance_removed_from_pool(self):
         """Test that a placed item gets removed from the submitted pool"""
         multiworld = generate_test_multiworld()
@@ -847,6 +901,38 @@ class TestBalanceMultiworldProgression(unittest.TestCase):
         self.assertRegionContains(
             self.player1.regions[2], self.player2.prog_items[0])
 
+    def test_keeps_only_required_items(self) -> None:
+        """Test that progression balancing only moves the candidates needed to reach the threshold, matching the items
+        moved when every test collected all remaining candidates anew"""
+        multiworld = generate_test_multiworld(2)
+        player1 = generate_player_data(multiworld, 1, prog_item_count=2, basic_item_count=40)
+        player2 = generate_player_data(multiworld, 2, prog_item_count=10, basic_item_count=40)
+        multiworld.completion_condition[player1.id] = lambda state: state.has_all(names(player1.prog_items), 1)
+        multiworld.completion_condition[player2.id] = lambda state: state.has(player2.prog_items[0].name, 2)
+        for player in multiworld.player_ids:
+            multiworld.worlds[player].options.progression_balancing.value = 70
+
+        items = player1.basic_items + player2.basic_items
+        region = player1.generate_region(player1.menu, 20)
+        items = fill_region(multiworld, region, [player1.prog_items[0]] + items)
+        region = player1.generate_region(
+            player1.regions[1], 20, lambda state: state.has(player1.prog_items[0].name, player1.id))
+        items = fill_region(multiworld, region, player2.prog_items + items)
+        # each of player 2's progression items unlocks a few locations, so only some of them are needed
+        region = player2.generate_region(player2.menu, 10)
+        items = fill_region(multiworld, region, items)
+        for item in player2.prog_items:
+            region = player2.generate_region(player2.menu, 3, lambda state, name=item.name: state.has(name, 2))
+            items = fill_region(multiworld, region, items)
+        # not beaten before player 2's items are collected, so that candidates are tested against the threshold
+        multiworld.push_item(player2.regions[2].locations[0], player1.prog_items[1], False)
+
+        balance_multiworld_progression(multiworld)
+
+        moved = {location.item for region in (player1.regions[1], player2.regions[1])
+                 for location in region.locations if location.item in player2.prog_items}
+        self.assertEqual(moved, {player2.prog_items[i] for i in (1, 2, 3, 5, 8, 9)})
+
     def test_ignores_priority_locations(self) -> None:
         """Test that progression items on priority locations don't get moved by balancing"""
         self.multiworld.worlds[self.player1.id].options.progression_balancing.value = 50
@@ -0,0 +1,143 @@
+import multiprocessing
+import os
+import threading
+import unittest
+from unittest import mock
+
+from BaseClasses import Item, ItemClassification
+from worlds.AutoWorld import call_all, call_all_processes, process_pool, submit_process
+from . import TestWorld as GenericTestWorld, generate_locations, generate_test_multiworld, setup_multiworld
+
+
+def generate_early(self: GenericTestWorld) -> None:
+    self.roll = self.random.random()
+    self.pid = os.getpid()
+    self.first_world = self.multiworld.worlds[1]
+
+
+def generate_output(self: GenericTestWorld, output_directory: str) -> str:
+    self.output_location = self.multiworld.get_location(f"player{self.player}_location0", self.player)
+    self.output_event.set()
+    return output_directory
+
+
+def failing_generate_output(self: GenericTestWorld, output_directory: str) -> None:
+    raise RuntimeError(f"no output for player {self.player}")
+
+
+@mock.patch.object(GenericTestWorld, "generate_early", generate_early)
+@mock.patch.object(GenericTestWorld, "generate_output", generate_output)
+@mock.patch.object(GenericTestWorld, "process_safe_stages", frozenset({"generate_early", "generate_output"}))
+class TestCallAllProcesses(unittest.TestCase):
+    def test_matches_call_all(self) -> None:
+        """Tests that running a stage in worker processes merges the same World state back as running it directly."""
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("fork is not supported on this platform")
+        serial = setup_multiworld([GenericTestWorld] * 3, (), seed=1)
+        parallel = setup_multiworld([GenericTestWorld] * 3, (), seed=1)
+        randoms = {player: world.random for player, world in parallel.worlds.items()}
+        call_all(serial, "generate_early")
+        call_all_processes(parallel, "generate_early", 2)
+
+        for player in parallel.player_ids:
+            with self.subTest(player=player):
+                world = parallel.worlds[player]
+                self.assertNotEqual(world.pid, os.getpid())
+                self.assertEqual(world.roll, serial.worlds[player].roll)
+                self.assertIs(world.random, randoms[player])
+                self.assertEqual(world.random.getstate(), serial.worlds[player].random.getstate())
+                self.assertIs(world.multiworld, parallel)
+                self.assertIs(world.first_world, parallel.worlds[1])
+
+    def test_submit_process(self) -> None:
+        """Tests that objects of the generating process are referenced and unchanged attributes are kept."""
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("fork is not supported on this platform")
+        multiworld = generate_test_multiworld(2)
+        for world in multiworld.worlds.values():
+            generate_locations(1, world.player, multiworld.get_region("Menu", world.player))
+            world.output_event = threading.Event()
+            world.unchanged = []
+            world.unpicklable = lambda: None
+        original = {player: dict(vars(world)) for player, world in multiworld.worlds.items()}
+        # what a thread waiting for the event gets to see, which has to include everything the worker changed
+        seen_on_event = []
+        waiting_thread = threading.Thread(target=lambda: seen_on_event.append(
+            multiworld.worlds[1].output_event.wait(10) and hasattr(multiworld.worlds[1], "output_location")))
+        waiting_thread.start()
+
+        with process_pool(multiworld, 2) as pool:
+            futures = {player: submit_process(pool, "generate_output", player, "output")
+                       for player in multiworld.player_ids}
+            for future in futures.values():
+                self.assertEqual(future.result(), "output")
+        waiting_thread.join()
+        self.assertEqual(seen_on_event, [True])
+
+        for player, world in multiworld.worlds.items():
+            with self.subTest(player=player):
+                self.assertIs(world.output_location,
+                              multiworld.get_location(f"player{player}_location0", player))
+                self.assertIs(world.output_event, original[player]["output_event"])
+                self.assertTrue(world.output_event.is_set())
+                self.assertIs(world.unchanged, original[player]["unchanged"])
+                self.assertIs(world.unpicklable, original[player]["unpicklable"])
+
+    def test_failure_sets_events(self) -> None:
+        """Tests that the Events of a World get set in the generating process when its stage fails in a worker, so
+        that threads waiting for them don't deadlock."""
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("fork is not supported on this platform")
+        multiworld = generate_test_multiworld(2)
+        for world in multiworld.worlds.values():
+            world.output_event = threading.Event()
+
+        with mock.patch.object(GenericTestWorld, "generate_output", failing_generate_output), \
+                process_pool(multiworld, 2) as pool:
+            futures = {player: submit_process(pool, "generate_output", player, "output")
+                       for player in multiworld.player_ids}
+            for player, future in futures.items():
+                with self.subTest(player=player):
+                    self.assertTrue(multiworld.worlds[player].output_event.wait(10))
+                    self.assertIsInstance(future.exception(), RuntimeError)
+
+    def test_merge_without_result(self) -> None:
+        """Tests that a successful stage gets merged and sets the Events of the World in the generating process, even
+        if nothing asks for the result of its future."""
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("fork is not supported on this platform")
+        multiworld = generate_test_multiworld(2)
+        for world in multiworld.worlds.values():
+            generate_locations(1, world.player, multiworld.get_region("Menu", world.player))
+            world.output_event = threading.Event()
+
+        with process_pool(multiworld, 2) as pool:
+            for player in multiworld.player_ids:
+                submit_process(pool, "generate_output", player, "output")
+            for player, world in multiworld.worlds.items():
+                with self.subTest(player=player):
+                    self.assertTrue(world.output_event.wait(10))
+                    self.assertIs(world.output_location,
+                                  multiworld.get_location(f"player{player}_location0", player))
+
+    def test_single_process(self) -> None:
+        """Tests that a single process runs the stage in the generating process."""
+        multiworld = setup_multiworld([GenericTestWorld] * 2, (), seed=1)
+        call_all_processes(multiworld, "generate_early", 1)
+        for world in multiworld.worlds.values():
+            self.assertEqual(world.pid, os.getpid())
+
+    def test_duplicate_items(self) -> None:
+        """Tests that worlds running in the generating process are still checked for duplicate item references."""
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("fork is not supported on this platform")
+        multiworld = setup_multiworld([GenericTestWorld] * 3, (), seed=1)
+
+        def duplicate_items(world: GenericTestWorld) -> None:
+            item = Item("Duplicate", ItemClassification.filler, None, world.player)
+            world.multiworld.itempool += [item, item]
+
+        with mock.patch("worlds.AutoWorld.get_process_players", return_value=[1, 2]), \
+                mock.patch.object(GenericTestWorld, "generate_early", duplicate_items):
+            with self.assertRaisesRegex(AssertionError, "Duplicate item reference"):
+                call_all_processes(multiworld, "generate_early", 2)
@@ -0,0 +1,141 @@
+import unittest
+from unittest import mock
+
+from BaseClasses import CollectionState, Item, ItemClassification, Region
+from . import generate_items, generate_locations, generate_test_multiworld
+
+
+class TestCollectionStateCopy(unittest.TestCase):
+    def test_copy_does_not_share_regions(self) -> None:
+        """Tests that regions reached in a copy of a state do not leak into the original or other copies."""
+        multiworld = generate_test_multiworld(2)
+        keys = [generate_items(1, player, True)[0] for player in multiworld.player_ids]
+        for key in keys:
+            menu = multiworld.get_region("Menu", key.player)
+            locked = Region("Locked", key.player, multiworld)
+            multiworld.regions.append(locked)
+            menu.connect(locked, rule=lambda state, key=key: state.has(key.name, key.player))
+        key = keys[0]
+
+        state = multiworld.state
+        locked_region = multiworld.get_region("Locked", 1)
+        self.assertFalse(locked_region.can_reach(state))
+
+        copy = state.copy()
+        other_copy = state.copy()
+        copy.collect(key, True)
+        self.assertTrue(locked_region.can_reach(copy))
+        self.assertFalse(locked_region.can_reach(state))
+        self.assertFalse(locked_region.can_reach(other_copy))
+        self.assertFalse(multiworld.get_region("Locked", 2).can_reach(copy))
+
+        state.collect(key, True)
+        self.assertTrue(locked_region.can_reach(state))
+        self.assertFalse(locked_region.can_reach(other_copy))
+
+
+class TestCollectionStateItemHelpers(unittest.TestCase):
+    def test_missing_items(self) -> None:
+        """Tests that the item helpers treat items that were never collected as a count of 0."""
+        multiworld = generate_test_multiworld(1)
+        item = generate_items(1, 1, True)[0]
+        multiworld.worlds[1].item_name_groups = {"Group": {item.name, "Missing"}}
+        state = multiworld.state
+        state.collect(item, True)
+
+        self.assertTrue(state.has(item.name, 1))
+        self.assertFalse(state.has("Missing", 1))
+        self.assertEqual(state.count("Missing", 1), 0)
+        self.assertFalse(state.has_all([item.name, "Missing"], 1))
+        self.assertTrue(state.has_any(["Missing", item.name], 1))
+        self.assertFalse(state.has_all_counts({item.name: 1, "Missing": 1}, 1))
+        self.assertTrue(state.has_any_count({"Missing": 1, item.name: 1}, 1))
+        self.assertFalse(state.has_from_list(["Missing", item.name], 1, 2))
+        self.assertEqual(state.count_from_list(["Missing", item.name], 1), 1)
+        self.assertEqual(state.count_from_list_unique(["Missing", item.name], 1), 1)
+        self.assertTrue(state.has_group("Group", 1))
+        self.assertFalse(state.has_group_unique("Group", 1, 2))
+        self.assertEqual(state.count_group("Group", 1), 1)
+        self.assertEqual(state.count_group_unique("Group", 1), 1)
+        self.assertNotIn("Missing", state.prog_items[1])
+
+
+class TestCachedSpheres(unittest.TestCase):
+    def test_spheres_follow_placements(self) -> None:
+        """Tests that the shared sphere sweep is reused until placed or precollected items change."""
+        multiworld = generate_test_multiworld(1)
+        key = generate_items(1, 1, True)[0]
+        filler = generate_items(2, 1)
+        menu = multiworld.get_region("Menu", 1)
+        locked = Region("Locked", 1, multiworld)
+        multiworld.regions.append(locked)
+        menu.connect(locked, rule=lambda state: state.has(key.name, 1))
+        first = generate_locations(1, 1, menu)[0]
+        second = generate_locations(1, 1, locked, tag="_locked")[0]
+        multiworld.completion_condition[1] = lambda state: state.has(key.name, 1)
+
+        multiworld.push_item(first, key, False)
+        multiworld.push_item(second, filler[0], False)
+        self.assertIsNot(multiworld.get_sphere_sweep(), multiworld.get_sphere_sweep())
+        multiworld.share_spheres = True
+        self.assertIs(multiworld.get_sphere_sweep(), multiworld.get_sphere_sweep())
+        self.assertEqual(list(multiworld.get_spheres()), [{first}, {second}])
+        self.assertTrue(multiworld.can_beat_game())
+
+        # placements changed without push_item are noticed as well
+        first.item, second.item = filler[1], key
+        self.assertEqual(list(multiworld.get_spheres()), [{first}, set(), {second}])
+        self.assertFalse(multiworld.can_beat_game())
+
+        multiworld.push_precollected(Item(key.name, ItemClassification.progression, None, 1))
+        self.assertEqual(list(multiworld.get_spheres()), [{first, second}])
+        self.assertTrue(multiworld.can_beat_game())
+
+    def test_beatable_collects_advancement_only(self) -> None:
+        """Tests that the shared sweep for can_beat_game only collects advancement items, like the unshared one, also
+        for worlds that count other items they collect."""
+        multiworld = generate_test_multiworld(1)
+        filler = generate_items(1, 1)[0]
+        location = generate_locations(1, 1, multiworld.get_region("Menu", 1))[0]
+        multiworld.completion_condition[1] = lambda state: state.has(filler.name, 1)
+        multiworld.push_item(location, filler, False)
+
+        def collect(state: CollectionState, item: Item) -> bool:
+            state.prog_items[item.player][item.name] += 1
+            return True
+
+        with mock.patch.object(multiworld.worlds[1], "collect", collect):
+            self.assertFalse(multiworld.can_beat_game())
+            multiworld.share_spheres = True
+            self.assertFalse(multiworld.can_beat_game())
+            self.assertIsNot(multiworld.get_sphere_sweep(advancement_only=True), multiworld.get_sphere_sweep())
+            self.assertEqual(list(multiworld.get_spheres()), [{location}])
+
+
+class TestPlaythrough(unittest.TestCase):
+    def test_playthrough_culls_redundant_items(self) -> None:
+        """Tests that the playthrough only keeps the items required to beat the game, and restores the others."""
+        multiworld = generate_test_multiworld(1)
+        keys = [Item("Key", ItemClassification.progression, None, 1) for _ in range(2)]
+        goal = Item("Goal", ItemClassification.progression, None, 1)
+        items = keys + generate_items(5, 1, True)
+        menu = multiworld.get_region("Menu", 1)
+        locked = Region("Locked", 1, multiworld)
+        multiworld.regions.append(locked)
+        menu.connect(locked, rule=lambda state: state.has("Key", 1))
+        menu_locations = generate_locations(len(items), 1, menu)
+        goal_location = generate_locations(1, 1, locked, tag="_locked")[0]
+        multiworld.completion_condition[1] = lambda state: state.has("Goal", 1)
+        for location, item in zip(menu_locations, items):
+            multiworld.push_item(location, item, False)
+        multiworld.push_item(goal_location, goal, False)
+
+        for share_spheres in (False, True):
+            with self.subTest(share_spheres=share_spheres):
+                multiworld.share_spheres = share_spheres
+                multiworld.spoiler.create_playthrough(create_paths=False)
+
+                self.assertEqual(list(multiworld.spoiler.playthrough["1"].values()), [str(keys[0])])
+                self.assertEqual(multiworld.spoiler.playthrough["2"], {str(goal_location): str(goal)})
+                self.assertEqual(len(multiworld.spoiler.playthrough), 3)
+                self.assertEqual([location.item for location in menu_locations], items)
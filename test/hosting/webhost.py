@@ -80,7 +80,7 @@ def start_room(app_client: "FlaskClient", room_id: str, timeout: float = 30) ->
             continue
 
         assert response.status_code == 200, f"Starting room for {room_id} failed: status {response.status_code}"
-        match = re.search(r"/connect ([\w:.\-]+)", response.text)
+        match = re.search(r"/connect ([\w:./\-]+)", response.text)
         if match:
             return match[1]
         timeout -= poll_interval
@@ -0,0 +1,71 @@
+import unittest
+
+from NetUtils import ClientStatus, Hint, HintStatus, JSONTypes, NetworkItem, NetworkPlayer, NetworkSlot, SlotType, \
+    _encode, _scan_for_TypedTuples, encode
+
+
+class TestEncode(unittest.TestCase):
+    def assert_encodes_same(self, obj) -> None:
+        self.assertEqual(encode(obj), _encode(_scan_for_TypedTuples(obj)))
+
+    def test_network_types(self) -> None:
+        """Tests that the fast paths for protocol NamedTuples encode the same as scanning for NamedTuples"""
+        for obj in (
+            NetworkItem(1, 2, 3),
+            NetworkItem(1, -2, 3, 0b101),
+            NetworkItem(True, 2, 3, SlotType.player),  # unexpected field types
+            NetworkPlayer(0, 1, "Ali\"as\\", "Nämé ☃ \n"),
+            NetworkPlayer(0, 1, None, "Name"),
+            NetworkSlot("Name", "Game", SlotType.player),
+            NetworkSlot("Group", "Game", SlotType.group, [1, 2, 3]),
+            NetworkSlot("Name", "Game", 1),
+            Hint(1, 2, 3, 4, False),
+            Hint(1, 2, 3, 4, True, "Entrance \"1\"", 0b11, HintStatus.HINT_FOUND),
+            Hint(1, 2, 3, 4, 0, "", 0, 30),
+            Hint(1, 2, 3, NetworkItem(1, 2, 3), False),  # nested NamedTuples are not converted
+        ):
+            with self.subTest(obj=obj):
+                self.assert_encodes_same(obj)
+                self.assert_encodes_same([{"cmd": "Test", "value": obj}])
+
+    def test_containers(self) -> None:
+        """Tests that containers and plain values encode the same as scanning for NamedTuples"""
+        for obj in (
+            [],
+            {},
+            (),
+            set(),
+            "text",
+            1.5,
+            None,
+            True,
+            ClientStatus.CLIENT_GOAL,
+            JSONTypes.player_id,
+            [{"cmd": "PrintJSON", "data": [{"text": "1", "type": JSONTypes.player_id}, {"text": None}],
+              "found": False, "item": NetworkItem(1, 2, 3)}],
+            list(range(20)),
+            list(range(20)) + [NetworkItem(1, 2, 3)],
+            tuple(str(i) for i in range(20)),
+            set(range(20)),
+            frozenset({NetworkItem(1, 2, 3), NetworkItem(4, 5, 6)}),
+            [[], [[]], {}, [{}], [None, True, False, 1.0]],
+            {1: NetworkPlayer(0, 1, "Alias", "Name"), 2: [NetworkItem(1, 2, 3)]},
+            {str(i): float(i) for i in range(20)},
+            {str(i): i for i in range(20)} | {"items": (NetworkItem(1, 2, 3),)},
+            {True: NetworkItem(1, 2, 3), None: 1, 1.5: "a"},
+        ):
+            with self.subTest(obj=obj):
+                self.assert_encodes_same(obj)
+
+    def test_errors(self) -> None:
+        """Tests that values JSON can't represent still raise"""
+        for obj in (
+            {(1, 2): NetworkItem(1, 2, 3)},
+            [object()],
+            NetworkSlot("Name", "Game", SlotType.group, {1, 2}),
+        ):
+            with self.subTest(obj=obj):
+                with self.assertRaises(TypeError):
+                    _encode(_scan_for_TypedTuples(obj))
+                with self.assertRaises(TypeError):
+                    encode(obj)
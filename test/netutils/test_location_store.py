@@ -112,10 +112,19 @@ class Base:
             self.assertEqual(sorted(self.store.find_item(set(range(2048)), 13)),
                              [(1, 13, 13, 1, 0)])
 
+        def test_find_item_order(self) -> None:
+            # same order as a scan of all locations
+            scan = [(sender, location, item, receiver, flags)
+                    for sender, locations in self.store.items()
+                    for location, (item, receiver, flags) in locations.items()
+                    if receiver in {3, 4, 5} and item == 99]
+            self.assertEqual(list(self.store.find_item({5, 4, 3}, 99)), scan)
+
         def test_get_for_player(self) -> None:
             self.assertEqual(self.store.get_for_player(3), {4: {9}})
             self.assertEqual(self.store.get_for_player(1), {1: {13}, 2: {22, 23}})
             self.assertEqual(self.store.get_for_player(9999), {})
+            self.assertEqual(self.store.get_for_player(0), {})
 
         def test_get_checked(self) -> None:
             self.assertEqual(self.store.get_checked(full_state, 0, 1), [11, 12, 13])
@@ -165,6 +174,42 @@ class Base:
             with self.assertRaises(KeyError):
                 self.store.get_remaining(bad_state, 0, 9999)
 
+        def to_bitmaps(self, state: State) -> typing.Dict[typing.Tuple[int, int], bytearray]:
+            bitmaps = {}
+            for (team, slot), checked in state.items():
+                bitmaps[team, slot] = self.store.new_bitmap(slot)
+                self.store.set_checked(bitmaps[team, slot], slot, checked)
+            return bitmaps
+
+        def test_bitmap_state(self) -> None:
+            for state in (full_state, one_state, empty_state):
+                bitmaps = self.to_bitmaps(state)
+                for team, slot in state:
+                    self.assertEqual(self.store.get_checked(bitmaps, team, slot),
+                                     self.store.get_checked(state, team, slot))
+                    self.assertEqual(self.store.get_missing(bitmaps, team, slot),
+                                     self.store.get_missing(state, team, slot))
+                    self.assertEqual(self.store.get_remaining(bitmaps, team, slot),
+                                     self.store.get_remaining(state, team, slot))
+
+        def test_set_checked(self) -> None:
+            bitmap = self.store.new_bitmap(1)
+            self.assertEqual(bitmap, bytearray(1))
+            self.store.set_checked(bitmap, 1, [13, 11, 99])  # unknown locations are ignored
+            self.assertEqual(self.store.get_checked({(0, 1): bitmap}, 0, 1), [11, 13])
+            self.store.set_checked(bitmap, 1, [11])
+            self.assertEqual(self.store.get_missing({(0, 1): bitmap}, 0, 1), [12])
+
+        def test_bitmap_exception(self) -> None:
+            with self.assertRaises(KeyError):
+                self.store.new_bitmap(9999)
+            with self.assertRaises(KeyError):
+                self.store.set_checked(bytearray(1), 9999, [])
+            with self.assertRaises(KeyError):
+                self.store.get_checked({(0, 9999): bytearray(1)}, 0, 9999)
+            with self.assertRaises(ValueError):
+                self.store.get_missing({(0, 1): bytearray()}, 0, 1)
+
         def test_location_set_intersection(self) -> None:
             locations = {10, 11, 12}
             locations.intersection_update(self.store[1])
@@ -222,6 +267,8 @@ class Base:
                 self.assertEqual(store.get_missing(full_state, 0, 1), [])
                 self.assertEqual(store.get_remaining(empty_state, 0, 1), [])
                 self.assertEqual(store.get_remaining(full_state, 0, 1), [])
+                self.assertEqual(store.new_bitmap(1), bytearray())
+                self.assertEqual(store.get_missing({(0, 1): bytearray()}, 0, 1), [])
 
         def test_no_locations_for_1(self) -> None:
             store = self.type({
@@ -232,6 +279,29 @@ class Base:
             self.assertEqual(len(store[1]), 0)
             self.assertEqual(len(store[2]), 1)
 
+        def test_receiver_index(self) -> None:
+            # receivers without locations, like item link groups, and many equal items
+            data: RawLocations = {
+                1: {location: (location % 3, 6 - location % 2, 0) for location in range(1, 50)},
+                2: {location: (location % 3, 1 + location % 2, location % 4) for location in range(20)},
+            }
+            store = self.type(data)
+            for receiver in range(1, 8):
+                expected_locations: typing.Dict[int, typing.Set[int]] = {}
+                for sender, locations in data.items():
+                    for location, (_, location_receiver, _) in locations.items():
+                        if location_receiver == receiver:
+                            expected_locations.setdefault(sender, set()).add(location)
+                self.assertEqual(store.get_for_player(receiver), expected_locations)
+                for item in range(4):
+                    self.assertEqual(sorted(store.find_item({receiver}, item)),
+                                     sorted((sender, location, item, receiver, flags)
+                                            for sender, locations in data.items()
+                                            for location, (location_item, location_receiver, flags)
+                                            in locations.items()
+                                            if location_item == item and location_receiver == receiver))
+            self.assertEqual(len(list(store.find_item({1, 2, 5, 6}, 0))), 23)
+
         def test_no_locations_for_last(self) -> None:
             store = self.type({
                 1: {1: (1, 2, 3)},
@@ -0,0 +1,56 @@
+# Tests for NetUtils.ReceivedItems
+import pickle
+import unittest
+
+from NetUtils import NetworkItem, ReceivedItems
+from Utils import restricted_loads
+
+own_item = NetworkItem(1, 10, 1, 1)
+other_item = NetworkItem(2, -1, 2, 0)
+big_item = NetworkItem(1 << 52, 1 << 40, 3, 4)
+
+
+class TestReceivedItems(unittest.TestCase):
+    received_items: ReceivedItems
+
+    def setUp(self) -> None:
+        self.received_items = ReceivedItems()
+        for item, remote_only in ((own_item, True), (other_item, False), (big_item, False), (own_item, True)):
+            self.received_items.append(item, remote_only)
+
+    def test_views(self) -> None:
+        """Verify that the views contain all items or only the ones that are not remote only, in order"""
+        remote = self.received_items.view(True)
+        other = self.received_items.view(False)
+        self.assertEqual(len(self.received_items), 4)
+        self.assertEqual(remote[:], [own_item, other_item, big_item, own_item])
+        self.assertEqual(other[:], [other_item, big_item])
+        self.assertEqual(len(remote), 4)
+        self.assertEqual(len(other), 2)
+        self.assertEqual(remote[1:], [other_item, big_item, own_item])
+        self.assertEqual(other[1:], [big_item])
+        self.assertEqual(remote[5:], [])
+        self.assertEqual(remote[-1], own_item)
+        self.assertEqual(other[0], other_item)
+        self.assertEqual(list(other), [other_item, big_item])
+        self.assertFalse(ReceivedItems().view(True))
+        with self.assertRaises(IndexError):
+            remote[4]
+
+    def test_copy_extend(self) -> None:
+        """Verify that a copy of a range can be extended back into the original items"""
+        copy = self.received_items.copy(0, 2)
+        copy.extend(self.received_items.copy(2))
+        self.assertEqual(copy, self.received_items)
+        self.assertEqual(self.received_items.copy(1, 3).view(False)[:], [other_item, big_item])
+        self.assertEqual(self.received_items.copy(3).view(False)[:], [])
+
+    def test_pickle(self) -> None:
+        """Verify that it survives a restricted pickle round trip"""
+        self.assertEqual(restricted_loads(pickle.dumps(self.received_items)), self.received_items)
+
+    def test_from_lists(self) -> None:
+        """Verify that the lists of both views from old saves give the same views"""
+        remote = self.received_items.view(True)[:]
+        other = self.received_items.view(False)[:]
+        self.assertEqual(ReceivedItems.from_lists(remote, other), self.received_items)
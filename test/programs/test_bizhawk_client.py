@@ -0,0 +1,201 @@
+import asyncio
+import base64
+import json
+import unittest
+from typing import Any
+
+from worlds._bizhawk import BizHawkContext, ConnectionStatus, RequestFailedError, disconnect, flush_requests, \
+    get_script_version, guarded_read, ping, queue_requests, read, send_batches, send_requests, subscribe, \
+    unsubscribe, write
+from worlds._bizhawk.context import EXPECTED_SCRIPT_VERSION
+
+
+class FakeConnector:
+    """Answers requests like connector_bizhawk_generic.lua, using a bytearray for each memory domain instead of BizHawk.
+    Every message is processed on a frame of its own."""
+    memory: dict[str, bytearray]
+    rom_hash: str
+    messages: list[str]
+    """Every message received, in order"""
+    responding: asyncio.Event
+    """Clear to hold back responses, for example to check what gets sent before the first response"""
+    subscriptions: dict[int, list[Any]]
+
+    def __init__(self, memory: dict[str, bytearray], rom_hash: str = "FAKEHASH") -> None:
+        self.memory = memory
+        self.rom_hash = rom_hash
+        self.messages = []
+        self.responding = asyncio.Event()
+        self.responding.set()
+        self.subscriptions = {}
+        self._next_subscription_id = 1
+        self._server: asyncio.Server | None = None
+        self._writers: list[asyncio.StreamWriter] = []
+
+    async def connect(self, ctx: BizHawkContext) -> None:
+        """Starts serving on a free port and connects ctx to it, like `worlds._bizhawk.connect` would"""
+        self._server = await asyncio.start_server(self._handle_client, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        ctx.streams = await asyncio.open_connection("127.0.0.1", port)
+        ctx.connection_status = ConnectionStatus.TENTATIVE
+
+    async def close(self) -> None:
+        for writer in self._writers:
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.append(writer)
+        received: asyncio.Queue[bytes] = asyncio.Queue()
+
+        async def receive() -> None:
+            while line := await reader.readline():
+                self.messages.append(line.decode("utf-8").rstrip("\n"))
+                received.put_nowait(line)
+            received.put_nowait(b"")
+
+        receive_task = asyncio.create_task(receive())  # noqa: F841
+        while message := await received.get():
+            await self.responding.wait()
+            if message == b"VERSION\n":
+                writer.write(f"{EXPECTED_SCRIPT_VERSION}\n".encode("utf-8"))
+            else:
+                writer.write(json.dumps(self._process_message(json.loads(message))).encode("utf-8") + b"\n")
+            self._send_memory_changes(writer)
+            await writer.drain()
+        writer.close()
+
+    def _process_message(self, requests: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        responses: list[dict[str, Any]] = []
+        failed_guard_response = None
+        for request in requests:
+            if failed_guard_response is not None:
+                responses.append(failed_guard_response)
+                continue
+
+            response = self._process_request(request)
+            if response["type"] == "GUARD_RESPONSE" and not response["value"]:
+                failed_guard_response = response
+            responses.append(response)
+        return responses
+
+    def _process_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        if request["type"] == "PING":
+            return {"type": "PONG"}
+        if request["type"] == "HASH":
+            return {"type": "HASH_RESPONSE", "value": self.rom_hash}
+        if request["type"] == "GUARD":
+            expected_data = base64.b64decode(request["expected_data"])
+            address = request["address"]
+            actual_data = self.memory[request["domain"]][address:address + len(expected_data)]
+            return {"type": "GUARD_RESPONSE", "value": actual_data == expected_data, "address": address}
+        if request["type"] == "READ":
+            data = self.memory[request["domain"]][request["address"]:request["address"] + request["size"]]
+            return {"type": "READ_RESPONSE", "value": base64.b64encode(data).decode("ascii")}
+        if request["type"] == "WRITE":
+            data = base64.b64decode(request["value"])
+            self.memory[request["domain"]][request["address"]:request["address"] + len(data)] = data
+            return {"type": "WRITE_RESPONSE"}
+        if request["type"] == "SUBSCRIBE":
+            subscription_id = self._next_subscription_id
+            self._next_subscription_id += 1
+            self.subscriptions[subscription_id] = [request["address"], request["size"], request["domain"], None]
+            return {"type": "SUBSCRIBE_RESPONSE", "id": subscription_id}
+        if request["type"] == "UNSUBSCRIBE":
+            self.subscriptions.pop(request["id"], None)
+            return {"type": "UNSUBSCRIBE_RESPONSE"}
+        return {"type": "ERROR", "err": f"Unknown command: {request['type']}"}
+
+    def _send_memory_changes(self, writer: asyncio.StreamWriter) -> None:
+        for subscription_id, subscription in self.subscriptions.items():
+            address, size, domain, previous_value = subscription
+            value = bytes(self.memory[domain][address:address + size])
+            if value != previous_value:
+                subscription[3] = value
+                notification = {"type": "MEMORY_CHANGED", "id": subscription_id,
+                                 "value": base64.b64encode(value).decode("ascii")}
+                writer.write(json.dumps(notification).encode("utf-8") + b"\n")
+
+
+class TestBizHawkConnection(unittest.IsolatedAsyncioTestCase):
+    ctx: BizHawkContext
+    connector: FakeConnector
+
+    async def asyncSetUp(self) -> None:
+        self.ctx = BizHawkContext()
+        self.connector = FakeConnector({"RAM": bytearray(range(16))})
+        await self.connector.connect(self.ctx)
+
+    async def asyncTearDown(self) -> None:
+        disconnect(self.ctx)
+        await self.connector.close()
+
+    async def wait_for_messages(self, count: int) -> None:
+        while len(self.connector.messages) < count:
+            await asyncio.sleep(0.01)
+
+    async def test_requests(self) -> None:
+        """Tests that the wrapper functions work through the fake connector"""
+        self.assertEqual(await get_script_version(self.ctx), EXPECTED_SCRIPT_VERSION)
+        self.assertEqual(self.ctx.connection_status, ConnectionStatus.CONNECTED)
+        await ping(self.ctx)
+        await write(self.ctx, [(2, [0xFF, 0xFE], "RAM")])
+        self.assertEqual(await read(self.ctx, [(1, 3, "RAM")]), [bytes([1, 0xFF, 0xFE])])
+        self.assertIsNone(await guarded_read(self.ctx, [(0, 1, "RAM")], [(2, [2], "RAM")]))
+
+    async def test_pipelined_batches(self) -> None:
+        """Tests that every list of requests is sent before waiting for the first response"""
+        self.connector.responding.clear()
+        batches = [[{"type": "READ", "address": address, "size": 1, "domain": "RAM"}] for address in range(3)]
+        batches_task = asyncio.create_task(send_batches(self.ctx, batches))
+
+        await asyncio.wait_for(self.wait_for_messages(3), 5)
+        self.assertFalse(batches_task.done())
+        self.connector.responding.set()
+
+        results = await batches_task
+        self.assertEqual([base64.b64decode(result[0]["value"]) for result in results], [b"\x00", b"\x01", b"\x02"])
+
+    async def test_queued_requests(self) -> None:
+        """Tests that queued requests are sent in the same message as the next requests, or alone when flushed"""
+        queued = queue_requests(self.ctx, [{"type": "PING"}, {"type": "HASH"}])
+        self.assertEqual(await read(self.ctx, [(4, 1, "RAM")]), [b"\x04"])
+        self.assertEqual(len(self.connector.messages), 1)
+        self.assertEqual(await queued, [{"type": "PONG"}, {"type": "HASH_RESPONSE", "value": "FAKEHASH"}])
+
+        queued = queue_requests(self.ctx, [{"type": "PING"}])
+        await flush_requests(self.ctx)
+        await flush_requests(self.ctx)
+        self.assertEqual(len(self.connector.messages), 2)
+        self.assertEqual(await queued, [{"type": "PONG"}])
+
+    async def test_subscribe(self) -> None:
+        """Tests that subscribed memory is reported when subscribing and whenever it changes"""
+        subscription_id = await subscribe(self.ctx, 8, 2, "RAM")
+        await asyncio.wait_for(self.ctx.memory_changed.wait(), 5)
+        self.assertEqual(self.ctx.memory_values, {subscription_id: b"\x08\x09"})
+
+        self.ctx.memory_changed.clear()
+        await write(self.ctx, [(9, [0], "RAM")])
+        await asyncio.wait_for(self.ctx.memory_changed.wait(), 5)
+        self.assertEqual(self.ctx.memory_values, {subscription_id: b"\x08\x00"})
+
+        await unsubscribe(self.ctx, subscription_id)
+        self.assertEqual(self.ctx.memory_values, {})
+        self.assertEqual(self.connector.subscriptions, {})
+
+    async def test_connection_closed(self) -> None:
+        """Tests that requests waiting for a response fail when the connection closes"""
+        self.connector.responding.clear()
+        queued = queue_requests(self.ctx, [{"type": "PING"}])
+        requests_task = asyncio.create_task(send_requests(self.ctx, [{"type": "PING"}]))
+        await asyncio.wait_for(self.wait_for_messages(1), 5)
+        await self.connector.close()
+
+        with self.assertRaises(RequestFailedError):
+            await requests_task
+        with self.assertRaises(RequestFailedError):
+            await queued
+        self.assertEqual(self.ctx.connection_status, ConnectionStatus.NOT_CONNECTED)
@@ -137,3 +137,73 @@ class TestGenerateWeights(TestGenerateMain):
                     result, getattr(namespace, option_name)[player].value,
                     "Generated results from weights file did not match expected value."
                 )
+
+
+class TestGenerateProcesses(unittest.TestCase):
+    """Tests Main.py running generate_output of process safe worlds in worker processes."""
+
+    def setUp(self):
+        from settings import get_settings
+        self.original_argv = sys.argv.copy()
+        self.generator_settings = get_settings().generator
+        self.original_processes = self.generator_settings.processes
+        self.original_players = self.generator_settings.players
+        self.input_tempdir = TemporaryDirectory(prefix="AP_in_")
+        self.output_tempdir = TemporaryDirectory(prefix="AP_out_")
+        with open(os.path.join(self.input_tempdir.name, "players.yaml"), "w") as f:
+            f.write("name: Player{NUMBER}\ngame: A Link to the Past\nA Link to the Past: {}\n")
+        with open(os.path.join(self.input_tempdir.name, "players2.yaml"), "w") as f:
+            f.write("name: Player{NUMBER}\ngame: A Link to the Past\nA Link to the Past: {}\n")
+
+    def tearDown(self):
+        self.input_tempdir.cleanup()
+        self.output_tempdir.cleanup()
+        sys.argv = self.original_argv
+        self.generator_settings.processes = self.original_processes
+        self.generator_settings.players = self.original_players
+
+    def test_unbeatable_with_forked_output(self):
+        """Tests that an unbeatable game raises while A Link to the Past worlds have their output forked, instead of
+        leaving modify_multidata waiting for the rom names of their worlds forever."""
+        import multiprocessing
+        import threading
+        from unittest import mock
+
+        from BaseClasses import MultiWorld
+        from Fill import FillError
+        from worlds.alttp import ALTTPWorld
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("fork is not supported on this platform")
+
+        def generate_output(world: ALTTPWorld, output_directory: str) -> None:
+            # what the world keeps of a successful output, without needing the base rom
+            world.hash_string = f"hash of player {world.player}"
+            world.rom_name = bytearray(f"rom of player {world.player}", "utf-8")
+            world.rom_name_available_event.set()
+
+        self.generator_settings.processes = 2
+        self.generator_settings.players = 0
+        sys.argv = [sys.argv[0], "--seed", "0", "--player_files_path", self.input_tempdir.name,
+                    "--outputpath", self.output_tempdir.name]
+        raised = []
+
+        def generate():
+            try:
+                Main.main(*Generate.main())
+            except Exception as e:
+                raised.append(e)
+
+        with mock.patch.object(ALTTPWorld, "stage_assert_generate", classmethod(lambda cls, multiworld: None)), \
+                mock.patch.object(ALTTPWorld, "stage_generate_output",
+                                  classmethod(lambda cls, multiworld, output_directory: None)), \
+                mock.patch.object(ALTTPWorld, "generate_output", generate_output), \
+                mock.patch.object(MultiWorld, "fulfills_accessibility", lambda multiworld: False), \
+                mock.patch.object(MultiWorld, "can_beat_game", lambda multiworld, *args: False):
+            generation = threading.Thread(target=generate, daemon=True)
+            generation.start()
+            generation.join(300)
+
+        self.assertFalse(generation.is_alive(), "generation did not finish")
+        self.assertEqual(len(raised), 1)
+        self.assertIsInstance(raised[0], FillError)
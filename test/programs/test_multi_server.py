@@ -1,5 +1,15 @@
+import asyncio
+import collections
+import os
+import pickle
+import tempfile
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+import zlib
+from unittest import mock
+
+from MultiServer import Client, Context, ServerCommandProcessor, encoded_game_packages, get_checked_checks, \
+    get_missing_checks, get_received_items, get_remaining, register_location_checks, send_items_to, send_new_items
+from NetUtils import Hint, HintStatus, LocationStore, NetworkItem, NetworkSlot, SlotType
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +48,255 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class TestSendNewItems(unittest.IsolatedAsyncioTestCase):
+    @mock.patch.object(Context, "_load_game_data")
+    async def test_coalesce(self, _: mock.MagicMock) -> None:
+        """Tests that items sent in the same event loop iteration are sent as one message, only to their receivers"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.send_msgs = mock.AsyncMock()
+        receiver = Client(None, ctx)
+        other = Client(None, ctx)
+        for slot, client in ((1, receiver), (2, other)):
+            client.team, client.slot, client.items_handling = 0, slot, 0b111
+        ctx.clients = {0: {1: [receiver], 2: [other]}}
+        items = [NetworkItem(1, 1, 2), NetworkItem(2, 2, 2)]
+
+        for item in items:
+            send_items_to(ctx, 0, 1, item)
+            send_new_items(ctx)
+        ctx.send_msgs.assert_not_called()
+        # one iteration to send, one to run the send task
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        ctx.send_msgs.assert_called_once_with(receiver, [{"cmd": "ReceivedItems", "index": 0, "items": items}])
+        self.assertEqual(receiver.send_index, 2)
+        self.assertEqual(other.send_index, 0)
+        self.assertFalse(ctx.new_item_receivers)
+
+
+class TestHintIndex(unittest.TestCase):
+    @mock.patch.object(Context, "_load_game_data")
+    def test_recheck_location_hints(self, _: mock.MagicMock) -> None:
+        """Tests that checking a location only updates the hints for it, for finding and receiving players"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        checked_hint = Hint(2, 1, 10, 5, False)
+        other_hint = Hint(2, 1, 11, 6, False)
+        for slot in (1, 2):
+            ctx.hints[0, slot] |= {checked_hint, other_hint}
+        ctx.index_hints(0, (checked_hint, other_hint))
+        ctx.location_checks[0, 1] = {10}
+
+        changed = set()
+        ctx.recheck_location_hints(0, 1, {10}, changed)
+
+        found_hint = checked_hint._replace(found=True, status=HintStatus.HINT_FOUND)
+        self.assertEqual(changed, {(0, 1), (0, 2)})
+        for slot in (1, 2):
+            self.assertEqual(ctx.hints[0, slot], {found_hint, other_hint})
+        self.assertEqual(ctx.get_hint(0, 1, 10), found_hint)
+        self.assertEqual(ctx.get_hint(0, 1, 11), other_hint)
+        self.assertIsNone(ctx.get_hint(0, 2, 10))
+
+
+class TestLocationBitmaps(unittest.TestCase):
+    @mock.patch.object(Context, "_load_game_data")
+    def test_location_bitmaps(self, _: mock.MagicMock) -> None:
+        """Tests that location queries using the bitmaps match location_checks, also after loading a save"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.locations = LocationStore({1: {10: (1, 2, 0), 11: (2, 2, 0), 12: (3, 1, 0)}, 2: {20: (4, 1, 0)}})
+        ctx.location_checks[0, 1] = {11}
+
+        self.assertEqual(get_checked_checks(ctx, 0, 1), [11])
+        self.assertEqual(get_missing_checks(ctx, 0, 1), [10, 12])
+        self.assertEqual(get_remaining(ctx, 0, 1), [(1, 3), (2, 1)])
+        self.assertEqual(get_missing_checks(ctx, 0, 2), [20])
+        self.assertEqual(set(ctx.location_bitmaps), {(0, 1), (0, 2)})
+
+        save_data = ctx.get_save()
+        save_data["location_checks"] = {(0, 1): {10, 12}}
+        ctx.set_save(save_data)
+        self.assertEqual(get_checked_checks(ctx, 0, 1), [10, 12])
+
+    @mock.patch.object(Context, "_load_game_data")
+    def test_register_location_checks(self, _: mock.MagicMock) -> None:
+        """Tests that checking locations updates an existing bitmap instead of only location_checks"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.locations = LocationStore({1: {10: (1, 2, 0), 11: (2, 2, 0), 12: (3, 1, 0)}, 2: {20: (4, 1, 0)}})
+        ctx.slot_info = {slot: NetworkSlot(f"Player{slot}", "Game", SlotType.player) for slot in (1, 2)}
+        ctx.player_names = {(0, slot): f"Player{slot}" for slot in (1, 2)}
+        ctx.clients = {0: {1: [], 2: []}}
+        self.assertEqual(get_missing_checks(ctx, 0, 1), [10, 11, 12])
+        self.assertIn((0, 1), ctx.location_bitmaps)
+
+        with mock.patch.object(ctx, "broadcast_team"), mock.patch.object(ctx, "broadcast"), \
+                mock.patch.object(ctx, "save"):
+            register_location_checks(ctx, 0, 1, [11, 12, 20])
+            register_location_checks(ctx, 0, 1, [11])
+
+        self.assertEqual(ctx.location_checks[0, 1], {11, 12})
+        self.assertEqual(get_checked_checks(ctx, 0, 1), [11, 12])
+        self.assertEqual(get_missing_checks(ctx, 0, 1), [10])
+        self.assertEqual(get_remaining(ctx, 0, 1), [(2, 1)])
+
+
+@mock.patch.object(Context, "_load_game_data")
+class TestSaveJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def make_context(self) -> Context:
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.connect_names = {"Player1": (0, 1), "Player2": (0, 2)}
+        ctx.save_filename = os.path.join(self.directory.name, "test.apsave")
+        return ctx
+
+    def load_context(self) -> Context:
+        ctx = self.make_context()
+        ctx._load_save()
+        return ctx
+
+    def test_journal(self, _: mock.MagicMock) -> None:
+        """Tests that changes after the first save are appended to the journal and replayed when loading"""
+        ctx = self.make_context()
+        send_items_to(ctx, 0, 1, NetworkItem(1, 1, 2))
+        ctx.location_checks[0, 2] = {1}
+        ctx.name_aliases[0, 1] = "Alias"
+        self.assertTrue(ctx._save())
+        self.assertEqual(ctx.journal_size, 0)
+
+        send_items_to(ctx, 0, 1, NetworkItem(2, 2, 2))
+        ctx.location_checks[0, 2].add(2)
+        ctx.hints[0, 1].add(Hint(1, 2, 3, 3, False))
+        ctx.changed_hints.add((0, 1))
+        ctx.stored_data["key"] = ctx.stored_data.get("key", 0) + 1
+        ctx.changed_stored_data.add("key")
+        del ctx.name_aliases[0, 1]
+        self.assertTrue(ctx._save())
+        self.assertTrue(ctx.journal_size)
+        self.assertEqual(os.path.getsize(ctx.journal_filename), ctx.journal_size)
+
+        loaded = self.load_context()
+        self.assertEqual(loaded.get_save(), ctx.get_save())
+        self.assertEqual(loaded.saved_state[:2], ctx.saved_state[:2])
+        self.assertEqual(loaded.saved_state.values, ctx.saved_state.values)
+
+        # a journal larger than the snapshot gets compacted into a new snapshot
+        ctx.journal_size = ctx.snapshot_size + 1
+        self.assertTrue(ctx._save())
+        self.assertEqual(os.path.getsize(ctx.journal_filename), 0)
+        self.assertEqual(self.load_context().get_save(), ctx.get_save())
+
+    def test_changed_sections(self, _: mock.MagicMock) -> None:
+        """Tests that journal entries only contain the sections that changed since the last save"""
+        ctx = self.make_context()
+        ctx.hints[0, 2].add(Hint(2, 1, 3, 3, False))
+        ctx.changed_hints.add((0, 2))
+        self.assertTrue(ctx._save())
+        ctx.snapshot_size = 1 << 20  # don't compact
+
+        ctx.stored_data["key"] = 1
+        ctx.changed_stored_data.add("key")
+        ctx.hints[0, 1].add(Hint(1, 2, 3, 3, False))
+        ctx.changed_hints.add((0, 1))
+        ctx.name_aliases[0, 1] = "Alias"
+        with mock.patch.object(ctx, "recheck_hints") as recheck_hints:
+            self.assertTrue(ctx._save())
+            self.assertTrue(ctx._save())
+        recheck_hints.assert_not_called()
+        with open(ctx.journal_filename, "rb") as f:
+            entries = f.read()
+        size = int.from_bytes(entries[:4], "big")
+        entry = pickle.loads(zlib.decompress(entries[4:4 + size]))
+        self.assertEqual(entry, {"snapshot_id": ctx.snapshot_id, "stored_data": {"key": 1},
+                                 "hints": {(0, 1): {Hint(1, 2, 3, 3, False)}}, "name_aliases": {(0, 1): "Alias"}})
+        self.assertEqual(len(entries), 4 + size)  # the second save had nothing to append
+
+        loaded = self.load_context()
+        self.assertEqual(loaded.get_save(), ctx.get_save())
+
+    def test_incomplete_entry(self, _: mock.MagicMock) -> None:
+        """Tests that an incomplete last journal entry is ignored and causes a new snapshot"""
+        ctx = self.make_context()
+        self.assertTrue(ctx._save())
+        ctx.snapshot_size = 1 << 20  # don't compact
+        ctx.stored_data["key"] = 1
+        ctx.changed_stored_data.add("key")
+        self.assertTrue(ctx._save())
+        ctx.stored_data["key"] = 2
+        ctx.changed_stored_data.add("key")
+        self.assertTrue(ctx._save())
+        with open(ctx.journal_filename, "r+b") as f:
+            f.truncate(ctx.journal_size - 1)
+
+        loaded = self.load_context()
+        self.assertEqual(loaded.stored_data, {"key": 1})
+        self.assertTrue(loaded._save())
+        self.assertEqual(os.path.getsize(loaded.journal_filename), 0)
+
+    def test_snapshot_format(self, _: mock.MagicMock) -> None:
+        """Tests that saves written as a single snapshot still load"""
+        ctx = self.make_context()
+        send_items_to(ctx, 0, 2, NetworkItem(1, 1, 1))
+        ctx.location_checks[0, 1] = {1}
+        with open(ctx.save_filename, "wb") as f:
+            f.write(zlib.compress(pickle.dumps(ctx.get_save())))
+
+        self.assertEqual(self.load_context().get_save(), ctx.get_save())
+
+    def test_version_2_received_items(self, _: mock.MagicMock) -> None:
+        """Tests that saves with a list of received items for each items_handling still load"""
+        ctx = self.make_context()
+        own_item, other_item = NetworkItem(1, 1, 1), NetworkItem(2, 2, 2)
+        send_items_to(ctx, 0, 1, own_item, other_item)
+        save_data = ctx.get_save()
+        save_data["version"] = 2
+        save_data["received_items"] = {(0, 1, True): [own_item, other_item], (0, 1, False): [other_item]}
+        with open(ctx.save_filename, "wb") as f:
+            f.write(zlib.compress(pickle.dumps(save_data)))
+
+        loaded = self.load_context()
+        self.assertEqual(loaded.received_items, ctx.received_items)
+        self.assertEqual(get_received_items(loaded, 0, 1, True)[:], [own_item, other_item])
+        self.assertEqual(get_received_items(loaded, 0, 1, False)[:], [other_item])
+
+
+@mock.patch.object(Context, "_load_game_data")
+class TestDataPackage(unittest.TestCase):
+    def test_encoded_data_package(self, _: mock.MagicMock) -> None:
+        """Tests that the spliced DataPackage message matches encoding it as a whole and reuses encoded packages"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.gamespackage = {
+            "Game 1": {"item_name_to_id": {"Item \u00e9": 1}, "location_name_to_id": {"Location": 1},
+                       "checksum": "test_encoded_data_package_1"},
+            "Game \"2\"": {"item_name_to_id": {}, "location_name_to_id": {"Location": 2},
+                          "checksum": "test_encoded_data_package_2"},
+            "Game 3": {"item_name_to_id": {"Item": 3}, "location_name_to_id": {}},
+        }
+        self.addCleanup(encoded_game_packages.pop, "test_encoded_data_package_1", None)
+        self.addCleanup(encoded_game_packages.pop, "test_encoded_data_package_2", None)
+        for games in ([], ["Game 1"], list(ctx.gamespackage)):
+            with self.subTest(games=games):
+                expected = ctx.dumper([{"cmd": "DataPackage",
+                                        "data": {"games": {game: ctx.gamespackage[game] for game in games}}}])
+                self.assertEqual(ctx.get_encoded_data_package(games), expected)
+                self.assertEqual(ctx.loader(ctx.get_encoded_data_package(games))[0]["data"]["games"],
+                                 {game: ctx.gamespackage[game] for game in games})
+
+        self.assertIn("test_encoded_data_package_2", encoded_game_packages)
+        self.assertNotIn(None, encoded_game_packages)
+        self.assertIs(ctx.get_encoded_game_package("Game 1"), encoded_game_packages["test_encoded_data_package_1"])
+
+    def test_encoded_game_packages_bounded(self, _: mock.MagicMock) -> None:
+        """Tests that the least recently used encoded packages are dropped beyond the max size"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.gamespackage = {f"Game {n}": {"item_name_to_id": {}, "location_name_to_id": {}, "checksum": f"checksum {n}"}
+                            for n in range(3)}
+        with mock.patch("MultiServer.encoded_game_packages", collections.OrderedDict()) as encoded, \
+                mock.patch("MultiServer.encoded_game_packages_max_size", 2):
+            for game in ("Game 0", "Game 1", "Game 0", "Game 2"):
+                ctx.get_encoded_game_package(game)
+            self.assertEqual(list(encoded), ["checksum 0", "checksum 2"])
@@ -0,0 +1,53 @@
+# Tests for multidata compression in Utils.py
+
+import pickle
+import unittest
+import zlib
+
+from NetUtils import Hint, NetworkSlot, SlotType
+from Utils import MultidataSections, VersionException, compress_multidata, decompress_multidata
+
+multidata = {
+    "slot_data": {1: {"option": 1}, 2: {"option": [2]}},
+    "slot_info": {1: NetworkSlot("Player1", "Game", SlotType.player),
+                  2: NetworkSlot("Player2", "Game", SlotType.player)},
+    "locations": {1: {1: (1, 2, 0)}, 2: {2: (2, 1, 1)}},
+    "precollected_hints": {1: {Hint(2, 1, 1, 1, False)}, 2: set()},
+    "seed_name": "seed",
+}
+
+
+class TestMultidata(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        """Tests that format 4 loads the same data and that format 3 still loads"""
+        format_3 = bytes([3]) + zlib.compress(pickle.dumps(multidata), 9)
+        for data in (compress_multidata(multidata), format_3):
+            with self.subTest(format=data[0]):
+                loaded = decompress_multidata(data)
+                self.assertEqual(dict(loaded), multidata)
+                self.assertEqual(dict(loaded["slot_data"]), multidata["slot_data"])
+
+    def test_lazy_sections(self) -> None:
+        """Tests that sections are only decompressed when accessed and copied as they are when recompressing"""
+        data = compress_multidata(multidata)
+        loaded = decompress_multidata(data)
+        self.assertIsInstance(loaded, MultidataSections)
+        self.assertIsNotNone(loaded.get_raw("locations"))
+        self.assertEqual(loaded["slot_data"][2], {"option": [2]})
+        self.assertIsNone(loaded["slot_data"].get_raw(2))
+        self.assertIsNotNone(loaded["slot_data"].get_raw(1))
+
+        loaded["slot_data"][2]["option"].append(3)
+        loaded.pop("locations")
+        loaded["spheres"] = []
+        reloaded = decompress_multidata(compress_multidata(loaded))
+        self.assertEqual(reloaded["slot_data"][2], {"option": [2, 3]})
+        self.assertEqual(reloaded["slot_data"][1], multidata["slot_data"][1])
+        self.assertNotIn("locations", reloaded)
+        self.assertEqual(reloaded["spheres"], [])
+        self.assertEqual(reloaded["precollected_hints"], multidata["precollected_hints"])
+
+    def test_version(self) -> None:
+        """Tests that newer formats are rejected"""
+        with self.assertRaises(VersionException):
+            decompress_multidata(bytes([5]) + compress_multidata(multidata)[1:])
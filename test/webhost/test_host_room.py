@@ -1,4 +1,8 @@
+import asyncio
 import os
+import pickle
+import typing
+from unittest import mock
 from uuid import UUID, uuid4, uuid5
 
 from flask import url_for
@@ -161,6 +165,49 @@ class TestHostFakeRoom(TestBase):
             self.assertIn("/connect ", response_text)
             self.assertIn(":12345", response_text)
 
+    def test_host_room_shared_port_link(self) -> None:
+        """Verify that the client link of a room on a shared hoster port connects with the room in the path."""
+        import argparse
+        import html
+        import re
+
+        import websockets
+        from pony.orm import db_session
+        from CommonClient import CommonContext, handle_url_arg, server_loop
+        from WebHostLib.customserver import get_room_id_from_path
+        from WebHostLib.models import Room, Slot
+
+        connected_rooms: typing.List[typing.Optional[UUID]] = []
+
+        async def route_connection(websocket: websockets.WebSocketServerProtocol) -> None:
+            connected_rooms.append(get_room_id_from_path(websocket.path))
+            await websocket.close()
+
+        async def follow_link(link: str) -> None:
+            args = handle_url_arg(argparse.Namespace(url=link, connect=None, name=None, password=None))
+            ctx = CommonContext(args.connect, args.password)
+            await server_loop(ctx)
+            ctx.cancel_autoreconnect()
+
+        async def run() -> None:
+            async with websockets.serve(route_connection, "localhost", 0) as shared_server:
+                port = shared_server.sockets[0].getsockname()[1]
+                with db_session:
+                    room: Room = Room.get(id=self.room_id)
+                    room.last_port = port
+                    Slot(player_id=1, player_name="Player1", game="Archipelago", seed=room.seed)
+
+                with mock.patch.dict(self.app.config, {"HOST_ADDRESS": "localhost", "HOSTER_PORT": port}), \
+                        self.app.app_context(), self.app.test_request_context():
+                    response_text = self.client.get(url_for("host_room", room=self.room_id)).get_data(True)
+                    status = self.client.get(url_for("api.room_info", room_id=self.room_id)).get_json()
+                link = html.unescape(re.search(r'href="(archipelago://[^"]+)"', response_text).group(1))
+                self.assertEqual(status["address"], re.search(r"@([^?]+)", link).group(1))
+                await follow_link(link)
+
+        asyncio.run(run())
+        self.assertEqual(connected_rooms, [self.room_id])
+
     def test_host_room_own_post(self) -> None:
         """Verify command from owner gets queued for the server and response is redirect."""
         from pony.orm import db_session, select
@@ -191,3 +238,144 @@ class TestHostFakeRoom(TestBase):
         with db_session:
             commands = select(command for command in Command if command.room.id == self.room_id)  # type: ignore
             self.assertNotIn("/help", (command.commandtext for command in commands))
+
+
+class TestRoomDispatcher(TestBase):
+    room_ids: typing.List[UUID]
+
+    def setUp(self) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Command, Room, Seed
+
+        super().setUp()
+
+        owner = uuid4()
+        with db_session:
+            seed = Seed(multidata=b"", owner=owner)
+            rooms = [Room(seed=seed, owner=owner, tracker=uuid4()) for _ in range(3)]
+            for room in rooms:
+                Command(room=room, commandtext=f"/command {room.id}")
+            self.room_ids = [room.id for room in rooms]
+
+    def tearDown(self) -> None:
+        from pony.orm import db_session, select
+        from WebHostLib.models import Command, Room
+
+        with db_session:
+            for command in select(command for command in Command if command.room.id in self.room_ids):
+                command.delete()
+            for room_id in self.room_ids:
+                room: Room = Room.get(id=room_id)
+                seed = room.seed
+                room.delete()
+            seed.delete()
+
+    def make_dispatcher(self) -> "WebHostLib.customserver.RoomDispatcher":
+        from WebHostLib.customserver import RoomDispatcher
+
+        dispatcher = RoomDispatcher()
+        for room_id in self.room_ids[:2]:
+            ctx = mock.MagicMock(room_id=room_id, seed_name="seed", auto_save_interval=1, save_dirty=True)
+            ctx.get_save.return_value = {"room": str(room_id)}
+            dispatcher.add_room(ctx)
+            dispatcher.command_processors[room_id] = mock.MagicMock()
+        return dispatcher
+
+    def test_pop_commands(self) -> None:
+        """Verify that commands of the given rooms are returned and deleted in one go, and others are left alone."""
+        from pony.orm import db_session, select
+        from WebHostLib.customserver import RoomDispatcher
+        from WebHostLib.models import Command
+
+        commands = RoomDispatcher._pop_commands(self.room_ids[:2])
+
+        self.assertEqual(commands, [(room_id, f"/command {room_id}") for room_id in self.room_ids[:2]])
+        with db_session:
+            remaining = select(command.room.id for command in Command if command.room.id in self.room_ids)[:]
+        self.assertEqual(list(remaining), self.room_ids[2:])
+
+    def test_dispatch_commands(self) -> None:
+        """Verify that commands are dispatched to the command processors of their rooms."""
+        from WebHostLib.customserver import RoomDispatcher
+
+        dispatcher = self.make_dispatcher()
+        commands = [(self.room_ids[1], "/first"), (self.room_ids[2], "/stopped"), (self.room_ids[1], "/second")]
+        with mock.patch.object(RoomDispatcher, "_pop_commands", return_value=commands) as pop_commands:
+            asyncio.run(dispatcher.dispatch_commands())
+
+        pop_commands.assert_called_once_with(self.room_ids[:2])
+        dispatcher.command_processors[self.room_ids[0]].assert_not_called()
+        self.assertEqual(dispatcher.command_processors[self.room_ids[1]].call_args_list,
+                         [mock.call("/first"), mock.call("/second")])
+
+    def test_save_rooms(self) -> None:
+        """Verify that dirty hosted rooms are saved together and rooms that are not dirty are not saved."""
+        from WebHostLib.customserver import RoomDispatcher
+
+        dispatcher = self.make_dispatcher()
+        clean_ctx = dispatcher.rooms[self.room_ids[1]]
+        clean_ctx.save_dirty = False
+        dispatcher.last_tick -= 1
+        with mock.patch.object(RoomDispatcher, "_write_multisaves") as write_multisaves:
+            asyncio.run(dispatcher.save_rooms())
+
+        self.assertFalse(dispatcher.rooms[self.room_ids[0]].save_dirty)
+        clean_ctx.get_save.assert_not_called()
+        write_multisaves.assert_called_once_with({self.room_ids[0]: pickle.dumps({"room": str(self.room_ids[0])})})
+
+    def test_save_rooms_yields(self) -> None:
+        """Verify that the event loop gets to run between pickling the saves of different rooms, and that rooms
+        removed in between are left to their exit save."""
+        from WebHostLib.customserver import RoomDispatcher
+
+        dispatcher = self.make_dispatcher()
+        dispatcher.last_tick -= 1
+        first_ctx, second_ctx = dispatcher.rooms.values()
+        events: typing.List[str] = []
+
+        def first_save() -> dict:
+            asyncio.get_running_loop().call_soon(events.append, "loop")
+            events.append("first")
+            return {}
+
+        def second_save() -> dict:
+            events.append("second")
+            return {}
+
+        first_ctx.get_save.side_effect = first_save
+        second_ctx.get_save.side_effect = second_save
+        with mock.patch.object(RoomDispatcher, "_write_multisaves") as write_multisaves:
+            asyncio.run(dispatcher.save_rooms())
+        self.assertEqual(events, ["first", "loop", "second"])
+        self.assertEqual(list(write_multisaves.call_args.args[0]), self.room_ids[:2])
+
+        async def remove_while_saving() -> None:
+            dispatcher.last_tick -= 1
+            first_ctx.save_dirty = second_ctx.save_dirty = True
+            saving = asyncio.create_task(dispatcher.save_rooms())
+            await asyncio.sleep(0)
+            await dispatcher.remove_room(self.room_ids[1])
+            self.assertTrue(saving.done())
+
+        events.clear()
+        with mock.patch.object(RoomDispatcher, "_write_multisaves") as write_multisaves:
+            asyncio.run(remove_while_saving())
+        self.assertEqual(events, ["first", "loop"])
+        write_multisaves.assert_called_once_with({self.room_ids[0]: pickle.dumps({})})
+
+    def test_write_multisaves(self) -> None:
+        """Verify that multisaves are written to their rooms and mark them as active."""
+        from pony.orm import db_session
+        from WebHostLib.customserver import RoomDispatcher
+        from WebHostLib.models import Room
+
+        with db_session:
+            last_activity = Room.get(id=self.room_ids[0]).last_activity
+        RoomDispatcher._write_multisaves({room_id: room_id.bytes for room_id in self.room_ids[:2]})
+
+        with db_session:
+            for room_id in self.room_ids[:2]:
+                room: Room = Room.get(id=room_id)
+                self.assertEqual(room.multisave, room_id.bytes)
+                self.assertGreaterEqual(room.last_activity, last_activity)
+            self.assertIsNone(Room.get(id=self.room_ids[2]).multisave)
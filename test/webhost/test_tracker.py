@@ -1,3 +1,4 @@
+import datetime
 import os
 import pickle
 from pathlib import Path
@@ -93,3 +94,30 @@ class TestTracker(TestBase):
                 headers={"If-Modified-Since": "Wed, 21 Oct 2015 07:28:00"},  # missing timezone
             )
             self.assertEqual(response.status_code, 400)
+
+    def test_tracker_data_cache(self) -> None:
+        """
+        Verify that TrackerData reuses decoded data between requests until the room is saved again
+        """
+        from pony.orm import db_session
+        from NetUtils import NetworkItem
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            first = TrackerData(room)
+            second = TrackerData(room)
+            self.assertIs(first._multidata, second._multidata)
+            self.assertIs(first.item_id_to_name["Archipelago"], second.item_id_to_name["Archipelago"])
+            self.assertEqual(first.get_player_received_items(0, 1), [])
+            # unknown ids get a placeholder name without being added to the shared lookup tables
+            self.assertEqual(first.item_id_to_name["Archipelago"][-100], "Unknown Item (ID: -100)")
+            self.assertNotIn(-100, second.item_id_to_name["Archipelago"])
+
+            room.multisave = pickle.dumps({"received_items": {(0, 1, True): [NetworkItem(1, 2, 1)]}})
+            room.last_activity += datetime.timedelta(microseconds=1)
+            saved = TrackerData(room)
+            self.assertIs(saved._multidata, first._multidata)
+            self.assertEqual(saved.get_player_received_items(0, 1), [NetworkItem(1, 2, 1)])
+            self.assertIs(TrackerData(room)._multisave, saved._multisave)
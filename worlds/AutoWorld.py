@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import concurrent.futures
+import functools
 import hashlib
+import io
 import logging
+import multiprocessing
 import pathlib
+import pickle
 import sys
+import threading
 import time
+from contextlib import contextmanager
 from random import Random
 from dataclasses import make_dataclass
-from typing import (Any, Callable, ClassVar, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, TextIO, Tuple,
-                    TYPE_CHECKING, Type, Union)
+from typing import (Any, Callable, ClassVar, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Set, TextIO,
+                    Tuple, TYPE_CHECKING, Type, Union)
 
 from Options import item_and_loc_options, ItemsAccessibility, OptionGroup, PerGameCommonOptions
 from BaseClasses import CollectionState
@@ -183,16 +190,20 @@ def call_all(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
         world_types.add(multiworld.worlds[player].__class__)
         call_single(multiworld, method_name, player, *args)
         if __debug__:
-            new_items = multiworld.itempool[prev_item_count:]
-            for i, item in enumerate(new_items):
-                for other in new_items[i+1:]:
-                    assert item is not other, (
-                        f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
-                        f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
+            _assert_no_duplicate_items(multiworld, player, prev_item_count)
 
     call_stage(multiworld, method_name, *args)
 
 
+def _assert_no_duplicate_items(multiworld: "MultiWorld", player: int, prev_item_count: int) -> None:
+    new_items = multiworld.itempool[prev_item_count:]
+    for i, item in enumerate(new_items):
+        for other in new_items[i+1:]:
+            assert item is not other, (
+                f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
+                f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
+
+
 def call_stage(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     world_types = {multiworld.worlds[player].__class__ for player in multiworld.player_ids}
     for world_type in sorted(world_types, key=lambda world: world.__name__):
@@ -201,6 +212,181 @@ def call_stage(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
             _timed_call(stage_callable, multiworld, *args)
 
 
+_forked_multiworld: Optional["MultiWorld"] = None
+"""MultiWorld inherited by the worker processes of process_pool"""
+_forked_objects: Dict[int, Any] = {}
+"""objects of _forked_multiworld by id, which worker processes inherit at the same address"""
+
+
+def _collect_forked_objects(multiworld: "MultiWorld") -> Dict[int, Any]:
+    objects: List[Any] = [multiworld, multiworld.state, *multiworld.worlds.values(), *multiworld.itempool]
+    for items in multiworld.precollected_items.values():
+        objects += items
+    for region in multiworld.regions:
+        objects.append(region)
+        objects += region.exits
+        for location in region.locations:
+            objects.append(location)
+            if location.item:
+                objects.append(location.item)
+    for world in multiworld.worlds.values():
+        objects += [value for value in vars(world).values() if isinstance(value, threading.Event)]
+    return {id(obj): obj for obj in objects}
+
+
+class _WorldStatePickler(pickle.Pickler):
+    """Pickles objects that also exist in the generating process as references instead of copying them."""
+    def __init__(self, file: io.BytesIO) -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+
+    def persistent_id(self, obj: Any) -> Optional[Tuple[int, bool]]:
+        if id(obj) in _forked_objects and _forked_objects[id(obj)] is obj:
+            return id(obj), isinstance(obj, threading.Event) and obj.is_set()
+        return None
+
+
+class _WorldStateUnpickler(pickle.Unpickler):
+    set_events: List[threading.Event]
+    """Events that were set in the worker, to be set once the state they announce is merged"""
+
+    def __init__(self, file: io.BytesIO) -> None:
+        super().__init__(file)
+        self.set_events = []
+
+    def persistent_load(self, pid: Tuple[int, bool]) -> Any:
+        obj_id, event_set = pid
+        obj = _forked_objects[obj_id]
+        if event_set:
+            self.set_events.append(obj)
+        return obj
+
+
+def _dump_world_state(state: Any) -> bytes:
+    with io.BytesIO() as file:
+        _WorldStatePickler(file).dump(state)
+        return file.getvalue()
+
+
+def _call_single_forked(method_name: str, player: int, *args: Any) -> Tuple[Any, bytes, List[str]]:
+    assert _forked_multiworld is not None, "worker process was not forked by process_pool"
+    world = _forked_multiworld.worlds[player]
+    original = dict(vars(world))
+    dumped: Dict[str, Optional[bytes]] = {}
+    for key, value in original.items():
+        try:
+            dumped[key] = _dump_world_state(value)
+        except Exception:
+            dumped[key] = None  # only an error if the method assigns something else, checked below
+
+    ret = call_single(_forked_multiworld, method_name, player, *args)
+
+    changed = [key for key, value in vars(world).items()
+               if not (key in original and value is original[key] and dumped[key] is None)
+               and dumped.get(key) != _dump_world_state(value)]
+    deleted = [key for key in original if key not in vars(world)]
+    return ret, _dump_world_state({key: getattr(world, key) for key in changed}), deleted
+
+
+def _merge_world_state(world: "World", world_state: bytes, deleted: List[str]) -> None:
+    with io.BytesIO(world_state) as file:
+        unpickler = _WorldStateUnpickler(file)
+        state: Dict[str, Any] = unpickler.load()
+    for key, value in state.items():
+        if key == "random":
+            # keep the Random instance itself, as it is also referenced by MultiWorld.per_slot_randoms
+            world.random.setstate(value.getstate())
+        else:
+            setattr(world, key, value)
+    for key in deleted:
+        delattr(world, key)
+    for event in unpickler.set_events:
+        event.set()
+
+
+def _release_world_events(world: "World") -> None:
+    """Sets the threading.Events of world if its call in a worker process failed. Threads of the generating process
+    waiting on them continue then, like a world setting its Events in a finally block would let them when running
+    in a thread, and the error gets collected from the future instead of deadlocking."""
+    for value in vars(world).values():
+        if isinstance(value, threading.Event):
+            value.set()
+
+
+def _merge_process_future(world: "World", merged: concurrent.futures.Future,
+                          future: concurrent.futures.Future) -> None:
+    """Done callback of a worker process call, which merges its changes into world and resolves merged."""
+    try:
+        ret, world_state, deleted = future.result()
+        _merge_world_state(world, world_state, deleted)
+    except Exception as e:
+        _release_world_events(world)
+        if future.cancelled():
+            merged.cancel()
+        else:
+            merged.set_exception(e)
+    else:
+        merged.set_result(ret)
+
+
+def get_process_players(multiworld: "MultiWorld", method_name: str, processes: int) -> List[int]:
+    """Returns the players whose method_name can run in a worker process of process_pool."""
+    if processes < 2 or "fork" not in multiprocessing.get_all_start_methods():
+        return []
+    return [player for player in multiworld.player_ids
+            if method_name in multiworld.worlds[player].process_safe_stages]
+
+
+@contextmanager
+def process_pool(multiworld: "MultiWorld", processes: int) -> Iterator[concurrent.futures.ProcessPoolExecutor]:
+    """Pool of worker processes for submit_process, which are forked from the current state of the MultiWorld on the
+    first submit. That has to happen before any other threads are started, as only the forking thread is copied."""
+    global _forked_multiworld, _forked_objects
+
+    assert _forked_multiworld is None, "only one process_pool can be open at a time"
+    _forked_multiworld = multiworld
+    _forked_objects = _collect_forked_objects(multiworld)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork")) as pool:
+            yield pool
+    finally:
+        _forked_multiworld = None
+        _forked_objects = {}
+
+
+def submit_process(pool: concurrent.futures.ProcessPoolExecutor, method_name: str, player: int,
+                   *args: Any) -> concurrent.futures.Future:
+    """Calls method_name of the World of player in a worker process of process_pool. The changes it makes to the
+    World are merged into the actual World as soon as it finishes, even if nothing waits for the returned future,
+    which then resolves to what the method returned."""
+    assert _forked_multiworld is not None, "pool was not opened by process_pool"
+    merged: concurrent.futures.Future = concurrent.futures.Future()
+    future = pool.submit(_call_single_forked, method_name, player, *args)
+    future.add_done_callback(functools.partial(_merge_process_future, _forked_multiworld.worlds[player], merged))
+    return merged
+
+
+def call_all_processes(multiworld: "MultiWorld", method_name: str, processes: int, *args: Any) -> None:
+    """Like call_all, but runs method_name in up to processes worker processes for every world that lists it in its
+    process_safe_stages. Falls back to call_all if there is nothing to parallelize or fork is not supported."""
+    process_players = get_process_players(multiworld, method_name, processes)
+    if len(process_players) < 2:
+        call_all(multiworld, method_name, *args)
+        return
+
+    with process_pool(multiworld, min(processes, len(process_players))) as pool:
+        futures = {player: submit_process(pool, method_name, player, *args) for player in process_players}
+        for player in multiworld.player_ids:
+            if player not in futures:
+                prev_item_count = len(multiworld.itempool)
+                call_single(multiworld, method_name, player, *args)
+                if __debug__:
+                    _assert_no_duplicate_items(multiworld, player, prev_item_count)
+        for future in futures.values():
+            future.result()
+
+    call_stage(multiworld, method_name, *args)
+
+
 class WebWorld(metaclass=WebWorldRegister):
     """Webhost integration"""
 
@@ -303,6 +489,20 @@ class World(metaclass=AutoWorldRegister):
     If False, everything is rechecked at every step, which is slower computationally, 
     but may be desirable in complex/dynamic worlds."""
 
+    process_safe_stages: ClassVar[FrozenSet[str]] = frozenset()
+    """
+    names of per player stages that may run in a separate process. Generation currently runs "generate_output" this way.
+    Such a stage may read the MultiWorld, but may only change attributes of this World, which have to be picklable.
+    Changed attributes are copied back from the worker process. Regions, Entrances, Locations and Items of the
+    MultiWorld and threading.Events of Worlds are referenced instead. Events set in the worker get set as well, once
+    the other attributes are copied. If the stage fails, all Events of this World get set, so nothing waits forever.
+    Other changes, for example to the MultiWorld or to class attributes, are lost.
+    It also must not depend on the same stage having run for other players.
+    stage_generate_output runs before the worker processes are forked, so data loaded there, for example base roms
+    through APProcedurePatch.get_source_data_with_cache, is shared with them instead of being loaded again.
+    self.random stays reproducible, but self.multiworld.random must not be used.
+    """
+
     multiworld: "MultiWorld"
     """autoset on creation. The MultiWorld object for the currently generating multiworld."""
     player: int
@@ -7,6 +7,7 @@ naively passed to BizHawk without validation or modification.
 
 import asyncio
 import base64
+import collections
 import enum
 import json
 import sys
@@ -46,47 +47,102 @@ class SyncError(Exception):
 class BizHawkContext:
     streams: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None
     connection_status: ConnectionStatus
-    _lock: asyncio.Lock
+    memory_values: dict[int, bytes]
+    """The latest value reported for each memory subscription, by subscription id"""
+    memory_changed: asyncio.Event
+    """Set whenever the connector reports a change in subscribed memory"""
+    _pending_responses: collections.deque[asyncio.Future[str]]
+    _queued_requests: list[tuple[list[dict[str, Any]], asyncio.Future[list[dict[str, Any]]]]]
+    _reader_task: asyncio.Task | None
     _port: int | None
 
     def __init__(self) -> None:
         self.streams = None
         self.connection_status = ConnectionStatus.NOT_CONNECTED
-        self._lock = asyncio.Lock()
+        self.memory_values = {}
+        self.memory_changed = asyncio.Event()
+        self._pending_responses = collections.deque()
+        self._queued_requests = []
+        self._reader_task = None
         self._port = None
 
-    async def _send_message(self, message: str):
-        async with self._lock:
-            if self.streams is None:
-                raise NotConnectedError("You tried to send a request before a connection to BizHawk was made")
+    def _queue_message(self, message: str) -> asyncio.Future[str]:
+        """Writes a message to the connector without waiting for its response, and returns a future for the response"""
+        if self.streams is None:
+            raise NotConnectedError("You tried to send a request before a connection to BizHawk was made")
 
-            try:
-                reader, writer = self.streams
-                writer.write(message.encode("utf-8") + b"\n")
-                await asyncio.wait_for(writer.drain(), timeout=5)
-
-                res = await asyncio.wait_for(reader.readline(), timeout=5)
-
-                if res == b"":
-                    writer.close()
-                    self.streams = None
-                    self.connection_status = ConnectionStatus.NOT_CONNECTED
-                    raise RequestFailedError("Connection closed")
-
-                if self.connection_status == ConnectionStatus.TENTATIVE:
-                    self.connection_status = ConnectionStatus.CONNECTED
-
-                return res.decode("utf-8")
-            except asyncio.TimeoutError as exc:
-                writer.close()
-                self.streams = None
-                self.connection_status = ConnectionStatus.NOT_CONNECTED
-                raise RequestFailedError("Connection timed out") from exc
-            except ConnectionResetError as exc:
-                writer.close()
-                self.streams = None
-                self.connection_status = ConnectionStatus.NOT_CONNECTED
-                raise RequestFailedError("Connection reset") from exc
+        reader, writer = self.streams
+        if self._reader_task is None:
+            self._reader_task = asyncio.create_task(self._read_responses(reader), name="BizHawkReader")
+
+        response = asyncio.get_running_loop().create_future()
+        self._pending_responses.append(response)
+        writer.write(message.encode("utf-8") + b"\n")
+        return response
+
+    async def _wait_response(self, response: asyncio.Future[str]) -> str:
+        try:
+            if self.streams is not None:
+                await asyncio.wait_for(self.streams[1].drain(), timeout=5)
+
+            res = await asyncio.wait_for(response, timeout=5)
+        except asyncio.TimeoutError as exc:
+            self._close("Connection timed out")
+            raise RequestFailedError("Connection timed out") from exc
+        except ConnectionResetError as exc:
+            self._close("Connection reset")
+            raise RequestFailedError("Connection reset") from exc
+
+        if self.connection_status == ConnectionStatus.TENTATIVE:
+            self.connection_status = ConnectionStatus.CONNECTED
+
+        return res
+
+    async def _send_message(self, message: str) -> str:
+        return await self._wait_response(self._queue_message(message))
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        """Reads lines from the connector until the connection closes. Responses resolve the pending futures in the
+        order their messages were sent, and notifications, which are JSON objects instead of lists, are handled as they
+        arrive."""
+        try:
+            while True:
+                line = await reader.readline()
+
+                if line == b"":
+                    self._close("Connection closed")
+                    return
+
+                if line.startswith(b"{"):
+                    self._handle_notification(json.loads(line))
+                elif self._pending_responses:
+                    # A cancelled request still gets its response, which is dropped
+                    response = self._pending_responses.popleft()
+                    if not response.done():
+                        response.set_result(line.decode("utf-8"))
+        except ConnectionResetError:
+            self._close("Connection reset")
+
+    def _handle_notification(self, notification: dict[str, Any]) -> None:
+        if notification["type"] == "MEMORY_CHANGED":
+            self.memory_values[notification["id"]] = base64.b64decode(notification["value"])
+            self.memory_changed.set()
+
+    def _close(self, reason: str) -> None:
+        """Closes the connection and fails every request still waiting for a response"""
+        if self.streams is not None:
+            self.streams[1].close()
+            self.streams = None
+        self.connection_status = ConnectionStatus.NOT_CONNECTED
+
+        if self._reader_task is not None and self._reader_task is not asyncio.current_task():
+            self._reader_task.cancel()
+        self._reader_task = None
+
+        while self._pending_responses:
+            response = self._pending_responses.popleft()
+            if not response.done():
+                response.set_exception(RequestFailedError(reason))
 
 
 async def connect(ctx: BizHawkContext) -> bool:
@@ -99,6 +155,7 @@ async def connect(ctx: BizHawkContext) -> bool:
         try:
             ctx.streams = await asyncio.open_connection("127.0.0.1", port)
             ctx.connection_status = ConnectionStatus.TENTATIVE
+            ctx.memory_values.clear()
             ctx._port = port
             return True
         except (TimeoutError, ConnectionRefusedError):
@@ -112,21 +169,14 @@ async def connect(ctx: BizHawkContext) -> bool:
 
 def disconnect(ctx: BizHawkContext) -> None:
     """Closes the connection to the connector script."""
-    if ctx.streams is not None:
-        ctx.streams[1].close()
-        ctx.streams = None
-    ctx.connection_status = ConnectionStatus.NOT_CONNECTED
+    ctx._close("Disconnected")
 
 
 async def get_script_version(ctx: BizHawkContext) -> int:
     return int(await ctx._send_message("VERSION"))
 
 
-async def send_requests(ctx: BizHawkContext, req_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Sends a list of requests to the BizHawk connector and returns their responses.
-
-    It's likely you want to use the wrapper functions instead of this."""
-    responses = json.loads(await ctx._send_message(json.dumps(req_list)))
+def _check_responses(responses: list[dict[str, Any]]) -> None:
     errors: list[ConnectorError] = []
 
     for response in responses:
@@ -139,7 +189,79 @@ async def send_requests(ctx: BizHawkContext, req_list: list[dict[str, Any]]) ->
         else:
             raise errors[0]
 
-    return responses
+
+async def send_batches(ctx: BizHawkContext, batches: Sequence[list[dict[str, Any]]]) -> list[list[dict[str, Any]]]:
+    """Sends multiple lists of requests to the BizHawk connector and returns the responses for each list.
+
+    Every list is sent before waiting for any response, so they cost about one round trip instead of one each. The
+    requests in a list are executed on the same frame, but separate lists may be executed on different frames.
+
+    Requests queued with `queue_requests` are sent at the start of the first list."""
+    queued, ctx._queued_requests = ctx._queued_requests, []
+    messages = [list(req_list) for req_list in batches]
+    if queued:
+        queued_requests = [req for req_list, _ in queued for req in req_list]
+        if messages:
+            messages[0] = queued_requests + messages[0]
+        else:
+            messages.append(queued_requests)
+
+    responses: list[asyncio.Future[str]] = []
+    results: list[list[dict[str, Any]]] = []
+    try:
+        for message in messages:
+            responses.append(ctx._queue_message(json.dumps(message)))
+        for response in responses:
+            results.append(json.loads(await ctx._wait_response(response)))
+    except BaseException as exc:
+        for response in responses:
+            response.cancel()
+        for _, future in queued:
+            future.set_exception(exc if isinstance(exc, Exception) else RequestFailedError("Request cancelled"))
+        raise
+
+    if queued:
+        queued_results = results[0]
+        for req_list, future in queued:
+            try:
+                _check_responses(queued_results[:len(req_list)])
+                future.set_result(queued_results[:len(req_list)])
+            except Exception as exc:
+                future.set_exception(exc)
+            queued_results = queued_results[len(req_list):]
+        if batches:
+            results[0] = queued_results
+        else:
+            results.clear()
+
+    for result in results:
+        _check_responses(result)
+
+    return results
+
+
+async def send_requests(ctx: BizHawkContext, req_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Sends a list of requests to the BizHawk connector and returns their responses.
+
+    It's likely you want to use the wrapper functions instead of this."""
+    return (await send_batches(ctx, [req_list]))[0]
+
+
+def queue_requests(ctx: BizHawkContext, req_list: list[dict[str, Any]]) -> asyncio.Future[list[dict[str, Any]]]:
+    """Queues a list of requests to be sent at the start of the next list of requests instead of on their own, saving a
+    round trip. Returns a future for their responses.
+
+    Queued requests are executed on the same frame as whatever they're sent with, so they should not include guards or
+    locks. If nothing else might be sent, use `flush_requests` to send them anyway."""
+    future = asyncio.get_running_loop().create_future()
+    ctx._queued_requests.append((req_list, future))
+    return future
+
+
+async def flush_requests(ctx: BizHawkContext) -> None:
+    """Sends any requests queued with `queue_requests` that haven't been sent with another list of requests yet."""
+    if ctx._queued_requests:
+        await send_batches(ctx, [])
 
 
 async def ping(ctx: BizHawkContext) -> None:
@@ -334,3 +456,28 @@ async def write(ctx: BizHawkContext, write_list: Sequence[tuple[int, Sequence[in
     - `value` is a list of bytes to write, in order, starting at `address`
     - `domain` is the name of the region of memory the address corresponds to"""
     await guarded_write(ctx, write_list, [])
+
+
+async def subscribe(ctx: BizHawkContext, address: int, size: int, domain: str) -> int:
+    """Asks the connector to watch an array of bytes and report their value whenever it changes, so they don't have to
+    be polled with reads. Returns the id of the subscription.
+
+    The value is reported at the end of the frame the subscription is made on and of every frame it changes on. Reported
+    values are stored in `ctx.memory_values` under the subscription id, and `ctx.memory_changed` is set. Subscriptions
+    end when the connection does."""
+    res = (await send_requests(ctx, [{"type": "SUBSCRIBE", "address": address, "size": size, "domain": domain}]))[0]
+
+    if res["type"] != "SUBSCRIBE_RESPONSE":
+        raise SyncError(f"Expected response of type SUBSCRIBE_RESPONSE but got {res['type']}")
+
+    return res["id"]
+
+
+async def unsubscribe(ctx: BizHawkContext, subscription_id: int) -> None:
+    """Ends a subscription made with `subscribe`."""
+    res = (await send_requests(ctx, [{"type": "UNSUBSCRIBE", "id": subscription_id}]))[0]
+
+    if res["type"] != "UNSUBSCRIBE_RESPONSE":
+        raise SyncError(f"Expected response of type UNSUBSCRIBE_RESPONSE but got {res['type']}")
+
+    ctx.memory_values.pop(subscription_id, None)
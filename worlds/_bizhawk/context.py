@@ -12,12 +12,12 @@ from CommonClient import CommonContext, ClientCommandProcessor, get_base_parser,
 import Patch
 import Utils
 
-from . import BizHawkContext, ConnectionStatus, NotConnectedError, RequestFailedError, connect, disconnect, get_hash, \
-    get_script_version, get_system, ping
+from . import BizHawkContext, ConnectionStatus, NotConnectedError, RequestFailedError, SyncError, connect, disconnect, \
+    flush_requests, get_script_version, get_system, queue_requests, send_requests
 from .client import BizHawkClient, AutoBizHawkClientRegister
 
 
-EXPECTED_SCRIPT_VERSION = 1
+EXPECTED_SCRIPT_VERSION = 2
 
 
 class AuthStatus(enum.IntEnum):
@@ -57,6 +57,8 @@ class BizHawkClientContext(CommonContext):
         self.password_requested = False
         self.client_handler = None
         self.bizhawk_ctx = BizHawkContext()
+        # Changes in subscribed memory wake up the game watcher
+        self.bizhawk_ctx.memory_changed = self.watcher_event
         self.watcher_timeout = 0.5
 
     def make_gui(self):
@@ -103,6 +105,32 @@ class BizHawkClientContext(CommonContext):
         await super().disconnect(allow_autoreconnect)
 
 
+_TICK_REQUESTS = [{"type": "PING"}, {"type": "HASH"}]
+
+
+async def _check_tick_responses(ctx: BizHawkClientContext, responses: list[dict[str, Any]]) -> None:
+    """Checks the responses to the PING and HASH requests every tick starts with, and resets the client if the ROM
+    changed"""
+    pong, hash_response = responses
+
+    if pong["type"] != "PONG":
+        raise SyncError(f"Expected response of type PONG but got {pong['type']}")
+    if hash_response["type"] != "HASH_RESPONSE":
+        raise SyncError(f"Expected response of type HASH_RESPONSE but got {hash_response['type']}")
+
+    rom_hash = hash_response["value"]
+    if ctx.rom_hash is not None and ctx.rom_hash != rom_hash:
+        if ctx.server is not None and not ctx.server.socket.closed:
+            logger.info(f"ROM changed. Disconnecting from server.")
+
+        ctx.auth = None
+        ctx.username = None
+        ctx.client_handler = None
+        ctx.finished_game = False
+        await ctx.disconnect(False)
+    ctx.rom_hash = rom_hash
+
+
 async def _game_watcher(ctx: BizHawkClientContext):
     showed_connecting_message = False
     showed_connected_message = False
@@ -115,6 +143,7 @@ async def _game_watcher(ctx: BizHawkClientContext):
             pass
 
         ctx.watcher_event.clear()
+        tick_responses = None
 
         try:
             if ctx.bizhawk_ctx.connection_status == ConnectionStatus.NOT_CONNECTED:
@@ -150,24 +179,17 @@ async def _game_watcher(ctx: BizHawkClientContext):
 
             showed_connecting_message = False
 
-            await ping(ctx.bizhawk_ctx)
+            if showed_connected_message and ctx.client_handler is not None:
+                # Sent along with the handler's first requests instead of on their own. The ROM can only change when
+                # the script restarts, which drops the connection, so the handler never runs with the wrong ROM.
+                tick_responses = queue_requests(ctx.bizhawk_ctx, _TICK_REQUESTS)
+            else:
+                await _check_tick_responses(ctx, await send_requests(ctx.bizhawk_ctx, _TICK_REQUESTS))
 
             if not showed_connected_message:
                 showed_connected_message = True
                 logger.info("Connected to BizHawk")
 
-            rom_hash = await get_hash(ctx.bizhawk_ctx)
-            if ctx.rom_hash is not None and ctx.rom_hash != rom_hash:
-                if ctx.server is not None and not ctx.server.socket.closed:
-                    logger.info(f"ROM changed. Disconnecting from server.")
-
-                ctx.auth = None
-                ctx.username = None
-                ctx.client_handler = None
-                ctx.finished_game = False
-                await ctx.disconnect(False)
-            ctx.rom_hash = rom_hash
-
             if ctx.client_handler is None:
                 system = await get_system(ctx.bizhawk_ctx)
                 ctx.client_handler = await AutoBizHawkClientRegister.get_handler(ctx, system)
@@ -198,6 +220,19 @@ async def _game_watcher(ctx: BizHawkClientContext):
         # Call the handler's game watcher
         await ctx.client_handler.game_watcher(ctx)
 
+        if tick_responses is not None:
+            try:
+                await flush_requests(ctx.bizhawk_ctx)
+            except (RequestFailedError, NotConnectedError):
+                pass  # also raised by tick_responses
+
+            try:
+                await _check_tick_responses(ctx, await tick_responses)
+            except RequestFailedError as exc:
+                logger.info(f"Lost connection to BizHawk: {exc.args[0]}")
+            except NotConnectedError:
+                pass
+
 
 async def _run_game(rom: str):
     import os
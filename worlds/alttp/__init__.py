@@ -215,6 +215,7 @@ class ALTTPWorld(World):
 
     required_client_version = (0, 4, 1)
     web = ALTTPWeb()
+    process_safe_stages = frozenset({"generate_output"})
 
     pedestal_credit_texts: typing.Dict[int, str] = \
         {data.item_code: data.pedestal_credit for data in item_table.values() if data.pedestal_credit}
@@ -542,6 +543,8 @@ class ALTTPWorld(World):
     @classmethod
     def stage_generate_output(cls, multiworld, output_directory):
         push_shop_inventories(multiworld)
+        # load the base rom once, so that output processes share it instead of each reading it again
+        LttPDeltaPatch.get_source_data_with_cache()
 
     @property
     def use_enemizer(self) -> bool:
@@ -569,7 +572,9 @@ class ALTTPWorld(World):
             if multiworld.is_race:
                 patch_race_rom(rom, multiworld, player)
 
-            multiworld.spoiler.hashes[player] = get_hash_string(rom.hash)
+            # kept on the world, as generate_output may run in a worker process. modify_multidata puts it into the
+            # spoiler in the generating process
+            self.hash_string = get_hash_string(rom.hash)
 
             palettes_options = {
                 'dungeon': multiworld.uw_palettes[player],
@@ -664,6 +669,7 @@ class ALTTPWorld(World):
         rom_name = getattr(self, "rom_name", None)
         # we skip in case of error, so that the original error in the output thread is the one that gets raised
         if rom_name:
+            self.multiworld.spoiler.hashes[self.player] = self.hash_string
             new_name = base64.b64encode(bytes(self.rom_name)).decode()
             multidata["connect_names"][new_name] = multidata["connect_names"][self.multiworld.player_name[self.player]]
 
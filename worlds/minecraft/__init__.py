@@ -190,8 +190,10 @@ class MinecraftItem(Item):
     game = "Minecraft"
 
 
-def mc_update_output(raw_data, server, port):
+def mc_update_output(raw_data, server, port, address=None):
     data = json.loads(b64decode(raw_data))
     data['server'] = server
     data['port'] = port
+    if address:
+        data['address'] = address
     return b64encode(bytes(json.dumps(data), 'utf-8'))
@@ -95,6 +95,7 @@ class MM2World(World):
     item_name_groups = item_names
     location_name_groups = location_groups
     web = MM2WebWorld()
+    process_safe_stages = frozenset({"generate_output"})
     rom_name: bytearray
     world_version: Tuple[int, int, int] = (0, 3, 2)
     wily_5_weapons: Dict[int, List[int]]
@@ -1,12 +1,18 @@
 import struct
 import io
 import array
+import itertools
 import zlib
 import copy
 import zipfile
 from .ntype import BigStream
 
 
+# how many bytes get XORed at most at once. Whenever a key has to be skipped,
+# the rest of the chunk is XORed again with the following keys.
+XOR_CHUNK_SIZE = 0x1000
+
+
 # get the next XOR key. Uses some location in the source rom.
 # This will skip of 0s, since if we hit a block of 0s, the
 # patch data will be raw.
@@ -20,54 +26,107 @@ def key_next(rom, key_address, address_range):
     return key, key_address
 
 
+# gets the XOR keys in the order key_next would find them, which are the
+# nonzero bytes of the key range in the source rom, and the index of the
+# key that key_next would find first after xor_address.
+def key_table(rom, xor_address, xor_range):
+    key_data = bytes(rom.original.buffer[xor_range[0]:xor_range[1] + 1])
+    keys = key_data.replace(b'\x00', b'')
+    passed = xor_address + 1 - xor_range[0]
+    key_index = (passed - key_data.count(0, 0, passed)) % len(keys)
+    return keys, key_index
+
+
+# gets the next count XOR keys, wrapping around to the start of the key
+# range like key_next does.
+def key_stream(keys, key_index, count):
+    stream = keys[key_index:key_index + count]
+    while len(stream) < count:
+        stream += keys[:count - len(stream)]
+    return stream
+
+
+# XORs two byte strings of the same length all at once.
+def xor_bytes(data, keys):
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(keys, 'big')).to_bytes(len(data), 'big')
+
+
 # creates a XOR block for the patch. This might break it up into
 # multiple smaller blocks if there is a concern about the XOR key
-# or if it is too long.
-def write_block(rom, xor_address, xor_range, block_start, data, patch_data):
-    new_data = []
+# or if it is too long. This gives the same blocks as XORing the data
+# byte by byte with key_next, but XORs many bytes at once and only goes
+# byte by byte where the XOR would result in 0.
+def write_block(keys, key_index, block_start, data, patch_data):
+    # Leave 0s as 0s. Only the other bytes get XORed, each with the next key
+    values = data.replace(b'\x00', b'')
+    xored_values = []
+    # where the XOR key had to be changed, as the index in values and the number of keys skipped
+    key_skips = []
+    done = 0
+    chunk_size = XOR_CHUNK_SIZE
+    while done < len(values):
+        chunk = values[done:done + chunk_size]
+        xored_chunk = xor_bytes(chunk, key_stream(keys, key_index, len(chunk)))
+        # if the XOR would result in 0, change the key
+        safe = xored_chunk.find(0)
+        if safe < 0:
+            safe = len(chunk)
+            chunk_size = min(chunk_size * 2, XOR_CHUNK_SIZE)
+        else:
+            # don't XOR much further than the last safe keys went next time
+            chunk_size = max(safe * 2, 0x10)
+        xored_values.append(xored_chunk[:safe])
+        done += safe
+        key_index = (key_index + safe) % len(keys)
+
+        if safe < len(chunk):
+            # search for next safe XOR key
+            b = values[done]
+            skipped = 0
+            while keys[key_index] == b:
+                skipped += 1
+                key_index = (key_index + 1) % len(keys)
+            key_skips.append((done, skipped))
+            xored_values.append(bytes([b ^ keys[key_index]]))
+            key_index = (key_index + 1) % len(keys)
+            done += 1
+
+    # put the XORed bytes back in between the 0s
+    positions = list(itertools.compress(itertools.count(), data))
+    new_data = bytearray(data)
+    for position, value in zip(positions, b''.join(xored_values)):
+        new_data[position] = value
+
+    # Changing the key requires breaking up the block. The end of the data
+    # breaks it up one last time, without skipping any keys.
+    positions.append(len(data))
+    key_skips.append((len(values), 0))
+    section_start = 0
     key_offset = 0
     continue_block = False
+    for index, skipped in key_skips:
+        position = positions[index]
 
-    for b in data:
-        if b == 0:
-            # Leave 0s as 0s. Do not XOR
-            new_data += [0]
-        else:
-            # get the next XOR key
-            key, xor_address = key_next(rom, xor_address, xor_range)
-
-            # if the XOR would result in 0, change the key.
-            # This requires breaking up the block.
-            if b == key:
-                write_block_section(block_start, key_offset, new_data, patch_data, continue_block)
-                new_data = []
-                key_offset = 0
-                continue_block = True
-
-                # search for next safe XOR key
-                while b == key:
-                    key_offset += 1
-                    key, xor_address = key_next(rom, xor_address, xor_range)
-                    # if we aren't able to find one quickly, we may need to break again
-                    if key_offset == 0xFF:
-                        write_block_section(block_start, key_offset, new_data, patch_data, continue_block)
-                        new_data = []
-                        key_offset = 0
-                        continue_block = True
-
-            # XOR the key with the byte
-            new_data += [b ^ key]
-
-            # Break the block if it's too long
-            if (len(new_data) == 0xFFFF):
-                write_block_section(block_start, key_offset, new_data, patch_data, continue_block)
-                new_data = []
-                key_offset = 0
-                continue_block = True
-
-    # Save the block
-    write_block_section(block_start, key_offset, new_data, patch_data, continue_block)
-    return xor_address
+        # Break the block if it's too long. This only gets checked after XORing
+        # a byte, so a block that gets too long on a 0 doesn't get broken here.
+        while position - section_start >= 0xFFFF and data[section_start + 0xFFFE] != 0:
+            section_end = section_start + 0xFFFF
+            write_block_section(block_start, key_offset, new_data[section_start:section_end], patch_data,
+                                continue_block)
+            section_start = section_end
+            key_offset = 0
+            continue_block = True
+
+        write_block_section(block_start, key_offset, new_data[section_start:position], patch_data, continue_block)
+        section_start = position
+        continue_block = True
+
+        # if we aren't able to find a safe key quickly, we may need to break again
+        for _ in range(skipped // 0xFF):
+            write_block_section(block_start, 0xFF, b'', patch_data, continue_block)
+        key_offset = skipped % 0xFF
+
+    return key_index
 
 
 # This saves a sub-block for the XOR block. If it's the first part
@@ -91,7 +150,7 @@ def create_patch_file(rom, rand, xor_range=(0x00B8AD30, 0x00F029A0)):
     dma_start, dma_end = rom.get_dma_table_range()
 
     # add header
-    patch_data = BigStream([])
+    patch_data = BigStream(bytearray())
     patch_data.append_bytes(list(map(ord, 'ZPFv1')))
     patch_data.append_int32(dma_start)
     patch_data.append_int32(xor_range[0])
@@ -101,6 +160,7 @@ def create_patch_file(rom, rand, xor_range=(0x00B8AD30, 0x00F029A0)):
     # doesn't have many sections of 0s
     xor_address = rand.randint(*xor_range)
     patch_data.append_int32(xor_address)
+    keys, key_index = key_table(rom, xor_address, xor_range)
 
     new_buffer = copy.copy(rom.original.buffer)
 
@@ -114,55 +174,39 @@ def create_patch_file(rom, rand, xor_range=(0x00B8AD30, 0x00F029A0)):
         # We don't trust files that have modified DMA to have their
         # changed addresses tracked correctly, so we invalidate the
         # entire file
-        for address in range(start, start + size):
-            rom.changed_address[address] = rom.buffer[address]
+        rom.changed_address.update(zip(range(start, start + size), rom.buffer[start:start + size]))
 
         # Simulate moving the files to know which addresses have changed
         if from_file >= 0:
             old_dma_start, old_dma_end, old_size = rom.original.get_dmadata_record_by_key(from_file)
             copy_size = min(size, old_size)
             new_buffer[start:start+copy_size] = rom.original.read_bytes(from_file, copy_size)
-            new_buffer[start+copy_size:start+size] = [0] * (size - copy_size)
+            new_buffer[start+copy_size:start+size] = bytes(size - copy_size)
         else:
             # this is a new file, so we just fill with null data
-            new_buffer[start:start+size] = [0] * size
+            new_buffer[start:start+size] = bytes(size)
 
     # end of DMA entries
     patch_data.append_int16(0xFFFF)
 
     # filter down the addresses that will actually need to change.
     # Make sure to not include any of the DMA table addresses
+    force_patch = set(rom.force_patch)
     changed_addresses = [address for address,value in rom.changed_address.items() \
         if (address >= dma_end or address < dma_start) and \
-            (address in rom.force_patch or new_buffer[address] != value)]
+            (address in force_patch or new_buffer[address] != value)]
     changed_addresses.sort()
 
     # Write the address changes. We'll store the data with XOR so that
     # the patch data won't be raw data from the patched rom.
-    data = []
-    block_start = None
     BLOCK_HEADER_SIZE = 7 # this is used to break up gaps
-    for address in changed_addresses:
-        # if there's a block to write and there's a gap, write it
-        if block_start:
-            block_end = block_start + len(data) - 1
-            if address > block_end + BLOCK_HEADER_SIZE:
-                xor_address = write_block(rom, xor_address, xor_range, block_start, data, patch_data)
-                data = []
-                block_start = None
-                block_end = None
-
-        # start a new block
-        if not block_start:
-            block_start = address
-            block_end = address - 1             
-
-        # save the new data
-        data += rom.buffer[block_end+1:address+1]
-
-    # if there was any left over blocks, write them out
-    if block_start:
-        xor_address = write_block(rom, xor_address, xor_range, block_start, data, patch_data)
+    # if there's a gap between changed addresses, end the block before it and start a new one after it
+    gaps = [(previous, address) for previous, address in zip(changed_addresses, changed_addresses[1:])
+            if address > previous + BLOCK_HEADER_SIZE]
+    block_starts = changed_addresses[:1] + [address for previous, address in gaps]
+    block_ends = [previous for previous, address in gaps] + changed_addresses[-1:]
+    for block_start, block_end in zip(block_starts, block_ends):
+        key_index = write_block(keys, key_index, block_start, rom.buffer[block_start:block_end+1], patch_data)
 
     # compress the patch file
     patch_data = bytes(patch_data.buffer)
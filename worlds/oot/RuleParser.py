@@ -1,5 +1,5 @@
 import ast
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from inspect import signature, _ParameterKind
 import logging
 import re
@@ -33,6 +33,16 @@ allowed_globals = {'TimeOfDay': TimeOfDay}
 rule_aliases = {}
 nonaliases = set()
 
+# Compiled rules by the keyword args they take and the dump of their AST, shared by all players. Settings are folded
+# into the AST as constants, while the player is passed in as a keyword arg, so rules that end up the same for
+# several players only get compiled once. Least recently used rules get dropped beyond the max size, so a process
+# generating many times with different settings doesn't keep every rule it ever compiled.
+compiled_rules = OrderedDict()
+compiled_rules_max_size = 4096
+
+def player_arg():
+    return ast.Name(id='player', ctx=ast.Load())
+
 def load_aliases():
     j = read_json(data_path('LogicHelpers.json'))
     for s, repl in j.items():
@@ -67,10 +77,12 @@ class Rule_AST_Transformer(ast.NodeTransformer):
         self.rule_cache = {}
         self.kwarg_defaults = kwarg_defaults.copy()  # otherwise this gets contaminated between players
         self.kwarg_defaults['player'] = self.player
+        # names handled by methods, instead of calling dir() for every name in every rule
+        self.handler_names = frozenset(dir(self))
 
 
     def visit_Name(self, node):
-        if node.id in dir(self):
+        if node.id in self.handler_names:
             return getattr(self, node.id)(node)
         elif node.id in rule_aliases:
             args, repl = rule_aliases[node.id]
@@ -84,7 +96,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                     value=ast.Name(id='state', ctx=ast.Load()),
                     attr='has',
                     ctx=ast.Load()),
-                args=[ast.Str(escaped_items[node.id]), ast.Constant(self.player)],
+                args=[ast.Str(escaped_items[node.id]), player_arg()],
                 keywords=[])
         elif node.id in self.world.__dict__:
             # Settings are constant
@@ -100,7 +112,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                     value=ast.Name(id='state', ctx=ast.Load()),
                     attr='has',
                     ctx=ast.Load()),
-                args=[ast.Str(node.id.replace('_', ' ')), ast.Constant(self.player)],
+                args=[ast.Str(node.id.replace('_', ' ')), player_arg()],
                 keywords=[])
         else:
             raise Exception('Parse Error: invalid node name %s' % node.id, self.current_spot.name, ast.dump(node, False))
@@ -111,7 +123,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                 value=ast.Name(id='state', ctx=ast.Load()),
                 attr='has',
                 ctx=ast.Load()),
-            args=[ast.Str(node.s), ast.Constant(self.player)],
+            args=[ast.Str(node.s), player_arg()],
             keywords=[])
 
     # python 3.8 compatibility: ast walking now uses visit_Constant for Constant subclasses
@@ -150,7 +162,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                 value=ast.Name(id='state', ctx=ast.Load()),
                 attr='has',
                 ctx=ast.Load()),
-            args=[ast.Str(iname), ast.Constant(self.player), count],
+            args=[ast.Str(iname), player_arg(), count],
             keywords=[])
 
 
@@ -158,7 +170,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
         if not isinstance(node.func, ast.Name):
             return node
 
-        if node.func.id in dir(self):
+        if node.func.id in self.handler_names:
             return getattr(self, node.func.id)(node)
         elif node.func.id in rule_aliases:
             args, repl = rule_aliases[node.func.id]
@@ -221,7 +233,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                                 ctx=ast.Load()),
                             attr='worlds',
                             ctx=ast.Load()),
-                        slice=ast.Index(value=ast.Constant(self.player)),
+                        slice=ast.Index(value=player_arg()),
                         ctx=ast.Load()),
                     attr=node.value.id,
                     ctx=ast.Load()),
@@ -325,7 +337,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                     value=ast.Name(id='state', ctx=ast.Load()),
                     attr='has_any' if early_return else 'has_all',
                     ctx=ast.Load()),
-                args=[ast.Tuple(elts=[ast.Str(i) for i in items], ctx=ast.Load()), ast.Constant(self.player)],
+                args=[ast.Tuple(elts=[ast.Str(i) for i in items], ctx=ast.Load()), player_arg()],
                 keywords=[])] + new_values
         else:
             node.values = new_values
@@ -341,8 +353,8 @@ class Rule_AST_Transformer(ast.NodeTransformer):
         if not hasattr(State, name):
             raise Exception('Parse Error: No such function State.%s' % name, self.current_spot.name, ast.dump(node, False))
 
-        for (k, v) in self.kwarg_defaults.items():
-            keywords.append(ast.keyword(arg=f'{k}', value=ast.Constant(v)))
+        for k in self.kwarg_defaults.keys():
+            keywords.append(ast.keyword(arg=f'{k}', value=ast.Name(id=k, ctx=ast.Load())))
 
         return ast.Call(
             func=ast.Attribute(
@@ -367,7 +379,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                 value=ast.Name(id='state', ctx=ast.Load()),
                 attr='has',
                 ctx=ast.Load()),
-            args=[ast.Str(subrule_name), ast.Constant(self.player)],
+            args=[ast.Str(subrule_name), player_arg()],
             keywords=[])
         # Cache the subrule for any others in this region
         # (and reserve the item name in the process)
@@ -403,25 +415,32 @@ class Rule_AST_Transformer(ast.NodeTransformer):
     def make_access_rule(self, body):
         rule_str = ast.dump(body, False)
         if rule_str not in self.rule_cache:
-            # requires consistent iteration on dicts
-            kwargs = [ast.arg(arg=k) for k in self.kwarg_defaults.keys()]
-            kwd = list(map(ast.Constant, self.kwarg_defaults.values()))
-            try:
-                self.rule_cache[rule_str] = eval(compile(
-                    ast.fix_missing_locations(
-                        ast.Expression(ast.Lambda(
-                            args=ast.arguments(
-                                posonlyargs=[],
-                                args=[ast.arg(arg='state')],
-                                defaults=[],
-                                kwonlyargs=kwargs,
-                                kw_defaults=kwd),
-                            body=body))),
-                    '<string>', 'eval'),
-                    # globals/locals. if undefined, everything in the namespace *now* would be allowed
-                    allowed_globals)
-            except TypeError as e:
-                raise Exception('Parse Error: %s' % e, self.current_spot.name, ast.dump(body, False))
+            compiled_key = (tuple(self.kwarg_defaults), rule_str)
+            if compiled_key in compiled_rules:
+                compiled_rules.move_to_end(compiled_key)
+            else:
+                # requires consistent iteration on dicts
+                kwargs = [ast.arg(arg=k) for k in self.kwarg_defaults.keys()]
+                # the defaults are looked up in the kwarg_defaults passed as locals when the lambda gets created
+                kwd = [ast.Name(id=k, ctx=ast.Load()) for k in self.kwarg_defaults.keys()]
+                try:
+                    compiled_rules[compiled_key] = compile(
+                        ast.fix_missing_locations(
+                            ast.Expression(ast.Lambda(
+                                args=ast.arguments(
+                                    posonlyargs=[],
+                                    args=[ast.arg(arg='state')],
+                                    defaults=[],
+                                    kwonlyargs=kwargs,
+                                    kw_defaults=kwd),
+                                body=body))),
+                        '<string>', 'eval')
+                except TypeError as e:
+                    raise Exception('Parse Error: %s' % e, self.current_spot.name, ast.dump(body, False))
+                if len(compiled_rules) > compiled_rules_max_size:
+                    compiled_rules.popitem(last=False)
+            # globals/locals. if undefined, everything in the namespace *now* would be allowed
+            self.rule_cache[rule_str] = eval(compiled_rules[compiled_key], allowed_globals, self.kwarg_defaults)
         return self.rule_cache[rule_str]
 
 
@@ -494,20 +513,20 @@ class Rule_AST_Transformer(ast.NodeTransformer):
     # Hijacking functions
     def current_spot_child_access(self, node): 
         r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
-        return ast.parse(f"state._oot_reach_as_age('{r.name}', 'child', {self.player})", mode='eval').body
+        return ast.parse(f"state._oot_reach_as_age('{r.name}', 'child', player)", mode='eval').body
 
     def current_spot_adult_access(self, node): 
         r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
-        return ast.parse(f"state._oot_reach_as_age('{r.name}', 'adult', {self.player})", mode='eval').body
+        return ast.parse(f"state._oot_reach_as_age('{r.name}', 'adult', player)", mode='eval').body
 
     def current_spot_starting_age_access(self, node): 
         return self.current_spot_child_access(node) if self.world.starting_age == 'child' else self.current_spot_adult_access(node)
 
     def has_bottle(self, node): 
-        return ast.parse(f"state._oot_has_bottle({self.player})", mode='eval').body
+        return ast.parse(f"state._oot_has_bottle(player)", mode='eval').body
 
     def can_live_dmg(self, node):
-        return ast.parse(f"state._oot_can_live_dmg({self.player}, {node.args[0].value})", mode='eval').body
+        return ast.parse(f"state._oot_can_live_dmg(player, {node.args[0].value})", mode='eval').body
 
     def region_has_shortcuts(self, node):
-        return ast.parse(f"state._oot_region_has_shortcuts({self.player}, '{node.args[0].value}')", mode='eval').body
+        return ast.parse(f"state._oot_region_has_shortcuts(player, '{node.args[0].value}')", mode='eval').body
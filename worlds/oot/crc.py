@@ -1,4 +1,7 @@
 import itertools
+import operator
+import struct
+from functools import reduce
 from .ntype import BigStream, uint32
 
 def calculate_crc(self):
@@ -6,19 +9,18 @@ def calculate_crc(self):
     t1 = t2 = t3 = t4 = t5 = t6 = 0xDF26F436
     u32 = 0xFFFFFFFF
 
-    m1 = self.read_bytes(0x1000, 0x100000)
-    words = map(uint32.value, zip(m1[0::4], m1[1::4], m1[2::4], m1[3::4]))
+    words = struct.unpack('>262144I', self.read_bytes(0x1000, 0x100000))
+    words2 = struct.unpack('>64I', self.read_bytes(0x750, 0x100))
 
-    m2 = self.read_bytes(0x750, 0x100)
-    words2 = map(uint32.value, zip(m2[0::4], m2[1::4], m2[2::4], m2[3::4]))
+    # t1, t3, t4 and t6 don't depend on the order of the words, so they are computed over all words at once.
+    # t4 counts how often t6 overflows, and every word can only make it overflow once.
+    t1 += sum(map(operator.xor, words, itertools.cycle(words2)))
+    t3 = reduce(operator.xor, words, t3)
+    total = t6 + sum(words)
+    t4 += total >> 32
 
-    for d, d2 in zip(words, itertools.cycle(words2)):
-        # keep t2 and t6 in u32 for comparisons; others can wait to be truncated
-        if ((t6 + d) & u32) < t6:
-            t4 += 1
-
-        t6 = (t6+d) & u32
-        t3 ^= d
+    # t2 depends on its previous value, so it still needs a loop. t6 is the running sum after adding each word.
+    for d, t6 in zip(words, itertools.islice(itertools.accumulate(words, initial=t6), 1, None)):
         shift = d & 0x1F
         r = ((d << shift) | (d >> (32 - shift)))
         t5 += r
@@ -26,11 +28,11 @@ def calculate_crc(self):
         if t2 > d:
             t2 ^= r & u32
         else:
-            t2 ^= t6 ^ d
+            t2 ^= (t6 & u32) ^ d
 
-        t1 += d2 ^ d
+    t6 = total & u32
 
     crc0 = (t6 ^ t4 ^ t3) & u32
     crc1 = (t5 ^ t2 ^ t1) & u32
 
-    return uint32.bytes(crc0) + uint32.bytes(crc1)
\ No newline at end of file
+    return uint32.bytes(crc0) + uint32.bytes(crc1)
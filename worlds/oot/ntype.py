@@ -11,6 +11,10 @@ class uint16:
     def read(buffer, address=0): 
         return uint16._struct.unpack_from(buffer, address)[0]
 
+    def pack_all(values):
+        values = [value & 0xFFFF for value in values]
+        return struct.pack(f'>{len(values)}H', *values)
+
     def bytes(value):
         value = value & 0xFFFF
         return [(value >> 8) & 0xFF, value & 0xFF]
@@ -27,6 +31,10 @@ class uint32:
     def read(buffer, address=0): 
         return uint32._struct.unpack_from(buffer, address)[0]
 
+    def pack_all(values):
+        values = [value & 0xFFFFFFFF for value in values]
+        return struct.pack(f'>{len(values)}I', *values)
+
     def bytes(value):
         value = value & 0xFFFFFFFF
         return [(value >> 24) & 0xFF, (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF]
@@ -106,7 +114,8 @@ class BigStream(object):
     def read_int16(self, address=None):
         if address == None:
             address = self.last_address
-        return uint16.value(self.read_bytes(address, 2))
+        self.last_address = address + 2
+        return uint16.read(self.buffer, address)
 
 
     def read_int24(self, address=None):
@@ -118,7 +127,22 @@ class BigStream(object):
     def read_int32(self, address=None):
         if address == None:
             address = self.last_address
-        return uint32.value(self.read_bytes(address, 4))
+        self.last_address = address + 4
+        return uint32.read(self.buffer, address)
+
+
+    def read_int16s(self, address=None, count=1):
+        if address == None:
+            address = self.last_address
+        self.last_address = address + (count * 2)
+        return struct.unpack_from(f'>{count}H', self.buffer, address)
+
+
+    def read_int32s(self, address=None, count=1):
+        if address == None:
+            address = self.last_address
+        self.last_address = address + (count * 4)
+        return struct.unpack_from(f'>{count}I', self.buffer, address)
 
 
     def write_byte(self, address, value):
@@ -165,25 +189,23 @@ class BigStream(object):
         self.buffer[startaddress:startaddress + len(values)] = values
 
 
+    # the bulk writes pack all values at once, and still go through write_bytes so that Rom tracks the changes
     def write_int16s(self, startaddress, values):
         if startaddress == None:
             startaddress = self.last_address
-        for i, value in enumerate(values):
-            self.write_int16(startaddress + (i * 2), value)
+        self.write_bytes(startaddress, uint16.pack_all(values))
 
 
     def write_int24s(self, startaddress, values):
         if startaddress == None:
             startaddress = self.last_address
-        for i, value in enumerate(values):
-            self.write_int24(startaddress + (i * 3), value)
+        self.write_bytes(startaddress, [byte for value in values for byte in uint24.bytes(value)])
 
 
     def write_int32s(self, startaddress, values):
         if startaddress == None:
             startaddress = self.last_address
-        for i, value in enumerate(values):
-            self.write_int32(startaddress + (i * 4), value)
+        self.write_bytes(startaddress, uint32.pack_all(values))
 
 
     def append_byte(self, value):
@@ -211,20 +233,16 @@ class BigStream(object):
 
 
     def append_bytes(self, values):
-        for value in values:
-            self.append_byte(value)
+        self.buffer.extend(values)
 
 
     def append_int16s(self, values):
-        for value in values:
-            self.append_int16(value)
+        self.append_bytes(uint16.pack_all(values))
 
 
     def append_int24s(self, values):
-        for value in values:
-            self.append_int24(value)
+        self.append_bytes([byte for value in values for byte in uint24.bytes(value)])
 
 
     def append_int32s(self, values):
-        for value in values:
-            self.append_int32(value)
+        self.append_bytes(uint32.pack_all(values))
@@ -0,0 +1,28 @@
+from unittest import TestCase
+
+from BaseClasses import CollectionState
+from test.general import setup_multiworld
+from worlds.AutoWorld import call_all
+from .. import OOTWorld
+from .. import RuleParser
+from ..Options import Forest
+
+
+class TestSharedRules(TestCase):
+    def test_shared_rules(self) -> None:
+        """Tests that players with the same settings share compiled rules while different settings change rules"""
+        multiworld = setup_multiworld([OOTWorld, OOTWorld, OOTWorld], ())
+        for player, forest in ((1, Forest.option_closed_deku), (2, Forest.option_open), (3, Forest.option_closed_deku)):
+            multiworld.worlds[player].options.open_forest.value = forest
+        for step in ("generate_early", "create_regions"):
+            call_all(multiworld, step)
+
+        state = CollectionState(multiworld)
+        rules = {player: multiworld.get_entrance("Kokiri Forest -> KF Outside Deku Tree", player).access_rule
+                 for player in multiworld.player_ids}
+        self.assertFalse(rules[1](state))
+        self.assertTrue(rules[2](state))
+        self.assertFalse(rules[3](state))
+        self.assertIs(rules[1].__code__, rules[3].__code__)
+        self.assertIsNot(rules[1].__code__, rules[2].__code__)
+        self.assertLessEqual(len(RuleParser.compiled_rules), RuleParser.compiled_rules_max_size)
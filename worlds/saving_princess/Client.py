@@ -219,7 +219,7 @@ def launch(*args: str) -> Any:
         if args.url:
             url = urllib.parse.urlparse(args.url)
             if url.scheme == "archipelago":
-                server = f'--server="{url.hostname}:{url.port}"'
+                server = f'--server="{url.hostname}:{url.port}{url.path.rstrip("/")}"'
                 if url.username:
                     name = f'--name="{urllib.parse.unquote(url.username)}"'
                 if url.password: